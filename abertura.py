@@ -0,0 +1,245 @@
+"""
+Livro de aberturas para a posição inicial fixa (robot em 0,0, bolor em 5,5).
+
+Cada jogo começa igual e as primeiras leituras decidem quase todo o início.
+O livro guarda a melhor jogada dos primeiros turnos indexada pela sequência
+de observações até ao momento. Uma observação por turno, já depois de andar:
+
+    célula do robot . leitura da manteiga . classe da torradeira . barreiras conhecidas da célula
+
+com a célula como row * 6 + col, '-' quando não houve leitura, a torradeira
+em 0 (em cima), 1 (quente) ou 2 (fria) e as barreiras como a máscara de 4
+bits do MapaParedes. As observações juntam-se com '/' (a primeira é a da
+casa, antes de jogar). A célula distingue os ramos que dão as mesmas
+leituras por caminhos diferentes.
+
+O livro é calculado no simulador com pesquisa exaustiva sobre uma amostra
+de cenários: em cada nó (sequência de observações) experimenta todas as
+jogadas, separa os cenários pela observação que cada jogada dá e continua
+até turnos de profundidade, onde a heurística acaba o jogo. Fica a jogada
+com mais vitórias (e menos jogadas); em caso de empate a da heurística. Só
+se guardam os nós por onde o livro passa (os das jogadas escolhidas).
+
+Uso:
+    python abertura.py gerar --turnos 3 --cenarios 3000 --seed 1 [--saida abertura.json]
+    python abertura.py avaliar --games 2000 --seed 2
+"""
+import json
+
+try:
+    import os
+    CAMINHO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'abertura.json')
+except (ImportError, NameError, AttributeError):
+    CAMINHO = 'abertura.json'  # MicroPython: relativo à pasta do projeto
+
+JOGADAS = 'wsad'
+DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def observacao(celula, manteiga, torradeira, paredes):
+    """
+    Observação de um turno.
+    celula: célula do robot (row * 6 + col)
+    manteiga: leitura da distância à manteiga, ou None se não houve
+    torradeira: leitura do calor da torradeira, ou None se não houve
+    paredes: máscara de 4 bits das barreiras conhecidas da célula
+    """
+    if torradeira is None:
+        classe = '-'
+    else:
+        classe = str(min(torradeira, 2))
+    return str(celula) + '.' + ('-' if manteiga is None else str(manteiga)) + '.' + classe + '.' + str(paredes)
+
+
+class Abertura:
+    def __init__(self, livro, turnos, rows=6, cols=6):
+        self.livro = livro    # sequência de observações -> jogada
+        self.turnos = turnos  # profundidade do livro (em jogadas do robot)
+        self.rows = rows
+        self.cols = cols
+        self.consultas = 0
+        self.acertos = 0
+
+    @classmethod
+    def carregar(cls, caminho=CAMINHO):
+        """Lê o livro do disco, ou None se o ficheiro não existir"""
+        try:
+            with open(caminho) as f:
+                dados = json.load(f)
+        except OSError:
+            return None
+        return cls(dados['livro'], dados['turnos'])
+
+    def jogada(self, observacoes, row, col, paredes=0):
+        """
+        Jogada do livro ('w', 's', 'a', 'd') para a lista de observações, ou
+        None. A jogada tem de ser possível a partir de (row, col) com as
+        barreiras conhecidas da célula (máscara de 4 bits); senão None
+        """
+        if len(observacoes) > self.turnos:
+            return None
+        self.consultas += 1
+        move = self.livro.get('/'.join(observacoes))
+        if move is None:
+            return None
+        d = JOGADAS.index(move)
+        if (paredes & (1 << d) or not 0 <= row + DELTAS[d][0] < self.rows or
+                not 0 <= col + DELTAS[d][1] < self.cols):
+            return None
+        self.acertos += 1
+        return move
+
+
+# -------------------------------
+# Construção no simulador
+# -------------------------------
+def _legais(game):
+    row, col = game.robot_pos['row'], game.robot_pos['col']
+    mascara = game.paredes_descobertas.mascaras[row * game.size + col]
+    return [JOGADAS[d] for d, (dr, dc) in enumerate(DELTAS)
+            if 0 <= row + dr < game.size and 0 <= col + dc < game.size and not mascara & (1 << d)]
+
+
+def _reproduzir(seed, jogadas):
+    """GameBoard do cenário seed depois das jogadas (cada uma como no play_game_autonomous)"""
+    from simulate import GameBoard
+
+    game = GameBoard(headless=True, tabuleiro_aleatorio=True, seed=seed)
+    feitas = 0
+    for move in jogadas:
+        if game.skip:
+            game.skip = False
+            game.move_bolor()
+            if game.game_over:
+                break
+        heuristica, strat = game.get_autonomous_move()
+        if game.move_robot(move, strat and move == heuristica):
+            game.move_bolor()
+            feitas += 1
+        if game.game_over:
+            break
+    return game, feitas
+
+
+class _Construtor:
+    def __init__(self, turnos, max_moves=100):
+        self.turnos = turnos
+        self.max_moves = max_moves
+        self.nos = 0
+
+    def _final(self, seeds, jogadas):
+        """(vitórias, jogadas totais) dos cenários acabados pela heurística"""
+        vitorias = total = 0
+        for seed in seeds:
+            game, feitas = _reproduzir(seed, jogadas)
+            if not game.game_over:
+                result = game.play_game_autonomous(self.max_moves - feitas)
+                feitas += result['moves']
+            vitorias += game.won
+            total += feitas
+        return vitorias, total
+
+    def resolver(self, seeds, jogadas):
+        """
+        Nó dos cenários seeds, que partilham as observações. Returns: (melhor
+        (vitórias, -jogadas), entradas do livro deste nó e dos nós seguintes
+        pela jogada escolhida)
+        """
+        self.nos += 1
+        if len(jogadas) == self.turnos:
+            vitorias, total = self._final(seeds, jogadas)
+            return (vitorias, -total), {}
+        game, _ = _reproduzir(seeds[0], jogadas)
+        chave = '/'.join(game.observacoes)
+        heuristica = game.get_autonomous_move()[0]
+        melhor, melhor_move, melhor_livro = None, None, None
+        for move in _legais(game):
+            # Cenários separados pela observação depois da jogada
+            filhos = {}
+            acabados = []
+            for seed in seeds:
+                filho, _ = _reproduzir(seed, jogadas + [move])
+                if filho.game_over:
+                    acabados.append(seed)
+                else:
+                    filhos.setdefault('/'.join(filho.observacoes), []).append(seed)
+            vitorias, total = self._final(acabados, jogadas + [move]) if acabados else (0, 0)
+            valor = (vitorias, -total)
+            livro = {}
+            for grupo in filhos.values():
+                v, entradas = self.resolver(grupo, jogadas + [move])
+                valor = (valor[0] + v[0], valor[1] + v[1])
+                livro.update(entradas)
+            if melhor is None or valor > melhor or (valor == melhor and move == heuristica):
+                melhor, melhor_move, melhor_livro = valor, move, livro
+        if melhor_move is None:
+            vitorias, total = self._final(seeds, jogadas)
+            return (vitorias, -total), {}
+        melhor_livro[chave] = melhor_move
+        return melhor, melhor_livro
+
+
+def construir(cenarios, turnos=3, seed=0, max_moves=100):
+    """Returns: (livro {observações: jogada}, número de nós pesquisados)"""
+    from simulate import game_seed
+
+    construtor = _Construtor(turnos, max_moves)
+    seeds = [game_seed(seed, i) for i in range(cenarios)]
+    # A observação da casa separa os cenários antes da primeira jogada
+    grupos = {}
+    for s in seeds:
+        game, _ = _reproduzir(s, [])
+        grupos.setdefault('/'.join(game.observacoes), []).append(s)
+    livro = {}
+    for grupo in grupos.values():
+        livro.update(construtor.resolver(grupo, [])[1])
+    return livro, construtor.nos
+
+
+def guardar(livro, turnos, caminho=CAMINHO):
+    with open(caminho, 'w') as f:
+        json.dump({'turnos': turnos, 'livro': dict(sorted(livro.items()))}, f, indent=0)
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from simulate import run_batch
+
+    parser = argparse.ArgumentParser(description="Livro de aberturas da posição inicial")
+    sub = parser.add_subparsers(dest="modo", required=True)
+    gerar = sub.add_parser("gerar", help="pesquisa os primeiros turnos numa amostra de cenários")
+    gerar.add_argument("--turnos", type=int, default=3)
+    gerar.add_argument("--cenarios", type=int, default=3000)
+    gerar.add_argument("--seed", type=int, default=1)
+    gerar.add_argument("--saida", default=CAMINHO)
+    avaliar = sub.add_parser("avaliar", help="heurística com e sem livro em cenários novos")
+    avaliar.add_argument("--games", type=int, default=2000)
+    avaliar.add_argument("--seed", type=int, default=2)
+    avaliar.add_argument("--livro", default=CAMINHO)
+    args = parser.parse_args(argv)
+
+    if args.modo == "gerar":
+        start = time.perf_counter()
+        livro, nos = construir(args.cenarios, args.turnos, args.seed)
+        guardar(livro, args.turnos, args.saida)
+        print(f"{len(livro)} posições no livro, {nos} nós pesquisados, "
+              f"{time.perf_counter() - start:.1f}s -> {args.saida}")
+        return
+
+    abertura = Abertura.carregar(args.livro)
+    if abertura is None:
+        raise SystemExit("sem livro: " + args.livro)
+    sem = run_batch(args.games, args.seed)
+    com = run_batch(args.games, args.seed, abertura=abertura)
+    for nome, results in (("sem livro", sem), ("com livro", com)):
+        wins = sum(r['won'] for r in results)
+        moves = sum(r['moves'] for r in results if r['won'])
+        print(f"{nome}: {wins} vitórias ({100.0 * wins / args.games:.1f}%), "
+              f"{moves / max(wins, 1):.2f} jogadas por vitória")
+    print(f"Consultas ao livro: {abertura.consultas}, no livro: {abertura.acertos}")
+
+
+if __name__ == "__main__":
+    main()
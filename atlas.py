@@ -0,0 +1,152 @@
+"""
+Atlas de distâncias de Manhattan pré-calculado.
+
+Para cada célula de origem guarda a linha de distâncias a todas as células
+(lista plana, índice row * cols + col) e os "anéis" de células a cada
+distância. É construído uma vez por tamanho de tabuleiro e substitui os
+ciclos abs(r - row) + abs(c - col) do disperse_table e do populate_tabela,
+com resultados idênticos.
+
+python atlas.py corre os microbenchmarks contra as versões com ciclos.
+"""
+
+_atlases = {}
+
+
+class Atlas:
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        # dist[origin][cell] e rings[origin][d] = células à distância d de origin
+        self.dist = []
+        self.rings = []
+        for origin in range(self.cells):
+            orow, ocol = origin // cols, origin % cols
+            row_dist = [abs(cell // cols - orow) + abs(cell % cols - ocol) for cell in range(self.cells)]
+            rings = [[] for _ in range(max(row_dist) + 1)]
+            for cell in range(self.cells):
+                rings[row_dist[cell]].append(cell)
+            self.dist.append(row_dist)
+            self.rings.append(rings)
+
+    def covers(self, row, col, radius):
+        """True se a janela de raio radius centrada em (row, col) cobre o tabuleiro todo"""
+        return (radius >= row and radius >= self.rows - 1 - row and
+                radius >= col and radius >= self.cols - 1 - col)
+
+    def ring(self, row, col, distance):
+        """Células (row, col) à distância exata distance de (row, col)"""
+        rings = self.rings[row * self.cols + col]
+        if distance < 0 or distance >= len(rings):
+            return []
+        return [(cell // self.cols, cell % self.cols) for cell in rings[distance]]
+
+
+def get_atlas(rows=6, cols=6):
+    atlas = _atlases.get((rows, cols))
+    if atlas is None:
+        atlas = _atlases[(rows, cols)] = Atlas(rows, cols)
+    return atlas
+
+
+def disperse_table(table, value, row, col, radius=6):
+    """Igual ao disperse_table original: table[r][c] = |value - distância|, na janela de raio radius"""
+    rows, cols = len(table), len(table[0])
+    atlas = get_atlas(rows, cols)
+    if not atlas.covers(row, col, radius):
+        _disperse_table_ref(table, value, row, col, radius)
+        return
+    row_dist = atlas.dist[row * cols + col]
+    for r in range(rows):
+        base = r * cols
+        table[r][:] = [abs(value - d) for d in row_dist[base:base + cols]]
+
+
+def populate_tabela(table):
+    """
+    Igual ao populate_tabela original: devolve (tabela com a distância de cada
+    célula ao zero mais próximo, número de zeros), ou (table, None) sem zeros
+    """
+    rows, cols = len(table), len(table[0])
+    atlas = get_atlas(rows, cols)
+    zeros = [r * cols + c for r in range(rows) for c in range(cols) if table[r][c] == 0]
+    if not zeros:
+        return table, None
+    if len(zeros) == 1:
+        flat = atlas.dist[zeros[0]]
+    else:
+        flat = list(map(min, *[atlas.dist[z] for z in zeros]))
+    return [flat[r * cols:(r + 1) * cols] for r in range(rows)], len(zeros)
+
+
+# -------------------------------
+# Versões de referência (ciclos originais), para validação e benchmarks
+# -------------------------------
+def _disperse_table_ref(table, value, row, col, radius=6):
+    for r in range(row - radius, row + radius + 1):
+        for c in range(col - radius, col + radius + 1):
+            if 0 <= r < len(table) and 0 <= c < len(table[0]):
+                distance = abs(r - row) + abs(c - col)
+                table[r][c] = abs(value - distance)
+
+
+def _populate_tabela_ref(table):
+    aux_tables = []
+    zeros = 0
+    for row in range(len(table)):
+        for col in range(len(table[0])):
+            if table[row][col] == 0:
+                zeros += 1
+                temp_table = [[None] * len(table[0]) for _ in range(len(table))]
+                _disperse_table_ref(temp_table, 0, row, col)
+                aux_tables.append(temp_table)
+    if aux_tables:
+        result_table = aux_tables[0]
+        for i in range(1, len(aux_tables)):
+            for row in range(len(result_table)):
+                for col in range(len(result_table[0])):
+                    if result_table[row][col] > aux_tables[i][row][col]:
+                        result_table[row][col] = aux_tables[i][row][col]
+        return result_table, zeros
+    return table, None
+
+
+def _bench():
+    import random
+    import timeit
+
+    rng = random.Random(0)
+    cases = []
+    for _ in range(200):
+        table = [[None] * 6 for _ in range(6)]
+        _disperse_table_ref(table, rng.randint(1, 10), rng.randrange(6), rng.randrange(6))
+        cases.append(table)
+
+    # Os resultados têm de ser idênticos
+    for table in cases:
+        for row in range(6):
+            for col in range(6):
+                a = [r[:] for r in table]
+                b = [r[:] for r in table]
+                _disperse_table_ref(a, 4, row, col)
+                disperse_table(b, 4, row, col)
+                assert a == b
+        assert _populate_tabela_ref([r[:] for r in table]) == populate_tabela([r[:] for r in table])
+
+    table = [[None] * 6 for _ in range(6)]
+    ref = timeit.timeit(lambda: _disperse_table_ref(table, 5, 2, 3), number=20000)
+    fast = timeit.timeit(lambda: disperse_table(table, 5, 2, 3), number=20000)
+    print(f"disperse_table: {1e6 * ref / 20000:.2f} us -> {1e6 * fast / 20000:.2f} us ({ref / fast:.1f}x)")
+    for zeros in (1, 4, 10):
+        table = [[None] * 6 for _ in range(6)]
+        for cell in random.Random(zeros).sample(range(36), zeros):
+            table[cell // 6][cell % 6] = 0
+        ref = timeit.timeit(lambda: _populate_tabela_ref([r[:] for r in table]), number=5000)
+        fast = timeit.timeit(lambda: populate_tabela([r[:] for r in table]), number=5000)
+        print(f"populate_tabela ({zeros} zeros): {1e6 * ref / 5000:.2f} us -> "
+              f"{1e6 * fast / 5000:.2f} us ({ref / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    _bench()
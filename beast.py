@@ -1,11 +1,22 @@
 from pybricks.hubs import EV3Brick
 from pybricks.ev3devices import (Motor, TouchSensor, ColorSensor, UltrasonicSensor)
 from pybricks.parameters import Port, Stop, Color
-from pybricks.tools import wait
+from pybricks.tools import wait, StopWatch
 from pybricks.robotics import DriveBase
-from collections import deque
+from abertura import Abertura, observacao
+from bitboard import bit
+from bolor import get_tabela_bolor
+from custo import RUMOS, Custo
+from isca import Isca
+from localizador import LocalizadorManteiga, LocalizadorTorradeira
+from mcts import Mcts
+from paredes import MapaParedes
+from planeador import Planeador
+from politica import Politica
+from tablebase import get_regresso
 
 import os
+import random
 from sys import exit
 import time
 
@@ -34,8 +45,40 @@ ambient = {
     "casa": Color.BLACK,
 }
 
+# Deslocamento (linha, coluna) de cada jogada
+JOGADAS = {'w': (-1, 0), 's': (1, 0), 'a': (0, -1), 'd': (0, 1)}
+
+# Estratégia das jogadas: 'heuristica' (_evaluate_move), 'pesquisa' (planeador),
+# 'mcts' (Monte Carlo com cenários amostrados) ou 'tempo' (planeador que conta
+# os segundos de robot de cada jogada, custo.json, e salta leituras inúteis)
+ESTRATEGIA = 'heuristica'
+PROFUNDIDADE = 4
+ORCAMENTO = 2  # segundos por decisão do planeador / mcts
+# Levar o bolor à torradeira (isca.Isca) quando a torradeira está localizada
+ISCA = True
+# Andar várias casas a direito sem parar quando o regresso ou a isca seguem na mesma direção
+RETAS = True
+# Registo dos segundos de cada fase (leitura, conducao, rotacao, jogada) para
+# calibrar o custo.json com jogos no brick: python custo.py calibrar --log fases.log
+# (None não regista)
+REGISTO = 'fases.log'
+
+cronometro = StopWatch()
+_nas_fases = 0  # ms registados nas fases; o resto de cada volta do jogo são pausas
+
+
+def registar(fase, inicio, vezes=1):
+    """Linha 'fase segundos vezes' no REGISTO com o tempo desde inicio (ms do cronómetro)"""
+    global _nas_fases
+    ms = cronometro.time() - inicio
+    _nas_fases += ms
+    if REGISTO is not None:
+        with open(REGISTO, 'a') as f:
+            f.write(fase + ' ' + str(ms / 1000) + ' ' + str(vezes) + '\n')
+
 
 def get_distance(text):
+    inicio = cronometro.time()
     has_found = False
     distance = 0
     colors_shown = set()
@@ -66,6 +109,7 @@ def get_distance(text):
         wait(1000)
 
     ev3.screen.clear()
+    registar('leitura', inicio)
     return distance if has_found else None
 
 def wait_to_drive(distance, speed=40):
@@ -73,6 +117,7 @@ def wait_to_drive(distance, speed=40):
     robot.stop()
 
 def andar_casa():
+    inicio = cronometro.time()
     robot.drive(40, 0)
     while True:
         currentColor = color_sensor.color()
@@ -80,11 +125,44 @@ def andar_casa():
             robot.stop()
             backward(35)
             wait(500)
+            registar('conducao', inicio)
             return False
         elif currentColor == ambient["casa"]: # Encontrou próxima - verificar objetos
             wait_to_drive(170)
+            registar('conducao', inicio)
             return True
 
+def andar_casas(casas, ao_passar=None):
+    """
+    Anda casas casas a direito sem parar nas fitas pretas do meio: conta as
+    fitas quando o sensor entra nelas e chama ao_passar(passadas) a cada
+    uma, com o robot a andar; se devolver False o robot pára no centro
+    dessa casa. Pára no centro da última casa, ou recua numa barreira.
+    Returns: número de casas andadas
+    """
+    inicio = cronometro.time()
+    robot.drive(40, 0)
+    passadas = 0
+    na_fita = False
+    while True:
+        currentColor = color_sensor.color()
+        if currentColor == ambient["barreira"]: # Encontrou barreira - voltar para tras
+            robot.stop()
+            backward(35)
+            wait(500)
+            registar('conducao', inicio, max(passadas, 1))
+            return passadas
+        elif currentColor == ambient["casa"]:
+            if not na_fita:
+                passadas += 1
+                if passadas == casas or (ao_passar is not None and not ao_passar(passadas)):
+                    wait_to_drive(170)
+                    registar('conducao', inicio, passadas)
+                    return passadas
+            na_fita = True
+        else:
+            na_fita = False
+
 # Funções de movimento
 def forward(distance):
     robot.straight(distance)
@@ -93,10 +171,14 @@ def backward(distance):
     robot.straight(-distance)
 
 def turn_left():
+    inicio = cronometro.time()
     robot.turn(-78)
+    registar('rotacao', inicio)
 
 def turn_right():
+    inicio = cronometro.time()
     robot.turn(78)
+    registar('rotacao', inicio)
 
 
 
@@ -104,104 +186,6 @@ def turn_right():
 
 
 
-def has_numbers(table):
-    return any(cell is not None for row in table for cell in row)
-
-def disperse_table(table, value, row, col, radius=6):
-    for r in range(row - radius, row + radius + 1):
-        for c in range(col - radius, col + radius + 1):
-            # Verificar limites da tabela
-            if 0 <= r < len(table) and 0 <= c < len(table[0]):
-                # Calcular a distância de Manhattan
-                distance = abs(r - row) + abs(c - col)
-                # Valor decrementado com base na distância
-                decremented_value = abs(value - distance)
-
-                table[r][c] = decremented_value
-
-def filter_table(table1, table2):
-    """
-    Guarda os valores iguais nas duas tabelas e None nos outros      
-    """
-    for row in range(len(table1)):
-        for col in range(len(table1[0])):
-            if table1[row][col] != table2[row][col] and table1[row][col] != float('inf'):
-                table1[row][col] = None
-
-def filter_table_min(table1, table2):
-    """
-    Mantém os menores valores entre duas tabelas  
-    """
-    for row in range(len(table1)):
-        for col in range(len(table1[0])):
-            if table1[row][col] > table2[row][col]:
-                table1[row][col] = table2[row][col]     
-def count_zeros(table):
-    count = 0
-    for row in range(len(table)):
-        for col in range(len(table[0])):
-            if table[row][col] == 0:
-                count += 1
-    return count
-
-def populate_tabela(table):
-    aux_tables = []
-    zeros = 0
-    for row in range(len(table)):
-        for col in range(len(table[0])):
-            if table[row][col] == 0:
-                zeros += 1
-                temp_table = [[None] * len(table[0]) for _ in range(len(table))]
-                disperse_table(temp_table, 0, row, col)
-                aux_tables.append(temp_table)
-
-    if aux_tables:
-        result_table = aux_tables[0]
-        for i in range(1, len(aux_tables)):
-            filter_table_min(result_table, aux_tables[i])
-        return result_table, zeros
-    return table, None
-
-def get_zero(table):
-    for row in range(len(table)):
-        for col in range(len(table[0])):
-            if table[row][col] == 0:
-                return row, col
-
-def find_nearest_zero(table, start_row, start_col):
-    """
-    Finds the nearest zero in a 6x6 table from the given row and column.
-    Uses Breadth-First Search (BFS) to determine the shortest distance.
-    """
-    rows, cols = len(table), len(table[0])
-    visited = [[False] * cols for _ in range(rows)]
-    queue = deque([(start_row, start_col, 0)])  # (row, col, distance)
-
-    while queue:
-        row, col, distance = queue.popleft()
-
-        # Check boundaries and if already visited
-        if row < 0 or col < 0 or row >= rows or col >= cols or visited[row][col]:
-            continue
-
-        # Mark as visited
-        visited[row][col] = True
-
-        # Check if the current cell is a 0
-        if table[row][col] == 0:
-            return (row, col, distance)
-
-        # Add neighbors to the queue
-        queue.extend([
-            (row - 1, col, distance + 1),  # Up
-            (row + 1, col, distance + 1),  # Down
-            (row, col - 1, distance + 1),  # Left
-            (row, col + 1, distance + 1)   # Right
-        ])
-
-    # If no zero is found
-    return None
-
 def print_table(table, table_name):
     """
     Imprime uma tabela 6x6 com formatação adequada
@@ -229,75 +213,6 @@ def print_table(table, table_name):
         print()  # Nova linha no final de cada row
     print()  # Linha extra no final da tabela
 
-# def populate_torradeira(table, row, col, inf=False):
-#     if inf:
-#         table[row][col] = float('inf')
-#         if 0 <= row - 1 < len(table) and table[row - 1][col] == 0:
-#             table[row - 1][col] = float('inf')
-#         if 0 <= row + 1 < len(table) and table[row + 1][col] == 0:
-#             table[row + 1][col] = float('inf')
-#         if 0 <= col - 1 < len(table[0]) and table[row][col - 1] == 0:
-#             table[row][col - 1] = float('inf')
-#         if 0 <= col + 1 < len(table[0]) and table[row][col + 1] == 0:
-#             table[row][col + 1] = float('inf')
-#     else:
-#         table[row][col] = 1
-#         if 0 <= row - 1 < len(table) and table[row - 1][col] is None:
-#             table[row - 1][col] = 0
-#         if 0 <= row + 1 < len(table) and table[row + 1][col] is None:
-#             table[row + 1][col] = 0
-#         if 0 <= col - 1 < len(table[0]) and table[row][col - 1] is None:
-#             table[row][col - 1] = 0
-#         if 0 <= col + 1 < len(table[0]) and table[row][col + 1] is None:
-#             table[row][col + 1] = 0
-
-def populate_torradeira(table, row, col, inf=False):
-    """
-    Enhanced population of heat matrix that better tracks possible toaster locations
-    Args:
-        table: The heat matrix
-        row, col: Current robot position
-        inf: Whether to mark impossible locations
-    """
-    if inf:
-        # Mark current position and adjacents as impossible toaster locations
-        table[row][col] = float('inf')
-        
-        # Only mark adjacent positions as impossible if they haven't been confirmed as hot
-        adjacent_positions = [
-            (row - 1, col), (row + 1, col),
-            (row, col - 1), (row, col + 1)
-        ]
-        
-        for adj_row, adj_col in adjacent_positions:
-            if 0 <= adj_row < len(table) and 0 <= adj_col < len(table[0]):
-                if table[adj_row][adj_col] == 0:  # Only if it's marked as possible
-                    table[adj_row][adj_col] = float('inf')
-    else:
-        # We found a hot spot
-        table[row][col] = 1
-        
-        # Mark adjacent positions as potential toaster locations
-        adjacent_positions = [
-            (row - 1, col), (row + 1, col),
-            (row, col - 1), (row, col + 1)
-        ]
-        
-        for adj_row, adj_col in adjacent_positions:
-            if 0 <= adj_row < len(table) and 0 <= adj_col < len(table[0]):
-                if table[adj_row][adj_col] is None:
-                    table[adj_row][adj_col] = 0  # Potential toaster location
-
-
-
-
-
-
-
-
-
-
-
 class Cerebro:
     def __init__(self):
         self.size = 6
@@ -312,115 +227,99 @@ class Cerebro:
         
         # Matrizes de distância e calor
         self.distancia_manteiga = [[None] * self.size for _ in range(self.size)]
+        self.localizador_manteiga = LocalizadorManteiga(self.size, self.size)
         self.known_manteiga = None #{'row': None, 'col': None}
         self.calor_torradeira = [[None] * self.size for _ in range(self.size)]
+        self.localizador_torradeira = LocalizadorTorradeira(self.size, self.size)
+        self.tabela_bolor = get_tabela_bolor(self.size, self.size)
+        self.regresso = get_regresso()
+        self.custo = Custo.carregar() if ESTRATEGIA == 'tempo' else None
+        self.saltar_leituras = ESTRATEGIA == 'tempo'
+        self.rumo = 's'  # para onde o robot está virado (começa virado para baixo)
+        self.graus_rodados = 0  # graus pedidos ao turn neste jogo
+        self._pendente = False  # passo do bolor da última casa passada numa reta, por fazer
+        if ESTRATEGIA == 'pesquisa':
+            self.planeador = Planeador(PROFUNDIDADE, ORCAMENTO, self.size, self.size)
+        elif ESTRATEGIA == 'tempo':
+            self.planeador = Planeador(PROFUNDIDADE, ORCAMENTO, self.size, self.size, self.custo)
+        else:
+            self.planeador = None
+        self.mcts = Mcts(orcamento=ORCAMENTO, rows=self.size, cols=self.size) if ESTRATEGIA == 'mcts' else None
+        # Heurística compilada (python politica.py compilar), só para a heurística por omissão
+        self.politica = Politica.carregar(avaliador='beast') if ESTRATEGIA == 'heuristica' else None
+        # Livro de aberturas (python abertura.py gerar), pela sequência de observações
+        self.abertura = Abertura.carregar()
+        self.observacoes = []
+        self.isca = Isca(rows=self.size, cols=self.size) if ISCA else None
         self.known_torradeira = None #{'row': None, 'col': None}
         
         self.last_positions = []
+        self.visitadas = 0  # bitboard das posições em last_positions
 
         self.manteiga_strat = True
 
-        self.discovered_barriers = set()
+        self.paredes_descobertas = MapaParedes(self.size, self.size)
     
     def find_toaster_position(self):
         """
-        Advanced method to find toaster position based on heat patterns
+        Toaster position from the heat observations (LocalizadorTorradeira)
         Returns: Dictionary with row and col if found, None otherwise
         """
-        # If we already found the toaster
-        if hasattr(self, 'known_torradeira') and self.known_torradeira:
+        if self.known_torradeira:
             return self.known_torradeira
+        self.known_torradeira = self.localizador_torradeira.posicao()
+        return self.known_torradeira
 
-        # Count cells marked as possible toaster locations (0s)
-        zero_count = sum(1 for row in self.calor_torradeira 
-                        for cell in row if cell == 0)
-
-        # If only one possible location remains
-        if zero_count == 1:
-            for row in range(len(self.calor_torradeira)):
-                for col in range(len(self.calor_torradeira[0])):
-                    if self.calor_torradeira[row][col] == 0:
-                        self.known_torradeira = {'row': row, 'col': col}
-                        return self.known_torradeira
-
-        # If we found multiple hot spots, try to triangulate
-        hot_spots = []
-        for row in range(len(self.calor_torradeira)):
-            for col in range(len(self.calor_torradeira[0])):
-                if self.calor_torradeira[row][col] == 1:
-                    hot_spots.append((row, col))
-
-        if len(hot_spots) >= 2:
-            # Find intersection of possible toaster locations from multiple hot spots
-            possible_locations = set()
-            for hot_row, hot_col in hot_spots:
-                current_possible = set()
-                # Add adjacent positions
-                adjacent_positions = [
-                    (hot_row - 1, hot_col), (hot_row + 1, hot_col),
-                    (hot_row, hot_col - 1), (hot_row, hot_col + 1)
-                ]
-                for adj_row, adj_col in adjacent_positions:
-                    if (0 <= adj_row < len(self.calor_torradeira) and 
-                        0 <= adj_col < len(self.calor_torradeira[0]) and
-                        self.calor_torradeira[adj_row][adj_col] == 0):
-                        current_possible.add((adj_row, adj_col))
-                
-                if not possible_locations:
-                    possible_locations = current_possible
-                else:
-                    possible_locations &= current_possible
-
-            # If we found exactly one intersection point
-            if len(possible_locations) == 1:
-                row, col = possible_locations.pop()
-                self.known_torradeira = {'row': row, 'col': col}
-                return self.known_torradeira
-
-        return None
     def update_toaster_knowledge(self):
         """
         Main method to update toaster knowledge after each move
+        Returns: the heat reading, or None if there was none
         """
+        if self.known_torradeira is not None:
+            return None
+        # Sem paragem para ler quando a leitura não pode mudar os candidatos
+        if self.saltar_leituras and not self.localizador_torradeira.informativa(self.robot_pos['row'],
+                                                                                self.robot_pos['col']):
+            return None
         dist_torradeira = get_distance("Distância da Torradeira")
-        
-        # Update heat matrix based on current position
-        if dist_torradeira <= 1:
-            populate_torradeira(self.calor_torradeira, self.robot_pos['row'], self.robot_pos['col'])
-        else:
-            populate_torradeira(self.calor_torradeira, self.robot_pos['row'], self.robot_pos['col'], True)
+        if dist_torradeira is None:
+            return None
+
+        # Update the toaster belief with the reading at the current position
+        self.localizador_torradeira.observar(self.robot_pos['row'], self.robot_pos['col'], dist_torradeira)
+        self.calor_torradeira = self.localizador_torradeira.tabela()
         
         # Try to find toaster position
         toaster_pos = self.find_toaster_position()
         
         if toaster_pos:
             print(f"\nToaster found at position: ({toaster_pos['row']}, {toaster_pos['col']})")
+        return dist_torradeira
             
     def update_matrices(self):
-        aux = [[None] * 6 for _ in range(6)]
-
-        # Atualizar matriz de distância da manteiga apenas se ainda não foi pega
-        if self.known_manteiga is None and not self.has_butter:
+        """Leituras na casa atual (e a observação do turno para o livro de aberturas)"""
+        leitura = None
+        # Atualizar a localização da manteiga apenas se ainda não foi pega
+        # Sem paragem para ler quando a leitura não pode eliminar candidatos
+        if (self.known_manteiga is None and not self.has_butter and
+                self.localizador_manteiga.informativa(self.robot_pos['row'], self.robot_pos['col'])):
             dist_manteiga = get_distance("Distância da Manteiga")
 
             if dist_manteiga:
-                if has_numbers(self.distancia_manteiga):
-                    disperse_table(aux, dist_manteiga, self.robot_pos['row'], self.robot_pos['col'])
-                    filter_table(self.distancia_manteiga, aux)
-                    self.distancia_manteiga, possible_zeros_manteiga = populate_tabela(self.distancia_manteiga)
-                    if possible_zeros_manteiga == 1:
-                        krow, kcol = get_zero(self.distancia_manteiga)
-                        self.known_manteiga = {'row': krow, 'col': kcol}
-                else:
-                    disperse_table(self.distancia_manteiga, dist_manteiga, self.robot_pos['row'], self.robot_pos['col'])
+                leitura = dist_manteiga
+                self.localizador_manteiga.observar(self.robot_pos['row'], self.robot_pos['col'], dist_manteiga)
+                self.distancia_manteiga = self.localizador_manteiga.tabela()
+                if self.known_manteiga is None:
+                    self.known_manteiga = self.localizador_manteiga.posicao()
         
         # Atualizar matriz de calor da torradeira
-        self.update_toaster_knowledge()
+        calor = self.update_toaster_knowledge()
+        cell = self.robot_pos['row'] * self.size + self.robot_pos['col']
+        self.observacoes.append(observacao(cell, leitura, calor, self.paredes_descobertas.mascaras[cell]))
 
     def can_move(self, from_pos, to_pos):
         """Verifica se o movimento entre duas posições é permitido"""
-        barrier = (from_pos, to_pos)
-        return barrier not in self.discovered_barriers
+        return self.paredes_descobertas.can_move(from_pos, to_pos)
 
 
     def print_matrices(self):
@@ -436,6 +335,48 @@ class Cerebro:
         - Mold (bolor) position
         Returns: 'w', 'a', 's', or 'd'
         """
+        # Regresso a casa: jogada ótima da tablebase quando há vitória forçada
+        if self.has_butter:
+            move = self.regresso.jogada_de(self)
+            if move is not None:
+                return move, False
+
+        # Isca: sequência mais curta que leva o bolor à torradeira
+        if self.isca is not None:
+            move = self.isca.jogada(self)
+            if move is not None:
+                return move, False
+
+        # Livro de aberturas: primeiros turnos pela sequência de observações
+        if self.abertura is not None:
+            row, col = self.robot_pos['row'], self.robot_pos['col']
+            move = self.abertura.jogada(self.observacoes, row, col,
+                                        self.paredes_descobertas.mascaras[row * self.size + col])
+            if move is not None:
+                return move, False
+
+        # Uma consulta à política compilada em vez das avaliações; estados fora da tabela avaliam ao vivo
+        if self.politica is not None:
+            decisao = self.politica.jogada(self)
+            if decisao is not None:
+                return decisao
+
+        if self.planeador is not None:
+            move = self.planeador.jogada(self)
+            if move is not None:
+                return move, False
+
+        if self.mcts is not None:
+            move = self.mcts.jogada(self)
+            if move is not None:
+                stats = self.mcts.ultima
+                print("MCTS:", stats['rollouts'], "rollouts,", stats['visitas'])
+                return move, False
+
+        return self.avaliar_jogadas()
+
+    def avaliar_jogadas(self):
+        """A jogada do _evaluate_move (a melhor das possíveis): (jogada, mudar de estratégia)"""
         possible_moves = []
         current_row, current_col = self.robot_pos['row'], self.robot_pos['col']
         directions = [('w', -1, 0), ('s', 1, 0), ('a', 0, -1), ('d', 0, 1)]
@@ -459,16 +400,28 @@ class Cerebro:
         time.sleep(1)
         # If no valid moves, return random move
         if not possible_moves:
-            return random.choice(['w', 'a', 's', 'd'])
+            return random.choice(['w', 'a', 's', 'd']), False
         
         # Return move with highest score
         val = max(possible_moves, key=lambda x: x[1])
         return val[0], val[2]
 
+    def pode_andar(self, direction):
+        """Se a jogada fica no tabuleiro e não atravessa uma barreira conhecida"""
+        row, col = self.robot_pos['row'], self.robot_pos['col']
+        new_row, new_col = row + JOGADAS[direction][0], col + JOGADAS[direction][1]
+        return (0 <= new_row < self.size and 0 <= new_col < self.size and
+                self.can_move((row, col), (new_row, new_col)))
+
 
     def move_robot(self, direction, strat):
+        """
+        Anda na direção da jogada: uma casa, ou várias a direito quando o plano
+        as garante (casas_seguidas). Returns: casas andadas (0 se não andou);
+        o passo do bolor da última casa fica para o ciclo do jogo
+        """
         if self.game_over:
-            return False
+            return 0
 
         new_row, new_col = self.robot_pos['row'], self.robot_pos['col']
 
@@ -487,58 +440,154 @@ class Cerebro:
             if not self.can_move((self.robot_pos['row'], self.robot_pos['col']), 
                                (new_row, new_col)):
                 print("\nBarreira! Não é possível mover nessa direção.")
-                return False
+                return 0
 
 
-            # MUDAR  -   ANDAR COM O ROBOT E FAZER VER SE BATEU NUMA BARREIRA, DAR RETURN FALSE E ADICIONAR A BARREIRA AO self.discovered_barriers
-            if direction == 'w':
-                turn_left()
-                turn_left()
-            elif direction == 's':  # baixo
-                # do nothing
-                pass
-            elif direction == 'a':  # esquerda
-                turn_left()
-            elif direction == 'd':  # direita
-                turn_right()
-        
-            val = andar_casa()
-            if direction == 'w':
-                turn_left()
-                turn_left()
-            elif direction == 's':  # baixo
-                # do nothing
-                pass
-            elif direction == 'a':  # esquerda
-                turn_right()
-            elif direction == 'd':  # direita
-                turn_left()
-            if not val:
+            # O robot fica virado para a direção da jogada (a próxima só roda o que falta)
+            self.rodar_para(direction)
+            casas = self.casas_seguidas(direction) if RETAS else 1
+            if casas == 1:
+                andadas = 1 if andar_casa() else 0
+            else:
+                self._pendente = False
+                andadas = andar_casas(casas, lambda passadas: self._passar(direction))
+            if andadas < casas:
+                if self.game_over:
+                    return andadas
                 #FOUND BARREIR
-                self.discovered_barriers.add(((self.robot_pos['row'], self.robot_pos['col']), (new_row, new_col)))
-                return False
-            
+                row, col = self.robot_pos['row'], self.robot_pos['col']
+                dr, dc = JOGADAS[direction]
+                self.paredes_descobertas.bloquear_entre((row, col), (row + dr, col + dc))
+                # A pancada também é uma observação (e tira o jogo do livro de aberturas)
+                self.observacoes.append('x' + direction)
+                # Numa reta as casas antes da barreira já contam (o bolor da última fica para o ciclo)
+                self._pendente = False
+                return andadas
+            if self._pendente:
+                self._pendente = False
+                self.move_bolor()
+                if self.game_over:
+                    return andadas - 1
 
             # Verificar se está na torradeira
             # if new_row == self.torradeira_pos['row'] and new_col == self.torradeira_pos['col']:
             #     self.skip = True
 
-            self.robot_pos['row'] = new_row
-            self.robot_pos['col'] = new_col
-
-            self.last_positions.append((new_row, new_col))
-
             if strat:
                 self.manteiga_strat = False
                 print("Mudar estratégia-------------")
                 time.sleep(1)
 
+            self._entrar(direction)
+            return andadas
+        return 0
+
+    def _entrar(self, direction, ler=True):
+        """
+        O robot chegou à casa seguinte na direção: posição, histórico, leituras
+        (ler=False a meio de uma reta: só a observação, sem parar) e estado do jogo
+        """
+        dr, dc = JOGADAS[direction]
+        new_row, new_col = self.robot_pos['row'] + dr, self.robot_pos['col'] + dc
+        self.robot_pos['row'] = new_row
+        self.robot_pos['col'] = new_col
+
+        self.last_positions.append((new_row, new_col))
+        self.visitadas |= bit(new_row, new_col)
+
+        if ler:
             self.update_matrices()
+        else:
+            cell = new_row * self.size + new_col
+            self.observacoes.append(observacao(cell, None, None, self.paredes_descobertas.mascaras[cell]))
 
-            # Verificar vitória/derrota
-            self.check_game_state()
-            return True
-        return False
+        # Verificar vitória/derrota
+        self.check_game_state()
+
+    def _passar(self, direction):
+        """
+        Fita preta do meio de uma reta, com o robot a andar: o passo do bolor
+        da casa anterior e a entrada nesta. Returns: False para parar aqui
+        """
+        if self._pendente:
+            self.move_bolor()
+            if self.game_over:
+                return False
+        self._entrar(direction, False)
+        self._pendente = True
+        return not self.game_over
+
+    def casas_seguidas(self, direction):
+        """
+        Casas a andar a direito na direção da jogada: enquanto o plano (o
+        regresso da tablebase com a manteiga, ou a isca) continua na mesma
+        direção, sem passar pela manteiga conhecida nem por candidatos da
+        torradeira. As casas do meio não têm leituras: só passam por células
+        que as leituras já tiraram dos candidatos, onde a torradeira não está
+        e o bolor dá um só passo, como o plano conta. Uma barreira nova
+        obriga a parar e a planear outra vez
+        """
+        plano = self._plano()
+        if not plano or plano[0] != direction:
+            return 1
+        candidatos = self.localizador_torradeira.candidatos()
+        row, col = self.robot_pos['row'], self.robot_pos['col']
+        dr, dc = JOGADAS[direction]
+        casas = 1
+        while casas < len(plano) and plano[casas] == direction:
+            row, col = row + dr, col + dc
+            if (self.known_manteiga is not None and not self.has_butter and
+                    (row, col) == (self.known_manteiga['row'], self.known_manteiga['col'])):
+                break
+            if candidatos & bit(row, col):
+                break
+            casas += 1
+        return casas
+
+    def _plano(self):
+        """Jogadas seguintes do regresso (com a manteiga) ou da isca, pela ordem do get_autonomous_move"""
+        row, col = self.robot_pos['row'], self.robot_pos['col']
+        bolor_row, bolor_col = self.bolor_pos['row'], self.bolor_pos['col']
+        if self.has_butter and self.regresso.jogada_de(self) is not None:
+            torradeira = self.localizador_torradeira.candidatos()
+            plano = []
+            while (row, col) != (self.home_pos['row'], self.home_pos['col']) and len(plano) < 2 * self.size:
+                move = self.regresso.jogada(row, col, bolor_row, bolor_col, self.paredes_descobertas,
+                                            torradeira)
+                if move is None:
+                    break
+                plano.append(move)
+                row, col = row + JOGADAS[move][0], col + JOGADAS[move][1]
+                if torradeira & bit(row, col):
+                    if not self.localizador_torradeira.localizada():
+                        break  # o bolor dá um ou dois passos: o resto do plano depende disso
+                    bolor_row, bolor_col = self.tabela_bolor.mover(row, col, bolor_row, bolor_col)
+                bolor_row, bolor_col = self.tabela_bolor.mover(row, col, bolor_row, bolor_col)
+            return plano
+        if self.isca is not None and self.known_torradeira:
+            cols = self.size
+            plano = self.isca.procurar(row * cols + col, bolor_row * cols + bolor_col,
+                                       self.known_torradeira['row'] * cols + self.known_torradeira['col'],
+                                       self.paredes_descobertas)
+            return plano or []
+        return []
+
+    def rodar_para(self, direction):
+        """
+        Roda do rumo atual para a direção da jogada pelo lado mais curto.
+        Com o robot virado para baixo, o turn_right leva-o para a direita
+        ('s' -> 'd') e o turn_left para a esquerda ('s' -> 'a')
+        """
+        quartos = (RUMOS.index(direction) - RUMOS.index(self.rumo)) % 4
+        if quartos == 1:
+            turn_left()
+        elif quartos == 3:
+            turn_right()
+        elif quartos == 2:
+            turn_left()
+            turn_left()
+        self.graus_rodados += 78 * min(quartos, 4 - quartos)
+        self.rumo = direction
 
     def simulate_move_bolor(self, robot_row, robot_col, new_row=None, new_col=None):
         if self.game_over:
@@ -547,17 +596,8 @@ class Cerebro:
         if new_row is None or new_col is None:
             new_row, new_col = self.bolor_pos['row'], self.bolor_pos['col']
 
-        if robot_row < new_row:  # Vai andar para cima
-            new_row -= 1
-        elif robot_row > new_row:  # Vai andar para baixo
-            new_row += 1
-        elif robot_row == new_row:  # Vai andar para a esquerda/direita
-            if robot_col < new_col:
-                new_col -= 1
-            elif robot_col > new_col:
-                new_col += 1
-            
-        return new_row, new_col
+        # Linha primeiro, depois coluna, uma casa na direção do robot (tabela pré-calculada)
+        return self.tabela_bolor.mover(robot_row, robot_col, new_row, new_col)
 
 
     def move_bolor(self):
@@ -601,7 +641,9 @@ class Cerebro:
             return score, False
 
         # If using butter strategy and haven't got butter yet
-        elif self.manteiga_strat and not self.has_butter and self.known_manteiga is not None:
+        elif self.manteiga_strat and not self.has_butter:
+            # Evitar as células onde a torradeira pode estar (pisá-la gasta um turno)
+            score -= self.localizador_torradeira.penalizacao(new_row, new_col)
             if self.known_manteiga:
                 butter_distance = abs(new_row - self.known_manteiga['row']) + abs(new_col - self.known_manteiga['col'])
                 bolor_to_butter = abs(bolor_row - self.known_manteiga['row']) + abs(bolor_col - self.known_manteiga['col'])
@@ -615,13 +657,11 @@ class Cerebro:
                     change_start = True
                     score -= 35
             else:
-                # Look for nearest zero
-                nrow, ncol, distance = find_nearest_zero(self.distancia_manteiga, self.robot_pos['row'], self.robot_pos['col'])
-                if nrow is not None:
-                    crow, ccol, cdistance = find_nearest_zero(self.distancia_manteiga, new_row, new_col)
-                    if crow is not None:
-                        if cdistance < distance:
-                            score += 100
+                # Look for the nearest butter candidate
+                distance = self.localizador_manteiga.distancia_minima(self.robot_pos['row'], self.robot_pos['col'])
+                if distance is not None:
+                    if self.localizador_manteiga.distancia_minima(new_row, new_col) < distance:
+                        score += 100
 
         # Using toaster strategy
         else:
@@ -642,11 +682,12 @@ class Cerebro:
         if new_row == bolor_row and new_col == bolor_col:
             score -= 2000
 
-        # Penalize previously visited positions
-        for i in range(len(self.last_positions)):
-            if (new_row, new_col) == self.last_positions[i]:
-                score -= 5*i
-                break
+        # Penalize previously visited positions (the bitboard skips the scan for new cells)
+        if self.visitadas & bit(new_row, new_col):
+            for i in range(len(self.last_positions)):
+                if (new_row, new_col) == self.last_positions[i]:
+                    score -= 5*i
+                    break
 
         print(f"Score: {score}")
         return score, change_start
@@ -658,9 +699,13 @@ class Cerebro:
         """
         moves_count = 0
         max_moves = 100  # Prevent infinite loops
+
+        # Leituras iniciais na casa, como no setup_game do simulador
+        self.update_matrices()
         
         while not self.game_over and moves_count < max_moves:
-            self.display()
+            inicio, nas_fases = cronometro.time(), _nas_fases
+            self.print_matrices()
             time.sleep(1)  # Add delay to make movement visible
             
             # Get and execute best move
@@ -672,16 +717,27 @@ class Cerebro:
                 continue
 
             move, strat = self.get_autonomous_move()
-            if self.move_robot(move, strat):
+            if not self.pode_andar(move):
+                # Jogada do livro, da isca ou da política recusada antes de andar: decide o avaliador
+                print("\nJogada", move, "impossível daqui, a usar o avaliador")
+                move, strat = self.avaliar_jogadas()
+            possivel = self.pode_andar(move)
+            andadas = self.move_robot(move, strat)
+            if andadas:
                 self.move_bolor()
-                moves_count += 1
+                moves_count += andadas
                 wait(2000)
+                # O tempo da volta fora das fases: pausas e contas (a JOGADA do custo)
+                registar('jogada', inicio + _nas_fases - nas_fases, andadas)
+            elif not possivel:
+                moves_count += 1  # sem jogadas possíveis: o turno conta, para não ficar preso no ciclo
             
         if self.won:
             print("\nRobot wins!")
         else:
             print("\nGame Over! Mold wins!")
         print(f"Total moves: {moves_count}")
+        print(f"Graus rodados: {self.graus_rodados}")
         
     def check_game_state(self):
         # Check if robot reached butter
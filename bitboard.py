@@ -0,0 +1,175 @@
+"""
+Bitboards para a grelha 6x6: um conjunto de células é um int de 36 bits,
+com a célula (row, col) no bit row * 6 + col.
+
+Usado para os candidatos da manteiga e da torradeira, células visitadas e
+barreiras (uma máscara por direção: bit c ligado se a célula c tem barreira
+nessa direção). Só usa operações de inteiros, por isso corre também no EV3
+(MicroPython).
+"""
+
+SIZE = 6
+CELLS = SIZE * SIZE
+FULL = (1 << CELLS) - 1
+
+# Direções das máscaras de barreiras
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# Primeira e última coluna (para os shifts laterais não passarem de linha)
+COL_FIRST = 0
+COL_LAST = 0
+for _row in range(SIZE):
+    COL_FIRST |= 1 << (_row * SIZE)
+    COL_LAST |= 1 << (_row * SIZE + SIZE - 1)
+
+# Índice de cada bit isolado (MicroPython não tem int.bit_length)
+_INDEX = {1 << _i: _i for _i in range(CELLS)}
+
+
+def index(row, col):
+    return row * SIZE + col
+
+
+def bit(row, col):
+    return 1 << (row * SIZE + col)
+
+
+def row_col(i):
+    return i // SIZE, i % SIZE
+
+
+def popcount(x):
+    count = 0
+    while x:
+        x &= x - 1
+        count += 1
+    return count
+
+
+def lowest_bit(x):
+    """Bit mais baixo de x (0 se x for vazio)"""
+    return x & -x
+
+
+def lowest_index(x):
+    """Índice da célula do bit mais baixo de x, ou None se x for vazio"""
+    if not x:
+        return None
+    return _INDEX[x & -x]
+
+
+def cells(x):
+    """Índices das células de x, por ordem crescente (ordem das linhas)"""
+    result = []
+    while x:
+        low = x & -x
+        result.append(_INDEX[low])
+        x ^= low
+    return result
+
+
+# -------------------------------
+# Vizinhos por shifts
+# -------------------------------
+def shift_up(x):
+    return x >> SIZE
+
+
+def shift_down(x):
+    return (x << SIZE) & FULL
+
+
+def shift_left(x):
+    return (x & ~COL_FIRST) >> 1
+
+
+def shift_right(x):
+    return (x & ~COL_LAST) << 1
+
+
+def neighbors(x, walls=None):
+    """
+    Células a um passo de alguma célula de x.
+    walls: máscaras de barreiras (UP, DOWN, LEFT, RIGHT), ou None para ignorar
+    """
+    if walls is None:
+        return shift_up(x) | shift_down(x) | shift_left(x) | shift_right(x)
+    return (shift_up(x & ~walls[UP]) | shift_down(x & ~walls[DOWN]) |
+            shift_left(x & ~walls[LEFT]) | shift_right(x & ~walls[RIGHT]))
+
+
+def nearest(x, row, col, walls=None):
+    """
+    Procura a célula de x mais próxima de (row, col) expandindo anéis de vizinhos.
+    Returns: (row, col, distance), ou None se x for vazio
+    """
+    if not x:
+        return None
+    frontier = bit(row, col)
+    seen = frontier
+    distance = 0
+    while not frontier & x:
+        frontier = neighbors(frontier, walls) & ~seen
+        if not frontier:
+            return None
+        seen |= frontier
+        distance += 1
+    krow, kcol = row_col(lowest_index(frontier & x))
+    return krow, kcol, distance
+
+
+# -------------------------------
+# Barreiras
+# -------------------------------
+def walls_from_barriers(barriers):
+    """Converte um conjunto de pares ((row1, col1), (row2, col2)) nas 4 máscaras de direção"""
+    walls = [0, 0, 0, 0]
+    for (row1, col1), (row2, col2) in barriers:
+        walls[DELTAS.index((row2 - row1, col2 - col1))] |= bit(row1, col1)
+    return walls
+
+
+def blocked(walls, row, col, direction):
+    return bool(walls[direction] & bit(row, col))
+
+
+# -------------------------------
+# Conversão de/para as tabelas 6x6
+# -------------------------------
+def from_table(table, value=0):
+    """Máscara das células da tabela iguais a value"""
+    x = 0
+    for row in range(SIZE):
+        for col in range(SIZE):
+            if table[row][col] == value:
+                x |= bit(row, col)
+    return x
+
+
+def to_table(x, inside=0, outside=None):
+    """Tabela 6x6 com inside nas células de x e outside nas restantes (para o print_table)"""
+    table = [[outside] * SIZE for _ in range(SIZE)]
+    for i in cells(x):
+        row, col = row_col(i)
+        table[row][col] = inside
+    return table
+
+
+def distance_table(x, walls=None):
+    """
+    Tabela com a distância de cada célula à célula de x mais próxima
+    (o mesmo que o populate_tabela quando x são os zeros da tabela)
+    """
+    table = [[None] * SIZE for _ in range(SIZE)]
+    frontier = x
+    seen = x
+    distance = 0
+    while frontier:
+        for i in cells(frontier):
+            row, col = row_col(i)
+            table[row][col] = distance
+        frontier = neighbors(frontier, walls) & ~seen
+        seen |= frontier
+        distance += 1
+    return table
@@ -0,0 +1,118 @@
+"""
+Tabela de transições do bolor e oráculo de captura.
+
+O bolor é determinístico: anda uma casa na direção do robot, primeiro na
+linha e só depois na coluna, e ignora as barreiras. passo[robot][bolor] é a
+nova célula do bolor depois de o robot estar em robot (índices row * cols + col),
+construída uma vez por tamanho de tabuleiro como o atlas.
+
+Sobre a tabela:
+- captura(bolor, caminho): em que turno o bolor apanha um robot que segue o caminho
+- chegada(robot, bolor, alvo): primeiro turno em que o bolor pode estar em alvo,
+  escolhendo o robot as jogadas (pesquisa em largura sobre os pares robot/bolor,
+  guardada em cache por estado inicial)
+"""
+from bitboard import DELTAS
+
+_tabelas = {}
+
+
+class TabelaBolor:
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.passo = []
+        for robot in range(self.cells):
+            rrow, rcol = robot // cols, robot % cols
+            linha = []
+            for bolor in range(self.cells):
+                brow, bcol = bolor // cols, bolor % cols
+                if rrow < brow:
+                    brow -= 1
+                elif rrow > brow:
+                    brow += 1
+                elif rcol < bcol:
+                    bcol -= 1
+                elif rcol > bcol:
+                    bcol += 1
+                linha.append(brow * cols + bcol)
+            self.passo.append(linha)
+        # Células vizinhas de cada célula (jogadas do robot, sem barreiras)
+        self.vizinhos = []
+        for cell in range(self.cells):
+            row, col = cell // cols, cell % cols
+            self.vizinhos.append([(row + dr) * cols + col + dc for dr, dc in DELTAS
+                                  if 0 <= row + dr < rows and 0 <= col + dc < cols])
+        self._chegadas = {}
+
+    def mover(self, robot_row, robot_col, bolor_row, bolor_col):
+        """simulate_move_bolor: (row, col) do bolor depois de um passo"""
+        cell = self.passo[robot_row * self.cols + robot_col][bolor_row * self.cols + bolor_col]
+        return cell // self.cols, cell % self.cols
+
+    def seguir(self, bolor, caminho):
+        """Células do bolor depois de cada célula do caminho do robot"""
+        posicoes = []
+        for robot in caminho:
+            bolor = self.passo[robot][bolor]
+            posicoes.append(bolor)
+        return posicoes
+
+    def captura(self, bolor, caminho):
+        """
+        Turno (1 = primeira célula do caminho) em que o bolor apanha o robot,
+        quer o robot entre na célula do bolor quer o bolor entre na do robot.
+        Returns: None se o robot sobrevive ao caminho todo
+        """
+        for turno, robot in enumerate(caminho, 1):
+            if robot == bolor:
+                return turno
+            bolor = self.passo[robot][bolor]
+            if robot == bolor:
+                return turno
+        return None
+
+    def chegadas(self, robot, bolor, paredes=None):
+        """
+        Lista com o primeiro turno em que o bolor pode estar em cada célula
+        (None se nunca), com o robot a escolher jogadas que não o deixam ser
+        apanhado. paredes: MapaParedes opcional para as jogadas do robot.
+        """
+        key = (robot, bolor)
+        if paredes is None and key in self._chegadas:
+            return self._chegadas[key]
+        turnos = [None] * self.cells
+        turnos[bolor] = 0
+        vistos = {key}
+        frente = [key]
+        turno = 0
+        while frente:
+            turno += 1
+            seguinte = []
+            for r, b in frente:
+                for n in (self.vizinhos[r] if paredes is None else paredes.neighbors(r)):
+                    if n == b:
+                        continue
+                    nb = self.passo[n][b]
+                    if nb == n or (n, nb) in vistos:
+                        continue
+                    vistos.add((n, nb))
+                    seguinte.append((n, nb))
+                    if turnos[nb] is None:
+                        turnos[nb] = turno
+            frente = seguinte
+        if paredes is None:
+            self._chegadas[key] = turnos
+        return turnos
+
+    def chegada(self, robot, bolor, alvo, paredes=None):
+        """Primeiro turno em que o bolor pode chegar a alvo (None se não pode)"""
+        return self.chegadas(robot, bolor, paredes)[alvo]
+
+
+def get_tabela_bolor(rows=6, cols=6):
+    tabela = _tabelas.get((rows, cols))
+    if tabela is None:
+        tabela = _tabelas[(rows, cols)] = TabelaBolor(rows, cols)
+    return tabela
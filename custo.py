@@ -0,0 +1,221 @@
+"""
+Modelo de custo das jogadas em segundos de robot.
+
+No robot as jogadas não custam todas o mesmo: o move_robot do beast.py roda
+do rumo em que está para a direção da jogada, anda uma casa (andar_casa) e
+depois pára para ler a manteiga e a torradeira (get_distance) quando a
+leitura ainda pode mudar a crença. O Custo dá a duração de cada uma
+destas ações. A estratégia 'tempo' usa-o de duas formas: o planeador
+(planeador.Planeador com custo) desconta os segundos de cada jogada em vez
+de contar só casas, e as leituras da torradeira que não podem mudar os
+candidatos (LocalizadorTorradeira.informativa) são saltadas, como já eram
+as da manteiga.
+
+As durações são a média de segundos por vez de cada fase. A calibração que
+conta é a do registo do brick: o beast.py acrescenta ao fases.log (REGISTO)
+os segundos de cada leitura, condução e rotação e as pausas de cada jogada,
+e calibrar --log ajusta o custo a esse ficheiro. Sem registo calibra com
+jogos do beast.py no pybricks falso (virtual.py), mas aí os tempos são os
+das constantes do simulador (a rotação, 0.87 s, é GRAUS_QUARTO 78 a
+VELOCIDADE_RODAR 90 graus/s de ev3_virtual/pybricks/robotics.py): serve para
+testar o caminho, não mede o robot, e a comparação tempo/pesquisa com esses
+valores não diz nada sobre o brick.
+O custo.json guardado é lido pelo robot (Custo.carregar); sem ficheiro ficam
+os valores por omissão, que ainda são marcadores de lugar tirados do
+simulador, à espera de uma calibração com o registo do brick.
+
+Rumos: letras das jogadas, com RUMOS pela ordem dos ponteiros do relógio no
+tabuleiro (direita, baixo, esquerda, cima).
+
+Uso:
+    python custo.py calibrar --log fases.log [--saida custo.json]
+    python custo.py calibrar --games 40 --seed 1   (pybricks falso)
+    python custo.py comparar --games 400 --seed 2 --virtuais 30
+"""
+import json
+
+try:
+    import os
+    CAMINHO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'custo.json')
+except (ImportError, NameError, AttributeError):
+    CAMINHO = 'custo.json'  # MicroPython: relativo à pasta do projeto
+
+RUMOS = 'dsaw'
+
+# Segundos por omissão: marcadores de lugar do pybricks falso (python custo.py
+# calibrar --games 40 --seed 1), não medidos no robot
+ROTACAO = 0.87   # um turn_left / turn_right
+CASA = 8.25      # um andar_casa
+LEITURA = 6.24   # um get_distance
+JOGADA = 3.77    # pausas fixas de cada jogada (wait e sleep do ciclo do jogo)
+
+
+class Custo:
+    def __init__(self, rotacao=ROTACAO, casa=CASA, leitura=LEITURA, jogada=JOGADA, regressa=False):
+        """
+        rotacao, casa, leitura, jogada: segundos de cada ação (ver acima)
+        regressa: True se o move_robot volta ao rumo inicial depois de cada casa
+                  (o beast.py antes de guardar o rumo entre jogadas)
+        """
+        self.rotacao = rotacao
+        self.casa = casa
+        self.leitura = leitura
+        self.jogada = jogada
+        self.regressa = regressa
+
+    @classmethod
+    def carregar(cls, caminho=CAMINHO):
+        """Lê a calibração do disco, ou os valores por omissão se o ficheiro não existir"""
+        try:
+            with open(caminho) as f:
+                dados = json.load(f)
+        except OSError:
+            return cls()
+        return cls(dados['rotacao'], dados['casa'], dados['leitura'], dados['jogada'])
+
+    def guardar(self, caminho=CAMINHO):
+        with open(caminho, 'w') as f:
+            json.dump({'rotacao': self.rotacao, 'casa': self.casa, 'leitura': self.leitura,
+                       'jogada': self.jogada}, f)
+
+    def quartos(self, rumo, move):
+        """Quartos de volta (pelo lado mais curto) do rumo até à direção da jogada"""
+        k = (RUMOS.index(move) - RUMOS.index(rumo)) % 4
+        return min(k, 4 - k)
+
+    def rotacoes(self, rumo, move):
+        """Turns de 78 graus que a jogada custa (ida e volta se o move_robot regressa ao rumo)"""
+        quartos = self.quartos(rumo, move)
+        return 2 * quartos if self.regressa else quartos
+
+    def rumo_depois(self, rumo, move):
+        return rumo if self.regressa else move
+
+    def segundos(self, rumo, move, leituras=0):
+        """Segundos de robot de uma jogada a partir do rumo (leituras: paragens para ler no destino)"""
+        return (self.jogada + self.casa + self.rotacao * self.rotacoes(rumo, move) +
+                self.leitura * leituras)
+
+    @classmethod
+    def de_fases(cls, fases, entradas):
+        """
+        Custo com a média de cada fase: fases {fase: segundos}, entradas
+        {fase: vezes} para 'rotacao', 'conducao', 'leitura' e 'jogada' (as
+        que faltam ficam com o valor por omissão)
+        """
+        def media(fase, omissao):
+            if not entradas.get(fase):
+                return omissao
+            return round(fases[fase] / entradas[fase], 2)
+
+        return cls(media('rotacao', ROTACAO), media('conducao', CASA), media('leitura', LEITURA),
+                   media('jogada', JOGADA))
+
+    @classmethod
+    def calibrar(cls, resultados):
+        """
+        Custo a partir dos resultados de virtual.correr (jogos que acabaram
+        por tempo ficam de fora: são ciclos do programa, não jogadas)
+        """
+        fases = {}
+        entradas = {}
+        jogadas = 0
+        for r in resultados:
+            if r['causa'] == 'tempo':
+                continue
+            for fase, segundos in r['fases'].items():
+                fases[fase] = fases.get(fase, 0.0) + segundos
+            for fase, n in r['entradas'].items():
+                entradas[fase] = entradas.get(fase, 0) + n
+            jogadas += r['jogadas']
+        fases['jogada'] = fases.get('espera', 0.0) + fases.get('pausa', 0.0)
+        entradas['jogada'] = jogadas
+        return cls.de_fases(fases, entradas)
+
+    @classmethod
+    def calibrar_registo(cls, linhas):
+        """
+        Custo a partir do registo de fases do brick: linhas 'fase segundos
+        vezes' do beast.REGISTO (vezes: casas andadas na condução e na jogada)
+        """
+        fases = {}
+        entradas = {}
+        for linha in linhas:
+            campos = linha.split()
+            if len(campos) != 3:
+                continue
+            fase, segundos, vezes = campos[0], float(campos[1]), int(campos[2])
+            fases[fase] = fases.get(fase, 0.0) + segundos
+            entradas[fase] = entradas.get(fase, 0) + vezes
+        return cls.de_fases(fases, entradas)
+
+
+# -------------------------------
+# Calibração e comparação
+# -------------------------------
+def correr_virtuais(games, seed, estrategia=None, programa='beast'):
+    """Resultados de virtual.correr para games jogos (estrategia: ESTRATEGIA do beast.py)"""
+    from simulate import game_seed
+    from virtual import correr
+
+    opcoes = {'ESTRATEGIA': estrategia} if estrategia else None
+    return [correr(programa, game_seed(seed, index), opcoes=opcoes) for index in range(games)]
+
+
+def _resumo(nome, jogos, vitorias, segundos, jogadas):
+    print(f"{nome}: {vitorias}/{jogos} vitórias, {segundos / max(jogos, 1) / 60:.1f} min por jogo, "
+          f"{segundos / max(jogadas, 1):.1f} s por jogada")
+
+
+def comparar(games, seed, virtuais):
+    """Planeador por casas contra o planeador por segundos, no simulador e no pybricks falso"""
+    from simulate import run_batch
+
+    custo = Custo.carregar()
+    print("Simulador (segundos estimados pelo custo):")
+    for estrategia in ('pesquisa', 'tempo'):
+        results = run_batch(games, seed, estrategia=estrategia, custo=custo)
+        _resumo(estrategia, games, sum(r['won'] for r in results), sum(r['segundos'] for r in results),
+                sum(r['moves'] for r in results))
+    if virtuais:
+        print("Pybricks falso (segundos do relógio virtual):")
+        for estrategia in ('pesquisa', 'tempo'):
+            results = correr_virtuais(virtuais, seed, estrategia)
+            _resumo(estrategia, virtuais, sum(r['won'] for r in results),
+                    sum(r['segundos'] for r in results), sum(r['jogadas'] for r in results))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Modelo de custo das jogadas em segundos de robot")
+    sub = parser.add_subparsers(dest="modo")
+    calibrar = sub.add_parser("calibrar", help="calibra o custo com o registo do brick ou com jogos do "
+                                               "beast.py no pybricks falso")
+    calibrar.add_argument("--log", help="fases.log escrito pelo beast.py no brick (sem ele: pybricks falso)")
+    calibrar.add_argument("--games", type=int, default=40)
+    calibrar.add_argument("--seed", type=int, default=1)
+    calibrar.add_argument("--saida", default=CAMINHO)
+    comparar_ = sub.add_parser("comparar", help="planeador por casas contra planeador por segundos")
+    comparar_.add_argument("--games", type=int, default=400)
+    comparar_.add_argument("--seed", type=int, default=2)
+    comparar_.add_argument("--virtuais", type=int, default=30, help="jogos no pybricks falso (0 = nenhum)")
+    args = parser.parse_args(argv)
+
+    if args.modo == "calibrar":
+        if args.log:
+            with open(args.log) as f:
+                custo = Custo.calibrar_registo(f)
+        else:
+            custo = Custo.calibrar(correr_virtuais(args.games, args.seed))
+        custo.guardar(args.saida)
+        print(f"rotação {custo.rotacao} s, casa {custo.casa} s, leitura {custo.leitura} s, "
+              f"jogada {custo.jogada} s -> {args.saida}")
+    elif args.modo == "comparar":
+        comparar(args.games, args.seed, args.virtuais)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
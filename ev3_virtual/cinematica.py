@@ -0,0 +1,221 @@
+"""
+Mundo cinemático: a pose contínua do robot sobre as fitas do tabuleiro.
+
+O MundoTabuleiro só sabe em que casa o robot está e para onde está virado.
+Aqui o robot tem posição (x, y em mm, origem no canto de cima à esquerda
+do tabuleiro, x para a direita e y para baixo) e rumo em graus (0 direita,
+90 baixo). O drive, o straight e o turn do DriveBase falso movem a pose, e o
+ColorSensor vê a cor do chão no ponto do sensor: as fitas pretas entre as
+casas, as vermelhas nas barreiras e à volta do tabuleiro, e o chão branco
+no resto. Assim o andar_casa pára mais perto ou mais longe do centro
+conforme onde viu a fita, o recuo depois de uma barreira deixa o robot fora
+do centro, e um turn com erro desvia o robot ao longo das casas seguintes.
+
+A integração é por passos fixos de DT ms quando o robot anda e roda ao
+mesmo tempo; a andar a direito (o caso do andar_casa) a pose avança de uma
+vez até à próxima fronteira de casa, e uma leitura da cor no chão branco
+salta logo para o último período do sensor antes de a próxima fita lhe
+chegar (a leitura seguinte já vê a fita). Os jogos continuam a levar
+milissegundos.
+
+O árbitro é o do MundoJogo: o jogo avança quando o eixo das rodas entra
+noutra casa. Se entrar atravessando uma barreira conta em atravessadas, e
+sair do tabuleiro acaba o jogo (FimDoJogo('fora')).
+"""
+import bisect
+import math
+import random
+
+from mundo_virtual import (BRANCO, CELULA, FITA, GRAUS_QUARTO, PERIODO_SENSOR, PRETO, VERMELHO,
+                           FimDoJogo, Mundo, MundoJogo)
+from bitboard import DOWN, RIGHT
+
+DT = 10.0                      # ms por passo de integração
+ESCALA_ROTACAO = 90.0 / GRAUS_QUARTO  # graus reais por grau pedido ao turn
+CONE = CELULA / 2.0            # o ultrassom vê a torradeira até esta distância ao lado do eixo
+ALCANCE = 2550                 # leitura do ultrassom sem eco
+
+
+class MundoCinematico(MundoJogo):
+    def __init__(self, game, rumo=1, sentido=1, max_jogadas=100, sensor=0.0, ruido=0.0, seed=None):
+        """
+        rumo, sentido: como no MundoTabuleiro
+        sensor: mm do sensor de cor à frente do eixo das rodas
+        ruido: desvio padrão (graus) do erro de cada turn
+        seed: semente do erro dos turns
+        """
+        MundoJogo.__init__(self, game, max_jogadas)
+        self.sentido = sentido
+        self.sensor = sensor
+        self.ruido = ruido
+        self.rng = random.Random(seed)
+        self.x = (self.celula % self.size + 0.5) * CELULA
+        self.y = (self.celula // self.size + 0.5) * CELULA
+        self.rumo = rumo * 90.0
+        self.velocidade = 0.0         # mm/s
+        self.rotacao = 0.0            # graus/s reais
+        self.atravessadas = 0         # casas novas através de uma barreira
+        self._instante = 0.0          # instante (ms) da pose
+        meia = FITA / 2.0
+        self._arestas = sorted(k * CELULA + s for k in range(self.size + 1) for s in (-meia, meia))
+
+    # -------------------------------
+    # Chão
+    # -------------------------------
+    def _cor_em(self, x, y):
+        """Cor do chão no ponto (x, y)"""
+        meia = FITA / 2.0
+        lado = self.size * CELULA
+        if not (-meia <= x <= lado + meia and -meia <= y <= lado + meia):
+            return BRANCO
+        cor = BRANCO
+        k = int(round(x / CELULA))
+        if abs(x - k * CELULA) <= meia:
+            row = min(max(int(y // CELULA), 0), self.size - 1)
+            if k in (0, self.size) or self.regras.paredes.bloqueado(row, k - 1, RIGHT):
+                return VERMELHO
+            cor = PRETO
+        k = int(round(y / CELULA))
+        if abs(y - k * CELULA) <= meia:
+            col = min(max(int(x // CELULA), 0), self.size - 1)
+            if k in (0, self.size) or self.regras.paredes.bloqueado(k - 1, col, DOWN):
+                return VERMELHO
+            cor = PRETO
+        return cor
+
+    def _ponto_sensor(self):
+        a = math.radians(self.rumo)
+        return self.x + self.sensor * math.cos(a), self.y + self.sensor * math.sin(a)
+
+    def _ate_fita(self):
+        """ms até a próxima aresta de fita chegar ao sensor (a andar a direito), ou None"""
+        a = math.radians(self.rumo)
+        sx, sy = self._ponto_sensor()
+        melhor = None
+        for pos, v in ((sx, self.velocidade * math.cos(a)), (sy, self.velocidade * math.sin(a))):
+            if abs(v) < 1e-9:
+                continue
+            if v > 0:
+                i = bisect.bisect_right(self._arestas, pos)
+                if i == len(self._arestas):
+                    continue
+            else:
+                i = bisect.bisect_left(self._arestas, pos) - 1
+                if i < 0:
+                    continue
+            t = (self._arestas[i] - pos) / v * 1000.0
+            if melhor is None or t < melhor:
+                melhor = t
+        return melhor
+
+    # -------------------------------
+    # Movimento
+    # -------------------------------
+    def _ate_fronteira(self):
+        """ms até o eixo passar a próxima fronteira de casa (a andar a direito), ou infinito"""
+        a = math.radians(self.rumo)
+        melhor = float('inf')
+        for pos, v in ((self.x, self.velocidade * math.cos(a)), (self.y, self.velocidade * math.sin(a))):
+            if abs(v) < 1e-9:
+                continue
+            k = math.floor(pos / CELULA) + 1 if v > 0 else math.ceil(pos / CELULA) - 1
+            melhor = min(melhor, (k * CELULA - pos) / v * 1000.0)
+        return melhor
+
+    def _mover(self, ms):
+        """Integra a pose durante ms com a velocidade e a rotação em curso"""
+        while ms > 1e-9:
+            if self.velocidade and self.rotacao:
+                passo = min(ms, DT)
+                meio = math.radians(self.rumo + self.rotacao * passo / 2000.0)
+                self.x += self.velocidade * passo / 1000.0 * math.cos(meio)
+                self.y += self.velocidade * passo / 1000.0 * math.sin(meio)
+            else:
+                passo = min(ms, self._ate_fronteira() + 1e-3)
+                a = math.radians(self.rumo)
+                self.x += self.velocidade * passo / 1000.0 * math.cos(a)
+                self.y += self.velocidade * passo / 1000.0 * math.sin(a)
+            self.rumo = (self.rumo + self.rotacao * passo / 1000.0) % 360.0
+            self._instante += passo
+            ms -= passo
+            self._conferir()
+
+    def _conferir(self):
+        """Chama o árbitro se o eixo entrou noutra casa"""
+        row, col = int(math.floor(self.y / CELULA)), int(math.floor(self.x / CELULA))
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            self.causa = 'fora'
+            raise FimDoJogo('fora')
+        destino = row * self.size + col
+        if destino == self.celula:
+            return
+        origem_row, origem_col = self.celula // self.size, self.celula % self.size
+        paredes = self.regras.paredes
+        if abs(row - origem_row) + abs(col - origem_col) != 1 or not paredes.can_move(
+                (origem_row, origem_col), (row, col)):
+            self.atravessadas += 1
+        self._chegar(destino, self._instante)
+
+    def _integrar(self):
+        """Aplica o movimento em curso até ao instante atual"""
+        self._mover(self.relogio.agora - self._instante)
+
+    # -------------------------------
+    # Pybricks
+    # -------------------------------
+    def conduzir(self, velocidade, rotacao):
+        self._integrar()
+        self._arrancar()
+        self.velocidade = float(velocidade)
+        self.rotacao = self.sentido * rotacao * ESCALA_ROTACAO
+
+    def parar(self):
+        self._integrar()
+        self.velocidade = self.rotacao = 0.0
+
+    def reto(self, distancia, velocidade):
+        self._integrar()
+        self.velocidade = math.copysign(velocidade, distancia)
+        self.rotacao = 0.0
+        Mundo.reto(self, distancia, velocidade)
+        self._integrar()
+        self.velocidade = 0.0
+
+    def rodar(self, graus, velocidade):
+        self._integrar()
+        real = self.sentido * graus * ESCALA_ROTACAO
+        if self.ruido:
+            real += self.rng.gauss(0.0, self.ruido)
+        duracao = abs(graus) / velocidade * 1000.0
+        self.velocidade = 0.0
+        self.rotacao = real / duracao * 1000.0 if duracao else 0.0
+        MundoJogo.rodar(self, graus, velocidade)
+        self._integrar()
+        self.rotacao = 0.0
+
+    def cor(self):
+        self._integrar()
+        if not self.velocidade and self.cartoes:
+            self.relogio.avancar(PERIODO_SENSOR)
+            return self.cartoes.pop(0)
+        passos = 1
+        if self.velocidade and not self.rotacao and self._cor_em(*self._ponto_sensor()) == BRANCO:
+            t = self._ate_fita()
+            if t is not None:
+                # o último período antes da fita ainda lê o chão, como o sensor a andar
+                passos = max(1, int(math.ceil(t / PERIODO_SENSOR)) - 1)
+        self.relogio.avancar(passos * PERIODO_SENSOR)
+        self._integrar()
+        return self._visto(self._cor_em(*self._ponto_sensor()))
+
+    def distancia(self):
+        """Ultrassom: distância (mm) ao centro da torradeira se está à frente, dentro do cone, senão sem eco"""
+        torradeira = self.regras.torradeira
+        tx = (torradeira % self.size + 0.5) * CELULA - self.x
+        ty = (torradeira // self.size + 0.5) * CELULA - self.y
+        a = math.radians(self.rumo)
+        frente = tx * math.cos(a) + ty * math.sin(a)
+        lado = -tx * math.sin(a) + ty * math.cos(a)
+        if 0 < frente < ALCANCE and abs(lado) <= CONE:
+            return int(frente)
+        return ALCANCE
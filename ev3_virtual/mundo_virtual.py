@@ -0,0 +1,374 @@
+"""
+Relógio virtual e modelos do mundo por trás do pybricks falso.
+
+O pybricks desta pasta não espera nada: wait, as deslocações do DriveBase e
+as leituras dos sensores avançam o Relogio (tempo simulado, em ms) e
+perguntam ao mundo instalado o que o robot vê. O relógio é de eventos
+discretos: com o robot a andar, uma leitura da cor no chão branco salta
+logo para o último período antes de a próxima fita (preta de casa ou
+vermelha de barreira) chegar ao sensor, e a seguinte já a vê, por isso o
+ciclo de andar_casa acaba em poucas iterações e quem conta fitas
+(andar_casas) vê o branco entre elas.
+
+O tempo fica dividido por fases (ver entrar/sair), para saber quantos
+segundos de robot custa cada parte da jogada.
+
+Mundos:
+- MundoGuiao: cores, distâncias e toques dados numa lista (testes de uma função)
+- MundoJogo: o cenário de um GameBoard. Mostra os cartões de cor das
+  leituras da manteiga e da torradeira (como o operador, pelo texto do
+  ecrã), arbitra o jogo verdadeiro (oraculo.Regras) a cada casa nova e mede
+  os segundos por casa e a recuperação depois de cada barreira
+- MundoTabuleiro: MundoJogo ao nível da célula. Sabe em que casa o robot
+  está e para onde está virado e põe à frente dele a fita preta da casa
+  seguinte ou a vermelha da barreira
+- cinematica.MundoCinematico: MundoJogo com a pose contínua do robot
+
+O tabuleiro tem as casas separadas por fitas pretas (vermelhas nas
+barreiras e à volta do tabuleiro): o andar_casa vê a fita na fronteira e
+anda mais DEPOIS_MARCA mm até ao centro da casa.
+"""
+from bitboard import DELTAS, DOWN, LEFT, RIGHT, UP
+
+# Cores (os valores do pybricks.parameters.Color falso)
+PRETO, AZUL, VERDE, AMARELO, VERMELHO, BRANCO, CASTANHO = (
+    'BLACK', 'BLUE', 'GREEN', 'YELLOW', 'RED', 'WHITE', 'BROWN')
+CARTOES = ((8, AMARELO), (4, CASTANHO), (2, VERDE), (1, AZUL))
+
+# Geometria do tabuleiro (mm) e velocidades por omissão
+CELULA = 340            # lado de uma casa (entre os centros de duas casas)
+DEPOIS_MARCA = 170      # o andar_casa anda 170 mm depois de ver a fita preta
+FITA = 20               # largura das fitas
+GRAUS_QUARTO = 78       # o turn(78) do programa é um quarto de volta no tabuleiro
+PERIODO_SENSOR = 10     # ms por leitura quando não há nenhum evento à frente
+
+# Rumo em quartos de volta: 0 direita, 1 baixo, 2 esquerda, 3 cima (sentido dos ponteiros)
+QUARTOS = (RIGHT, DOWN, LEFT, UP)
+
+
+class FimDoJogo(Exception):
+    """O árbitro acabou o jogo (causa: 'casa', 'bolor', 'torradeira', 'limite', 'tempo' ou 'fora')"""
+
+    def __init__(self, causa):
+        Exception.__init__(self, causa)
+        self.causa = causa
+
+
+class Relogio:
+    def __init__(self, limite=None):
+        """limite: tempo simulado máximo em ms (FimDoJogo('tempo') quando passa), ou None"""
+        self.agora = 0.0
+        self.limite = limite
+        self.fases = {}
+        self.entradas = {}  # vezes que cada fase começou (sem contar as aninhadas nela própria)
+        self._pilha = []
+
+    def avancar(self, ms):
+        if ms <= 0:
+            return
+        fase = self._pilha[-1] if self._pilha else 'espera'
+        self.fases[fase] = self.fases.get(fase, 0.0) + ms
+        self.agora += ms
+        if self.limite is not None and self.agora > self.limite:
+            raise FimDoJogo('tempo')
+
+    def entrar(self, fase):
+        """O tempo a partir de agora conta para fase (até sair; a fase mais interior ganha)"""
+        if fase not in self._pilha:
+            self.entradas[fase] = self.entradas.get(fase, 0) + 1
+        self._pilha.append(fase)
+
+    def sair(self):
+        self._pilha.pop()
+
+    def segundos(self):
+        return self.agora / 1000.0
+
+    def relatorio(self):
+        """{fase: segundos}"""
+        return {fase: ms / 1000.0 for fase, ms in sorted(self.fases.items())}
+
+
+class Mundo:
+    """Interface chamada pelo pybricks falso (um mundo parado, sem nada para ver)"""
+
+    relogio = None
+
+    def conduzir(self, velocidade, rotacao):
+        pass
+
+    def parar(self):
+        pass
+
+    def reto(self, distancia, velocidade):
+        """straight: o mundo avança o relógio o tempo da deslocação"""
+        self.relogio.avancar(abs(distancia) / velocidade * 1000.0)
+
+    def rodar(self, graus, velocidade):
+        """turn: graus do programa a velocidade graus/s"""
+        self.relogio.avancar(abs(graus) / velocidade * 1000.0)
+
+    def cor(self):
+        self.relogio.avancar(PERIODO_SENSOR)
+        return BRANCO
+
+    def distancia(self):
+        return 2550
+
+    def tocado(self, porta):
+        return False
+
+    def ecra(self, texto):
+        pass
+
+    def limpar_ecra(self):
+        pass
+
+
+class MundoGuiao(Mundo):
+    def __init__(self, cores, distancias=(), toques=()):
+        """
+        cores: cores devolvidas por cada leitura do ColorSensor (a última repete-se)
+        distancias: leituras do UltrasonicSensor (idem); toques: leituras dos TouchSensor
+        """
+        self.cores = list(cores)
+        self.distancias = list(distancias)
+        self.toques = list(toques)
+        self.textos = []
+
+    def _proxima(self, lista, omissao):
+        if not lista:
+            return omissao
+        return lista.pop(0) if len(lista) > 1 else lista[0]
+
+    def cor(self):
+        self.relogio.avancar(PERIODO_SENSOR)
+        return self._proxima(self.cores, BRANCO)
+
+    def distancia(self):
+        return self._proxima(self.distancias, 2550)
+
+    def tocado(self, porta):
+        return self._proxima(self.toques, False)
+
+    def ecra(self, texto):
+        self.textos.append(texto)
+
+
+class MundoJogo(Mundo):
+    """Árbitro e operador do cenário de um GameBoard (a parte comum aos mundos com tabuleiro)"""
+
+    def __init__(self, game, max_jogadas=100):
+        """game: GameBoard com o cenário (manteiga, torradeira e barreiras verdadeiras)"""
+        from oraculo import Regras
+
+        self.regras = Regras.de_jogo(game)
+        self.size = game.size
+        self.celula = game.robot_pos['row'] * self.size + game.robot_pos['col']
+        self.bolor = game.bolor_pos['row'] * self.size + game.bolor_pos['col']
+        self.tem = False
+        self.max_jogadas = max_jogadas
+        self.jogadas = 0
+        self.causa = None
+        self.cartoes = []             # cartões que o operador ainda vai mostrar
+        # Tempos do movimento (ms)
+        self.chegadas = []            # instante de cada casa nova
+        self.barreiras = 0            # fitas vermelhas vistas
+        self.recuperacao = 0.0        # da fita vermelha até voltar a andar
+        self._vermelho = None
+        self.rodados = 0.0            # graus pedidos ao turn
+
+    def _bloqueada(self, celula, d):
+        """True se há barreira (ou o fim do tabuleiro) do lado d de celula"""
+        row, col = celula // self.size, celula % self.size
+        r, c = row + DELTAS[d][0], col + DELTAS[d][1]
+        return not (0 <= r < self.size and 0 <= c < self.size) or self.regras.paredes.bloqueado(row, col, d)
+
+    # -------------------------------
+    # Árbitro
+    # -------------------------------
+    def _chegar(self, destino, instante=None):
+        """O robot entrou em destino (no instante dado, em ms; por omissão agora): o jogo verdadeiro avança uma jogada"""
+        origem = self.celula
+        self.celula = destino
+        self.jogadas += 1
+        self.chegadas.append(self.relogio.agora if instante is None else instante)
+        self.bolor, self.tem, causa = self.regras.avancar(origem, self.bolor, self.tem, destino)
+        if causa is not None:
+            self.causa = causa
+            raise FimDoJogo(causa)
+        if self.jogadas >= self.max_jogadas:
+            self.causa = 'limite'
+            raise FimDoJogo('limite')
+
+    def venceu(self):
+        return self.causa in ('casa', 'torradeira')
+
+    def _visto(self, cor):
+        """Regista o que o sensor viu (para medir a recuperação das barreiras)"""
+        if cor == VERMELHO and self._vermelho is None:
+            self.barreiras += 1
+            self._vermelho = self.relogio.agora
+        return cor
+
+    def _arrancar(self):
+        """O robot volta a andar: acaba a recuperação da última barreira"""
+        if self._vermelho is not None:
+            self.recuperacao += self.relogio.agora - self._vermelho
+            self._vermelho = None
+
+    def rodar(self, graus, velocidade):
+        self.rodados += abs(graus)
+        Mundo.rodar(self, graus, velocidade)
+
+    def tempos(self):
+        """Segundos médios por casa nova e por recuperação de uma barreira"""
+        por_casa = self.chegadas[-1] / len(self.chegadas) / 1000.0 if self.chegadas else None
+        recuperacao = self.recuperacao / self.barreiras / 1000.0 if self.barreiras else None
+        return por_casa, recuperacao
+
+    # -------------------------------
+    # Operador
+    # -------------------------------
+    def ecra(self, texto):
+        """O operador lê o pedido de leitura no ecrã e prepara os cartões"""
+        texto = str(texto).lower()
+        if 'manteiga' in texto:
+            alvo = None if self.tem else self.regras.manteiga
+        elif 'torradeira' in texto or 'calor' in texto:
+            alvo = self.regras.torradeira
+        else:
+            return
+        if alvo is None:
+            self.cartoes = []
+            return
+        row, col = self.celula // self.size, self.celula % self.size
+        distancia = abs(row - alvo // self.size) + abs(col - alvo % self.size)
+        self.cartoes = [PRETO] if distancia == 0 else [cor for peso, cor in CARTOES if distancia & peso]
+
+    def limpar_ecra(self):
+        self.cartoes = []
+
+
+class MundoTabuleiro(MundoJogo):
+    def __init__(self, game, rumo=1, sentido=1, max_jogadas=100):
+        """
+        rumo: quarto de volta para onde o robot começa virado (ver QUARTOS)
+        sentido: 1 se turn com graus positivos roda no sentido dos ponteiros
+                 no tabuleiro, -1 se o tabuleiro está espelhado
+        """
+        MundoJogo.__init__(self, game, max_jogadas)
+        self.sentido = sentido
+        self.graus = 0.0              # rotação acumulada (graus do programa)
+        self.rumo = rumo
+        self._rumo_inicial = rumo
+        self.avanco = 0.0             # mm ao longo do rumo desde o centro da casa
+        self.velocidade = 0.0         # mm/s do drive em curso (0 = parado)
+        self._inicio = 0.0            # instante (ms) da última integração do drive
+
+    # -------------------------------
+    # Geometria
+    # -------------------------------
+    def _vizinha(self):
+        """Célula à frente, ou None se há barreira (ou o fim do tabuleiro)"""
+        d = QUARTOS[self.rumo]
+        if self._bloqueada(self.celula, d):
+            return None
+        return self.celula + DELTAS[d][0] * self.size + DELTAS[d][1]
+
+    def _fitas(self):
+        """(início, fim, cor) das fitas ao longo do rumo, em coordenadas de avanco"""
+        marca = CELULA - DEPOIS_MARCA
+        cor = VERMELHO if self._vizinha() is None else PRETO
+        return [(-DEPOIS_MARCA, -DEPOIS_MARCA + FITA, PRETO),  # a fronteira por onde entrou
+                (marca, marca + FITA, cor)]
+
+    def _deslocar(self, distancia):
+        """Anda distancia mm ao longo do rumo: muda de casa ao passar a fita preta, pára na barreira"""
+        marca = CELULA - DEPOIS_MARCA
+        destino = self.avanco + distancia
+        while distancia > 0:
+            vizinha = self._vizinha()
+            if vizinha is None:
+                destino = min(destino, marca + FITA)  # a barreira não deixa passar
+                break
+            if not self.avanco < marca <= destino:
+                break
+            self.avanco = marca - CELULA
+            destino -= CELULA
+            self._chegar(vizinha)
+        self.avanco = destino
+
+    def _integrar(self):
+        """Aplica o drive em curso até ao instante atual"""
+        if self.velocidade:
+            agora = self.relogio.agora
+            self._deslocar(self.velocidade * (agora - self._inicio) / 1000.0)
+            self._inicio = agora
+
+    # -------------------------------
+    # Pybricks
+    # -------------------------------
+    def conduzir(self, velocidade, rotacao):
+        self._integrar()
+        self._arrancar()
+        self.velocidade = float(velocidade)
+        self._inicio = self.relogio.agora
+
+    def parar(self):
+        self._integrar()
+        self.velocidade = 0.0
+
+    def reto(self, distancia, velocidade):
+        Mundo.reto(self, distancia, velocidade)
+        self._deslocar(distancia)
+
+    def rodar(self, graus, velocidade):
+        MundoJogo.rodar(self, graus, velocidade)
+        self.graus += graus
+        rumo = (self._rumo_inicial + self.sentido * int(round(self.graus / GRAUS_QUARTO))) % 4
+        if rumo != self.rumo:
+            self.rumo = rumo
+            self.avanco = 0.0  # roda sobre o centro da casa
+
+    def cor(self):
+        self._integrar()
+        if not self.velocidade and self.cartoes:
+            self.relogio.avancar(PERIODO_SENSOR)
+            return self.cartoes.pop(0)
+        for inicio, fim, cor in self._fitas():
+            if inicio <= self.avanco < fim:
+                self.relogio.avancar(PERIODO_SENSOR)
+                return self._visto(cor)
+        # Salta para a próxima fita à frente (com uma leitura de chão antes, como
+        # o sensor a andar: quem conta fitas vê o branco entre elas)
+        if self.velocidade > 0:
+            seguintes = [inicio for inicio, _, _ in self._fitas() if inicio > self.avanco]
+            if seguintes:
+                ate = (min(seguintes) - self.avanco) / self.velocidade * 1000.0
+                if ate > 2 * PERIODO_SENSOR:
+                    self.relogio.avancar(ate - PERIODO_SENSOR)
+                    return self._visto(BRANCO)
+                self.relogio.avancar(ate + 1e-6)
+                return self.cor()
+        self.relogio.avancar(PERIODO_SENSOR)
+        return BRANCO
+
+    def distancia(self):
+        """Ultrassom: a torradeira na casa à frente (mm), senão sem eco"""
+        vizinha = self._vizinha()
+        return CELULA if vizinha is not None and vizinha == self.regras.torradeira else 2550
+
+
+relogio = Relogio()
+mundo = Mundo()
+mundo.relogio = relogio
+
+
+def instalar(novo_mundo, novo_relogio=None):
+    """Põe o mundo (e um relógio novo) por trás do pybricks falso"""
+    global mundo, relogio
+    relogio = novo_relogio if novo_relogio is not None else Relogio()
+    mundo = novo_mundo
+    mundo.relogio = relogio
+    return mundo
@@ -0,0 +1,7 @@
+"""
+pybricks falso para correr o projeto.py e o beast.py fora do EV3.
+
+Tem só o que os programas usam, com as mesmas assinaturas. Nada espera:
+o tempo é o do relógio virtual e o que os sensores leem vem do mundo
+instalado em mundo_virtual (ver virtual.py).
+"""
@@ -0,0 +1,37 @@
+import mundo_virtual
+
+
+class Motor:
+    def __init__(self, port, *args, **kwargs):
+        self.port = port
+        self._angulo = 0.0
+
+    def angle(self):
+        return int(self._angulo)
+
+    def reset_angle(self, angle=0):
+        self._angulo = float(angle)
+
+
+class ColorSensor:
+    def __init__(self, port):
+        self.port = port
+
+    def color(self):
+        return mundo_virtual.mundo.cor()
+
+
+class UltrasonicSensor:
+    def __init__(self, port):
+        self.port = port
+
+    def distance(self):
+        return mundo_virtual.mundo.distancia()
+
+
+class TouchSensor:
+    def __init__(self, port):
+        self.port = port
+
+    def pressed(self):
+        return mundo_virtual.mundo.tocado(self.port)
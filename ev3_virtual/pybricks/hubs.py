@@ -0,0 +1,25 @@
+import mundo_virtual
+
+BEEP = 100  # ms de um beep (o beep do EV3 bloqueia)
+
+
+class _Ecra:
+    def clear(self):
+        mundo_virtual.mundo.limpar_ecra()
+
+    def print(self, *args):
+        mundo_virtual.mundo.ecra(" ".join(str(a) for a in args))
+
+    def draw_text(self, x, y, text, *args):
+        mundo_virtual.mundo.ecra(text)
+
+
+class _Altifalante:
+    def beep(self, frequency=500, duration=BEEP):
+        mundo_virtual.relogio.avancar(duration)
+
+
+class EV3Brick:
+    def __init__(self):
+        self.screen = _Ecra()
+        self.speaker = _Altifalante()
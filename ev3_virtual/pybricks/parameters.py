@@ -0,0 +1,20 @@
+import mundo_virtual
+
+
+class Port:
+    A, B, C, D = 'A', 'B', 'C', 'D'
+    S1, S2, S3, S4 = 'S1', 'S2', 'S3', 'S4'
+
+
+class Stop:
+    COAST, BRAKE, HOLD = 'COAST', 'BRAKE', 'HOLD'
+
+
+class Color:
+    BLACK = mundo_virtual.PRETO
+    BLUE = mundo_virtual.AZUL
+    GREEN = mundo_virtual.VERDE
+    YELLOW = mundo_virtual.AMARELO
+    RED = mundo_virtual.VERMELHO
+    WHITE = mundo_virtual.BRANCO
+    BROWN = mundo_virtual.CASTANHO
@@ -0,0 +1,70 @@
+import math
+
+import mundo_virtual
+
+VELOCIDADE_RETA = 100.0    # mm/s do straight por omissão
+VELOCIDADE_RODAR = 90.0    # graus/s do turn por omissão
+
+
+class DriveBase:
+    def __init__(self, left_motor, right_motor, wheel_diameter, axle_track):
+        self.left_motor = left_motor
+        self.right_motor = right_motor
+        self.wheel_diameter = wheel_diameter
+        self.axle_track = axle_track
+        self.straight_speed = VELOCIDADE_RETA
+        self.turn_rate = VELOCIDADE_RODAR
+        self._drive = None  # (velocidade, rotação, instante) do drive em curso
+        self._distancia = 0.0
+        self._angulo = 0.0
+
+    def settings(self, straight_speed=None, straight_acceleration=None, turn_rate=None, turn_acceleration=None):
+        if straight_speed is not None:
+            self.straight_speed = float(straight_speed)
+        if turn_rate is not None:
+            self.turn_rate = float(turn_rate)
+
+    def _rodas(self, distancia, graus):
+        """Atualiza os ângulos dos motores (graus de roda) e a odometria"""
+        roda = 360.0 / (math.pi * self.wheel_diameter)
+        arco = math.pi * self.axle_track * graus / 360.0
+        self.left_motor._angulo += (distancia + arco) * roda
+        self.right_motor._angulo += (distancia - arco) * roda
+        self._distancia += distancia
+        self._angulo += graus
+
+    def _fechar_drive(self):
+        if self._drive is not None:
+            velocidade, rotacao, inicio = self._drive
+            segundos = (mundo_virtual.relogio.agora - inicio) / 1000.0
+            self._rodas(velocidade * segundos, rotacao * segundos)
+            self._drive = None
+
+    def drive(self, drive_speed, turn_rate):
+        self._fechar_drive()
+        self._drive = (drive_speed, turn_rate, mundo_virtual.relogio.agora)
+        mundo_virtual.mundo.conduzir(drive_speed, turn_rate)
+
+    def stop(self):
+        self._fechar_drive()
+        mundo_virtual.mundo.parar()
+
+    def straight(self, distance):
+        self.stop()
+        self._rodas(distance, 0)
+        mundo_virtual.mundo.reto(distance, self.straight_speed)
+
+    def turn(self, angle):
+        self.stop()
+        self._rodas(0, angle)
+        mundo_virtual.mundo.rodar(angle, self.turn_rate)
+
+    def distance(self):
+        return int(self._distancia)
+
+    def angle(self):
+        return int(self._angulo)
+
+    def reset(self):
+        self._distancia = 0.0
+        self._angulo = 0.0
@@ -0,0 +1,17 @@
+import mundo_virtual
+
+
+def wait(time):
+    """Avança o relógio virtual time ms (não espera)"""
+    mundo_virtual.relogio.avancar(time)
+
+
+class StopWatch:
+    def __init__(self):
+        self._inicio = mundo_virtual.relogio.agora
+
+    def time(self):
+        return int(mundo_virtual.relogio.agora - self._inicio)
+
+    def reset(self):
+        self._inicio = mundo_virtual.relogio.agora
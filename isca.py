@@ -0,0 +1,125 @@
+"""
+Isca: levar o bolor até à torradeira.
+
+O bolor na torradeira também é vitória (check_game_state). Com a torradeira
+localizada, e como o bolor é determinístico (bolor.TabelaBolor), a Isca faz
+uma pesquisa em largura sobre os estados (robot, bolor) com as regras exatas
+do turno (oraculo.Regras, incluindo o passo extra do bolor quando o robot
+pisa a torradeira) e as barreiras descobertas, à procura da sequência mais
+curta de jogadas em que o bolor entra na torradeira sem apanhar o robot.
+
+A manteiga e a casa não entram na pesquisa: é só a vitória pela torradeira
+(o regresso a casa é da tablebase). Os resultados ficam em cache por
+(robot, bolor, torradeira, barreiras), e os sufixos de uma sequência encontrada
+também, por isso seguir uma isca não volta a pesquisar.
+
+python isca.py compara a heurística com e sem isca.
+"""
+from oraculo import Regras
+
+JOGADAS = 'wsad'
+HORIZONTE = 12  # jogadas máximas de uma isca
+
+
+class Isca:
+    def __init__(self, horizonte=HORIZONTE, rows=6, cols=6):
+        self.horizonte = horizonte
+        self.rows = rows
+        self.cols = cols
+        self._cache = {}  # (robot, bolor, torradeira, máscaras) -> jogadas ou None
+        self.pesquisas = 0
+        self.encontradas = 0
+
+    def procurar(self, robot, bolor, torradeira, paredes):
+        """
+        Sequência mais curta de jogadas ('w', 's', 'a', 'd') que leva o bolor à
+        torradeira sem o robot ser apanhado, ou None se não há dentro do horizonte.
+        robot, bolor, torradeira: células; paredes: MapaParedes das barreiras conhecidas
+        """
+        mascaras = tuple(paredes.mascaras)
+        key = (robot, bolor, torradeira, mascaras)
+        if key in self._cache:
+            return self._cache[key]
+        self.pesquisas += 1
+        regras = Regras(-1, torradeira, paredes, self.rows, self.cols, -1)
+
+        # Pesquisa em largura: pais[(robot, bolor)] = (estado anterior, direção)
+        pais = {(robot, bolor): None}
+        frente = [(robot, bolor)]
+        final = None
+        for _ in range(self.horizonte):
+            seguinte = []
+            for r, b in frente:
+                for d, destino in regras.destinos(r):
+                    nb, _, causa = regras.avancar(r, b, False, destino)
+                    if causa == 'torradeira':
+                        final = ((r, b), d)
+                        break
+                    if causa is None and (destino, nb) not in pais:
+                        pais[(destino, nb)] = ((r, b), d)
+                        seguinte.append((destino, nb))
+                if final is not None:
+                    break
+            if final is not None or not seguinte:
+                break
+            frente = seguinte
+
+        if final is None:
+            self._cache[key] = None
+            return None
+        self.encontradas += 1
+        estados = []
+        jogadas = []
+        estado, d = final
+        while True:
+            estados.append(estado)
+            jogadas.append(JOGADAS[d])
+            anterior = pais[estado]
+            if anterior is None:
+                break
+            estado, d = anterior
+        estados.reverse()
+        jogadas.reverse()
+        # Cada sufixo é a isca mais curta a partir do seu estado
+        for i, (r, b) in enumerate(estados):
+            self._cache[(r, b, torradeira, mascaras)] = jogadas[i:]
+        return jogadas
+
+    def jogada(self, jogo):
+        """Primeira jogada da isca para o estado de jogo (GameBoard ou Cerebro), ou None"""
+        if not jogo.known_torradeira:
+            return None
+        cols = self.cols
+        jogadas = self.procurar(jogo.robot_pos['row'] * cols + jogo.robot_pos['col'],
+                                jogo.bolor_pos['row'] * cols + jogo.bolor_pos['col'],
+                                jogo.known_torradeira['row'] * cols + jogo.known_torradeira['col'],
+                                jogo.paredes_descobertas)
+        return jogadas[0] if jogadas else None
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from simulate import run_batch
+
+    parser = argparse.ArgumentParser(description="Heurística com e sem a isca da torradeira")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--horizonte", type=int, default=HORIZONTE)
+    args = parser.parse_args(argv)
+
+    isca = Isca(args.horizonte)
+    for nome, opcao in (("sem isca", None), ("com isca", isca)):
+        start = time.perf_counter()
+        results = run_batch(args.games, args.seed, isca=opcao)
+        wins = sum(r['won'] for r in results)
+        torradeira = sum(r['causa'] == 'torradeira' for r in results)
+        moves = sum(r['moves'] for r in results if r['won'])
+        print(f"{nome}: {wins} vitórias ({100.0 * wins / args.games:.1f}%), {torradeira} pela torradeira, "
+              f"{moves / max(wins, 1):.2f} jogadas por vitória, {time.perf_counter() - start:.1f}s")
+    print(f"Pesquisas: {isca.pesquisas}, iscas encontradas: {isca.encontradas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Localizadores incrementais das crenças do robot.
+
+LocalizadorManteiga guarda o histórico de leituras (célula, distância) e o
+conjunto exato de posições da manteiga consistentes com todas elas. Cada
+leitura só percorre os candidatos que restam, e as consultas (localizada,
+número de candidatos, distância esperada/mínima a uma célula) são O(1).
+A tabela de observação (_aneis) diz, para cada célula, que candidatos dão
+cada leitura: serve para saber se vale a pena parar para ler (informativa).
+
+LocalizadorTorradeira faz o mesmo para a torradeira com as leituras de calor.
+"""
+from atlas import get_atlas
+from bitboard import FULL, bit, lowest_index, neighbors, popcount
+
+# Penalização (dividida pelo número de candidatos) por pisar uma possível torradeira
+PENALIZACAO_TORRADEIRA = 30
+
+_tabelas_aneis = {}
+
+
+def _aneis(rows, cols):
+    """
+    Tabela de observação: para cada célula, o bitboard das células a cada
+    distância (a leitura da manteiga nessa célula é o índice do anel)
+    """
+    aneis = _tabelas_aneis.get((rows, cols))
+    if aneis is None:
+        atlas = get_atlas(rows, cols)
+        aneis = []
+        for rings in atlas.rings:
+            mascaras = []
+            for ring in rings:
+                mascara = 0
+                for c in ring:
+                    mascara |= 1 << c
+                mascaras.append(mascara)
+            aneis.append(mascaras)
+        _tabelas_aneis[(rows, cols)] = aneis
+    return aneis
+
+
+class LocalizadorManteiga:
+    def __init__(self, rows=6, cols=6):
+        self.rows = rows
+        self.cols = cols
+        self.atlas = get_atlas(rows, cols)
+        self.historico = []     # leituras (row, col, distância)
+        self.candidatos = None  # índices das células consistentes (None antes da 1ª leitura)
+        self.mascara = 0        # os mesmos candidatos como bitboard
+        # soma[c] = soma das distâncias de c a todos os candidatos
+        self.soma = [0] * (rows * cols)
+        self._minima = None     # cache da distância mínima de cada célula aos candidatos
+        self.aneis = _aneis(rows, cols)
+
+    def observar(self, row, col, distance):
+        """
+        Regista a leitura distance em (row, col) e filtra os candidatos.
+        Uma leitura inconsistente com todos os candidatos é ignorada (como no
+        populate_tabela). Returns: número de candidatos
+        """
+        self.historico.append((row, col, distance))
+        dist = self.atlas.dist[row * self.cols + col]
+
+        if self.candidatos is None:
+            rings = self.atlas.rings[row * self.cols + col]
+            if not 0 <= distance < len(rings):
+                return 0
+            self.candidatos = list(rings[distance])
+            for c in self.candidatos:
+                self._adicionar(c)
+        else:
+            restantes = [c for c in self.candidatos if dist[c] == distance]
+            if not restantes:
+                return len(self.candidatos)
+            if len(restantes) < len(self.candidatos):
+                for c in self.candidatos:
+                    if dist[c] != distance:
+                        self._remover(c)
+                self.candidatos = restantes
+        self._minima = None
+        return len(self.candidatos)
+
+    def _adicionar(self, c):
+        self.mascara |= 1 << c
+        row_dist = self.atlas.dist[c]
+        soma = self.soma
+        for i in range(len(soma)):
+            soma[i] += row_dist[i]
+
+    def _remover(self, c):
+        self.mascara &= ~(1 << c)
+        row_dist = self.atlas.dist[c]
+        soma = self.soma
+        for i in range(len(soma)):
+            soma[i] -= row_dist[i]
+
+    # -------------------------------
+    # Consultas
+    # -------------------------------
+    def tem_leituras(self):
+        return self.candidatos is not None
+
+    def numero_candidatos(self):
+        return len(self.candidatos) if self.candidatos is not None else self.rows * self.cols
+
+    def localizada(self):
+        return self.candidatos is not None and len(self.candidatos) == 1
+
+    def posicao(self):
+        """{'row', 'col'} da manteiga se só resta um candidato, None caso contrário"""
+        if not self.localizada():
+            return None
+        c = self.candidatos[0]
+        return {'row': c // self.cols, 'col': c % self.cols}
+
+    def possivel(self, row, col):
+        return self.candidatos is None or bool(self.mascara & bit(row, col))
+
+    def distancia_esperada(self, row, col):
+        """Distância média de (row, col) aos candidatos (uniformes)"""
+        if not self.candidatos:
+            return None
+        return self.soma[row * self.cols + col] / len(self.candidatos)
+
+    def distancia_minima(self, row, col):
+        """Distância de (row, col) ao candidato mais próximo"""
+        if not self.candidatos:
+            return None
+        if self._minima is None:
+            dist = self.atlas.dist
+            if len(self.candidatos) == 1:
+                self._minima = dist[self.candidatos[0]]
+            else:
+                self._minima = list(map(min, *[dist[c] for c in self.candidatos]))
+        return self._minima[row * self.cols + col]
+
+    def informativa(self, row, col):
+        """
+        False se a leitura em (row, col) não pode eliminar candidatos (estão
+        todos à mesma distância e nenhum é a própria célula): a paragem para
+        ler pode ser saltada
+        """
+        if self.candidatos is None:
+            return True
+        if len(self.candidatos) == 1:
+            return False
+        cell = row * self.cols + col
+        if self.mascara & (1 << cell):
+            return True
+        for anel in self.aneis[cell]:
+            parte = self.mascara & anel
+            if parte:
+                return parte != self.mascara
+        return False
+
+    def tabela(self):
+        """Tabela distancia_manteiga equivalente (distância ao candidato mais próximo)"""
+        if not self.candidatos:
+            return [[None] * self.cols for _ in range(self.rows)]
+        self.distancia_minima(0, 0)
+        return [list(self._minima[r * self.cols:(r + 1) * self.cols]) for r in range(self.rows)]
+
+
+class LocalizadorTorradeira:
+    """
+    Crença sobre a torradeira: células com leitura quente (torradeira num
+    vizinho), células excluídas (leituras frias e células pisadas) e o conjunto
+    vivo de candidatos, tudo em bitboards. Cada observação custa O(1).
+    """
+
+    def __init__(self, rows=6, cols=6):
+        self.rows = rows
+        self.cols = cols
+        self.quentes = 0        # células onde a leitura foi 1
+        self.frias = 0          # células onde a leitura foi >= 2
+        self.excluidas = 0      # células onde a torradeira não pode estar
+        self.intersecao = FULL  # interseção das vizinhanças das células quentes
+        self.conhecida = None   # índice da célula quando localizada
+
+    def observar(self, row, col, distance):
+        """
+        Regista a leitura de calor em (row, col): 0 = em cima da torradeira,
+        1 = torradeira num vizinho, mais = longe. Returns: número de candidatos
+        """
+        cell = bit(row, col)
+        if distance == 0:
+            self.conhecida = row * self.cols + col
+            return 1
+        if distance == 1:
+            self.quentes |= cell
+            self.intersecao &= neighbors(cell)
+            self.excluidas |= cell
+        else:
+            self.frias |= cell
+            self.excluidas |= cell | neighbors(cell)
+        candidatos = self.candidatos()
+        if self.conhecida is None and popcount(candidatos) == 1:
+            self.conhecida = lowest_index(candidatos)
+        return popcount(candidatos)
+
+    def candidatos(self):
+        """Bitboard das células onde a torradeira ainda pode estar"""
+        if self.conhecida is not None:
+            return 1 << self.conhecida
+        return self.intersecao & ~self.excluidas
+
+    def numero_candidatos(self):
+        return popcount(self.candidatos())
+
+    def localizada(self):
+        return self.conhecida is not None
+
+    def informativa(self, row, col):
+        """
+        False se a leitura de calor em (row, col) não pode mudar a crença (a
+        torradeira já é conhecida, ou os candidatos ficam os mesmos qualquer
+        que seja a leitura): a paragem para ler pode ser saltada
+        """
+        if self.conhecida is not None:
+            return False
+        candidatos = self.candidatos()
+        cell = bit(row, col)
+        perto = candidatos & (cell | neighbors(cell))
+        if not perto:
+            return False  # fria de certeza e as células à volta já estão excluídas
+        # Todos os candidatos à volta: quente de certeza (só conta a primeira leitura quente)
+        return perto != candidatos or bool(candidatos & cell) or not self.quentes
+
+    def posicao(self):
+        if self.conhecida is None:
+            return None
+        return {'row': self.conhecida // self.cols, 'col': self.conhecida % self.cols}
+
+    def possivel(self, row, col):
+        """True se já houve uma leitura quente e (row, col) ainda é candidata"""
+        if self.conhecida is None and not self.quentes:
+            return False
+        return bool(self.candidatos() & bit(row, col))
+
+    def probabilidade(self, row, col):
+        """
+        Probabilidade de a torradeira estar em (row, col), uniforme sobre os
+        candidatos; 0 enquanto não houver nenhuma leitura quente
+        """
+        if not self.possivel(row, col):
+            return 0.0
+        return 1.0 / self.numero_candidatos()
+
+    def penalizacao(self, row, col):
+        """Penalização inteira de ir para (row, col): PENALIZACAO_TORRADEIRA * probabilidade"""
+        if not self.possivel(row, col):
+            return 0
+        return PENALIZACAO_TORRADEIRA // self.numero_candidatos()
+
+    def tabela(self):
+        """Tabela calor_torradeira equivalente: 1 quente, 0 candidato, inf excluída"""
+        table = [[None] * self.cols for _ in range(self.rows)]
+        candidatos = self.candidatos() if (self.quentes or self.conhecida is not None) else 0
+        for row in range(self.rows):
+            for col in range(self.cols):
+                cell = bit(row, col)
+                if self.quentes & cell:
+                    table[row][col] = 1
+                elif candidatos & cell:
+                    table[row][col] = 0
+                elif self.excluidas & cell:
+                    table[row][col] = float('inf')
+        return table
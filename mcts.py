@@ -0,0 +1,238 @@
+"""
+Monte Carlo Tree Search com amostragem dos cenários escondidos.
+
+Enquanto a manteiga e a torradeira não estão localizadas o robot joga com
+informação parcial. Em cada iteração o Mcts sorteia um cenário consistente
+com o que o robot sabe:
+
+- manteiga entre os candidatos do LocalizadorManteiga
+- torradeira entre os candidatos do LocalizadorTorradeira (ou as células
+  ainda não excluídas)
+- as barreiras descobertas mais algumas barreiras ao acaso em células por visitar
+
+e desce a árvore (UCB1) com as regras exatas do turno (oraculo.Regras),
+acabando com um rollout rápido: avança para o objetivo com alguma aleatoriedade
+e evita as jogadas que perdem já. Com orcamento a pesquisa pára quando acaba
+o tempo e devolve a jogada mais visitada da raiz; com iteracoes faz sempre o
+mesmo número de iterações (jogos reprodutíveis em modo headless).
+
+python mcts.py mostra rollouts/s e a distribuição de visitas de algumas decisões.
+"""
+import math
+import random
+import time
+
+from atlas import get_atlas
+from bitboard import FULL, cells
+from oraculo import Regras
+from paredes import MapaParedes
+
+JOGADAS = 'wsad'
+
+HORIZONTE = 30      # jogadas máximas de um rollout
+EXPLORACAO = 0.7    # constante do UCB1
+GULOSO = 0.8        # probabilidade de o rollout andar para o objetivo
+
+
+class _No:
+    __slots__ = ('visitas', 'soma', 'filhos')
+
+    def __init__(self):
+        self.visitas = 0
+        self.soma = 0.0
+        self.filhos = {}  # letra -> _No
+
+
+class Mcts:
+    def __init__(self, iteracoes=400, orcamento=None, seed=None, rows=6, cols=6):
+        """
+        iteracoes: número de iterações por decisão (se não houver orçamento)
+        orcamento: tempo por decisão em segundos (None = usar iteracoes)
+        """
+        self.iteracoes = iteracoes
+        self.orcamento = orcamento
+        try:
+            self.rng = random.Random(seed)
+        except AttributeError:
+            self.rng = random  # MicroPython: só o gerador do módulo
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.atlas = get_atlas(rows, cols)
+        self.rollouts = 0
+        self.tempo = 0.0
+        self.ultima = None  # estatísticas da última decisão
+
+    # -------------------------------
+    # Amostragem dos cenários
+    # -------------------------------
+    def _crencas(self, jogo):
+        """Conjuntos de células possíveis para a manteiga e a torradeira"""
+        visitadas = jogo.visitadas | 1
+        if jogo.has_butter:
+            manteiga = [None]
+        elif jogo.known_manteiga:
+            manteiga = [jogo.known_manteiga['row'] * self.cols + jogo.known_manteiga['col']]
+        elif jogo.localizador_manteiga.tem_leituras():
+            manteiga = jogo.localizador_manteiga.candidatos
+        else:
+            manteiga = cells(FULL & ~visitadas)
+        torradeira = jogo.localizador_torradeira
+        if jogo.known_torradeira:
+            torradeiras = [jogo.known_torradeira['row'] * self.cols + jogo.known_torradeira['col']]
+        elif torradeira.quentes:
+            torradeiras = cells(torradeira.candidatos())
+        else:
+            torradeiras = cells(FULL & ~torradeira.excluidas & ~visitadas)
+        return manteiga, torradeiras, visitadas
+
+    def amostrar(self, jogo, crencas):
+        """Um cenário (Regras) consistente com o que o robot sabe"""
+        manteigas, torradeiras, visitadas = crencas
+        rng = self.rng
+        manteiga = rng.choice(manteigas)
+        opcoes = [c for c in torradeiras if c != manteiga] or torradeiras
+        torradeira = rng.choice(opcoes)
+        paredes = MapaParedes(self.rows, self.cols)
+        for cell, mascara in enumerate(jogo.paredes_descobertas.mascaras):
+            if mascara:
+                paredes.bloquear_mascara(cell // self.cols, cell % self.cols, mascara)
+        # Barreiras por descobrir só em células ainda não visitadas
+        por_visitar = cells(FULL & ~visitadas)
+        for _ in range(rng.randint(0, 4)):
+            if por_visitar:
+                cell = rng.choice(por_visitar)
+                paredes.bloquear(cell // self.cols, cell % self.cols, rng.randrange(4))
+        casa = jogo.home_pos['row'] * self.cols + jogo.home_pos['col']
+        return Regras(manteiga if manteiga is not None else -1, torradeira, paredes,
+                      self.rows, self.cols, casa)
+
+    # -------------------------------
+    # Rollouts
+    # -------------------------------
+    def _recompensa(self, causa, jogadas):
+        if causa in ('casa', 'torradeira'):
+            return 1.0 - 0.01 * jogadas  # ganhar mais cedo vale mais
+        if causa == 'bolor':
+            return 0.0
+        return 0.2  # sobreviveu até ao horizonte
+
+    def _rollout(self, regras, robot, bolor, tem, jogadas):
+        rng = self.rng
+        dist = self.atlas.dist
+        while jogadas < HORIZONTE:
+            opcoes = []
+            for d, destino in regras.destinos(robot):
+                nb, ntem, causa = regras.avancar(robot, bolor, tem, destino)
+                if causa in ('casa', 'torradeira'):
+                    return self._recompensa(causa, jogadas + 1)
+                if causa is None:
+                    opcoes.append((destino, nb, ntem))
+            if not opcoes:
+                return 0.0
+            alvo = regras.casa if tem else regras.manteiga
+            if rng.random() < GULOSO:
+                destino, bolor, tem = min(opcoes, key=lambda o: (dist[o[0]][alvo], rng.random()))
+            else:
+                destino, bolor, tem = rng.choice(opcoes)
+            robot = destino
+            jogadas += 1
+        return self._recompensa(None, jogadas)
+
+    def _iteracao(self, raiz, regras, robot, bolor, tem, bloqueadas):
+        """Uma descida na árvore, um rollout e a propagação do resultado"""
+        caminho = [raiz]
+        no = raiz
+        jogadas = 0
+        causa = None
+        while True:
+            legais = regras.destinos(robot, bloqueadas if jogadas == 0 else None)
+            if not legais:
+                causa = 'bolor'
+                break
+            # Expande uma jogada por visitar, senão escolhe por UCB1
+            novas = [(d, destino) for d, destino in legais if JOGADAS[d] not in no.filhos]
+            if novas:
+                d, destino = self.rng.choice(novas)
+                filho = no.filhos[JOGADAS[d]] = _No()
+                expandiu = True
+            else:
+                log_n = math.log(no.visitas + 1)
+                d, destino = max(legais, key=lambda j: (no.filhos[JOGADAS[j[0]]].soma / no.filhos[JOGADAS[j[0]]].visitas +
+                                                        EXPLORACAO * math.sqrt(log_n / no.filhos[JOGADAS[j[0]]].visitas)))
+                filho = no.filhos[JOGADAS[d]]
+                expandiu = False
+            bolor, tem, causa = regras.avancar(robot, bolor, tem, destino)
+            robot = destino
+            jogadas += 1
+            caminho.append(filho)
+            no = filho
+            if causa is not None or expandiu:
+                break
+
+        if causa is not None:
+            valor = self._recompensa(causa, jogadas)
+        else:
+            valor = self._rollout(regras, robot, bolor, tem, jogadas)
+        for no in caminho:
+            no.visitas += 1
+            no.soma += valor
+        self.rollouts += 1
+
+    # -------------------------------
+    # Decisão
+    # -------------------------------
+    def jogada(self, jogo):
+        """Jogada mais visitada da raiz ('w', 's', 'a', 'd'), ou None se não há jogadas"""
+        start = time.time()
+        robot = jogo.robot_pos['row'] * self.cols + jogo.robot_pos['col']
+        bolor = jogo.bolor_pos['row'] * self.cols + jogo.bolor_pos['col']
+        bloqueadas = jogo.paredes_descobertas.mascaras[robot]
+        crencas = self._crencas(jogo)
+        raiz = _No()
+        rollouts = self.rollouts
+        limite = start + self.orcamento if self.orcamento else None
+        iteracao = 0
+        while (time.time() < limite) if limite is not None else iteracao < self.iteracoes:
+            regras = self.amostrar(jogo, crencas)
+            self._iteracao(raiz, regras, robot, bolor, jogo.has_butter, bloqueadas)
+            iteracao += 1
+        elapsed = time.time() - start
+        self.tempo += elapsed
+        if not raiz.filhos:
+            return None
+        visitas = {letra: no.visitas for letra, no in raiz.filhos.items()}
+        self.ultima = {
+            'rollouts': self.rollouts - rollouts,
+            'tempo': elapsed,
+            'visitas': visitas,
+            'valor': {letra: no.soma / no.visitas for letra, no in raiz.filhos.items()},
+        }
+        # Mais visitada; empates pela ordem w, s, a, d
+        return max(JOGADAS, key=lambda letra: (visitas.get(letra, -1), -JOGADAS.index(letra)))
+
+    def rollouts_por_segundo(self):
+        return self.rollouts / self.tempo if self.tempo else 0.0
+
+
+def _bench():
+    from simulate import GameBoard, game_seed
+
+    for i in range(3):
+        game = GameBoard(headless=True, tabuleiro_aleatorio=True, seed=game_seed(0, i),
+                         estrategia='mcts', iteracoes=400)
+        move = game.get_autonomous_move()[0]
+        ultima = game.mcts.ultima
+        print(f"jogo {i}: {move}  visitas {ultima['visitas']}  "
+              f"valor {{{', '.join(f'{k}: {v:.2f}' for k, v in ultima['valor'].items())}}}  "
+              f"{ultima['rollouts'] / ultima['tempo']:.0f} rollouts/s")
+
+    start = time.perf_counter()
+    results = [GameBoard(headless=True, tabuleiro_aleatorio=True, seed=game_seed(1, i),
+                         estrategia='mcts', iteracoes=200).play_game_autonomous() for i in range(50)]
+    wins = sum(r['won'] for r in results)
+    print(f"50 jogos com 200 iterações: {wins} vitórias, {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    _bench()
@@ -0,0 +1,358 @@
+"""
+Oráculo com informação completa: o jogo ótimo de um cenário do GameBoard.
+
+Com manteiga_pos, torradeira_pos e as barreiras verdadeiras o jogo é
+determinístico, e os estados são só (robot, bolor, has_butter). O Oraculo faz
+análise retrógrada sobre todos esses estados, com as regras exatas do
+play_game_autonomous:
+
+- o robot anda, depois check_game_state (apanhar a manteiga sai logo, sem
+  mais verificações; casa com manteiga; bolor no robot; bolor na torradeira)
+- o bolor anda e volta a verificar; se o robot foi para a torradeira o bolor
+  anda mais uma vez (a jogada saltada), sem contar como jogada do robot
+- o robot só é bloqueado pelas barreiras descobertas. Ao chegar a uma célula
+  descobre as barreiras dela, por isso só as barreiras da casa na primeira
+  jogada é que não contam (ver jogada/valores com bloqueadas)
+
+Para cada estado fica o número mínimo de jogadas até ganhar, ou se a derrota
+é forçada (o bolor apanha o robot em todas as linhas) ou se o robot só
+consegue sobreviver sem ganhar. Dá o limite inferior do número de jogadas
+de cada jogo e separa os tabuleiros impossíveis dos jogos mal jogados.
+
+Uso:
+    python oraculo.py --games 10000 --seed 1 --workers 8
+"""
+from bitboard import DELTAS
+from bolor import get_tabela_bolor
+
+JOGADAS = 'wsad'
+
+VITORIA = 'vitoria'
+DERROTA = 'derrota'    # derrota forçada
+EMPATE = 'empate'      # sobrevive mas não consegue ganhar
+
+
+class Regras:
+    """As regras de um turno para um cenário conhecido (sem resolver nada)"""
+
+    def __init__(self, manteiga, torradeira, paredes, rows=6, cols=6, casa=0):
+        """
+        manteiga, torradeira: células (row * cols + col)
+        paredes: MapaParedes com as barreiras verdadeiras
+        """
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.manteiga = manteiga
+        self.torradeira = torradeira
+        self.paredes = paredes
+        self.casa = casa
+        self.passo = get_tabela_bolor(rows, cols).passo
+
+    @classmethod
+    def de_jogo(cls, game):
+        """Regras (ou Oraculo) do cenário de um GameBoard (antes de a manteiga ser apanhada)"""
+        cols = game.size
+        return cls(game.manteiga_pos['row'] * cols + game.manteiga_pos['col'],
+                   game.torradeira_pos['row'] * cols + game.torradeira_pos['col'],
+                   game.paredes, game.size, cols,
+                   game.home_pos['row'] * cols + game.home_pos['col'])
+
+    # -------------------------------
+    # Regras
+    # -------------------------------
+    def _verificar(self, robot, bolor, tem):
+        """check_game_state: devolve (tem, causa) com causa None se o jogo continua"""
+        if not tem and robot == self.manteiga:
+            return True, None
+        if tem and robot == self.casa:
+            return tem, 'casa'
+        if bolor == robot:
+            return tem, 'bolor'
+        if bolor == self.torradeira:
+            return tem, 'torradeira'
+        return tem, None
+
+    def avancar(self, robot, bolor, tem, destino):
+        """
+        Uma jogada do robot para destino e o(s) passo(s) do bolor.
+        Returns: (bolor, tem, causa), causa None se o jogo continua
+        """
+        tem, causa = self._verificar(destino, bolor, tem)
+        if causa is not None:
+            return bolor, tem, causa
+        for _ in range(2 if destino == self.torradeira else 1):
+            bolor = self.passo[destino][bolor]
+            tem, causa = self._verificar(destino, bolor, tem)
+            if causa is not None:
+                return bolor, tem, causa
+        return bolor, tem, None
+
+    def destinos(self, robot, bloqueadas=None):
+        """(direção, célula) das jogadas possíveis; bloqueadas: máscara de 4 bits (None = verdadeira)"""
+        if bloqueadas is None:
+            bloqueadas = self.paredes.mascaras[robot]
+        row, col = robot // self.cols, robot % self.cols
+        result = []
+        for d in range(4):
+            dr, dc = DELTAS[d]
+            if 0 <= row + dr < self.rows and 0 <= col + dc < self.cols and not bloqueadas & (1 << d):
+                result.append((d, (row + dr) * self.cols + col + dc))
+        return result
+
+
+class Oraculo(Regras):
+    def __init__(self, manteiga, torradeira, paredes, rows=6, cols=6, casa=0):
+        Regras.__init__(self, manteiga, torradeira, paredes, rows, cols, casa)
+        self._resolver()
+
+    def estado(self, robot, bolor, tem):
+        return (int(tem) * self.cells + robot) * self.cells + bolor
+
+    # -------------------------------
+    # Análise retrógrada
+    # -------------------------------
+    def _resolver(self):
+        cells = self.cells
+        total = 2 * cells * cells
+        self.distancia = [0] * total     # jogadas até ganhar (0 = sem vitória)
+        self.perdido = [False] * total   # derrota forçada
+        anteriores = [[] for _ in range(total)]
+        abertas = [0] * total            # jogadas que ainda não se sabe se perdem
+        frente = []
+        dist = self.distancia
+        torradeira = self.torradeira
+
+        # O mesmo que avancar, desdobrado: o que não depende do bolor é
+        # decidido uma vez por (tem, robot, destino)
+        for tem in (0, 1):
+            for robot in range(cells):
+                base = (tem * cells + robot) * cells
+                for _, destino in self.destinos(robot):
+                    if tem and destino == self.casa:
+                        # Casa com manteiga ganha antes de qualquer outra verificação
+                        for bolor in range(cells):
+                            s = base + bolor
+                            if bolor != robot and not dist[s]:
+                                dist[s] = 1
+                                frente.append(s)
+                        continue
+                    apanha = not tem and destino == self.manteiga
+                    seguinte = ((1 if apanha else tem) * cells + destino) * cells
+                    passo = self.passo[destino]
+                    passos = 2 if destino == torradeira else 1
+                    for bolor in range(cells):
+                        if bolor == robot:
+                            continue
+                        s = base + bolor
+                        if not apanha:
+                            if bolor == destino:
+                                continue
+                            if bolor == torradeira:
+                                if not dist[s]:
+                                    dist[s] = 1
+                                    frente.append(s)
+                                continue
+                        nb = bolor
+                        causa = None
+                        for _ in range(passos):
+                            nb = passo[nb]
+                            if nb == destino:
+                                causa = 'bolor'
+                                break
+                            if nb == torradeira:
+                                causa = 'torradeira'
+                                break
+                        if causa == 'bolor':
+                            continue
+                        if causa is not None:
+                            if not dist[s]:
+                                dist[s] = 1
+                                frente.append(s)
+                            continue
+                        anteriores[seguinte + nb].append(s)
+                        abertas[s] += 1
+
+        perdidos = []
+        for s in range(total):
+            robot, bolor = (s // cells) % cells, s % cells
+            if robot != bolor and not abertas[s] and not dist[s]:
+                self.perdido[s] = True
+                perdidos.append(s)
+
+        # Vitórias: pesquisa em largura para trás
+        distancia = 1
+        while frente:
+            distancia += 1
+            seguinte = []
+            for s in frente:
+                for anterior in anteriores[s]:
+                    if not self.distancia[anterior]:
+                        self.distancia[anterior] = distancia
+                        seguinte.append(anterior)
+            frente = seguinte
+
+        # Derrotas forçadas: todas as jogadas perdem já ou vão para estados perdidos
+        while perdidos:
+            s = perdidos.pop()
+            for anterior in anteriores[s]:
+                abertas[anterior] -= 1
+                if not abertas[anterior] and not self.distancia[anterior] and not self.perdido[anterior]:
+                    self.perdido[anterior] = True
+                    perdidos.append(anterior)
+
+    # -------------------------------
+    # Consultas
+    # -------------------------------
+    def valor(self, robot, bolor, tem):
+        """(resultado, jogadas): (VITORIA, n), (DERROTA, None) ou (EMPATE, None)"""
+        s = self.estado(robot, bolor, tem)
+        if self.distancia[s]:
+            return VITORIA, self.distancia[s]
+        return (DERROTA if self.perdido[s] else EMPATE), None
+
+    def valores(self, robot, bolor, tem, bloqueadas=None):
+        """
+        Valor de cada jogada possível: {letra: (resultado, jogadas)}, com as
+        jogadas a contar com esta. Uma jogada que perde logo é (DERROTA, 1).
+        """
+        result = {}
+        for d, destino in self.destinos(robot, bloqueadas):
+            nb, ntem, causa = self.avancar(robot, bolor, tem, destino)
+            if causa == 'bolor':
+                result[JOGADAS[d]] = (DERROTA, 1)
+            elif causa is not None:
+                result[JOGADAS[d]] = (VITORIA, 1)
+            else:
+                resultado, jogadas = self.valor(destino, nb, ntem)
+                result[JOGADAS[d]] = (resultado, jogadas + 1 if jogadas else None)
+        return result
+
+    def jogada(self, robot, bolor, tem, bloqueadas=None):
+        """Melhor jogada (vitória mais rápida; senão sobreviver), ou None se todas perdem"""
+        melhor, chave = None, None
+        for letra, (resultado, jogadas) in self.valores(robot, bolor, tem, bloqueadas).items():
+            ordem = (2, -jogadas) if resultado == VITORIA else (1, 0) if resultado == EMPATE else (0, 0)
+            if chave is None or ordem > chave:
+                melhor, chave = letra, ordem
+        return melhor
+
+    def inicio(self, bolor=None):
+        """
+        Valor do estado inicial (robot em casa, barreiras da casa ainda por descobrir).
+        Returns: (resultado, jogadas)
+        """
+        if bolor is None:
+            bolor = self.cells - 1
+        melhor = (DERROTA, None)
+        for resultado, jogadas in self.valores(self.casa, bolor, False, 0).values():
+            if resultado == VITORIA and (melhor[0] != VITORIA or jogadas < melhor[1]):
+                melhor = (resultado, jogadas)
+            elif resultado == EMPATE and melhor[0] == DERROTA:
+                melhor = (resultado, None)
+        return melhor
+
+
+# -------------------------------
+# Corpus de cenários em paralelo
+# -------------------------------
+class Comparacao:
+    """Contadores inteiros heurística vs. oráculo (somáveis entre blocos)"""
+
+    def __init__(self):
+        self.jogos = 0
+        self.ganhaveis = 0            # o oráculo ganha
+        self.perdidos = 0             # derrota forçada desde o início
+        self.empates = 0              # o oráculo só sobrevive
+        self.vitorias = 0             # a heurística ganha
+        self.mal_jogados = 0          # ganháveis que a heurística não ganhou
+        self.soma_otimo = 0           # jogadas ótimas nos jogos que os dois ganham
+        self.soma_heuristica = 0      # jogadas da heurística nesses jogos
+        self.regret = {}              # jogadas a mais -> número de jogos
+
+    def add(self, otimo, result):
+        resultado, jogadas = otimo
+        self.jogos += 1
+        self.vitorias += result['won']
+        if resultado == VITORIA:
+            self.ganhaveis += 1
+            if result['won']:
+                self.soma_otimo += jogadas
+                self.soma_heuristica += result['moves']
+                extra = result['moves'] - jogadas
+                self.regret[extra] = self.regret.get(extra, 0) + 1
+            else:
+                self.mal_jogados += 1
+        elif resultado == DERROTA:
+            self.perdidos += 1
+        else:
+            self.empates += 1
+
+    def merge(self, other):
+        for name in ('jogos', 'ganhaveis', 'perdidos', 'empates', 'vitorias', 'mal_jogados',
+                     'soma_otimo', 'soma_heuristica'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for extra, count in other.regret.items():
+            self.regret[extra] = self.regret.get(extra, 0) + count
+
+
+def correr_bloco(first, count, seed, tabuleiro_aleatorio=True, max_moves=100, estrategia='heuristica'):
+    """Compara os jogos [first, first + count) com o oráculo (num worker)"""
+    from simulate import GameBoard, game_seed
+
+    comparacao = Comparacao()
+    for index in range(first, first + count):
+        game = GameBoard(headless=True, tabuleiro_aleatorio=tabuleiro_aleatorio,
+                         seed=game_seed(seed, index), estrategia=estrategia)
+        otimo = Oraculo.de_jogo(game).inicio()
+        comparacao.add(otimo, game.play_game_autonomous(max_moves))
+    return comparacao
+
+
+def comparar(games, seed=0, workers=None, chunk=250, **kwargs):
+    from concurrent.futures import ProcessPoolExecutor
+    from torneio import blocos
+
+    total = Comparacao()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(correr_bloco, first, count, seed, **kwargs)
+                   for first, count in blocos(games, chunk)]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+def main(argv=None):
+    import argparse
+    import os
+    import time
+
+    parser = argparse.ArgumentParser(description="Heurística contra o oráculo com informação completa")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=250)
+    parser.add_argument("--max-moves", type=int, default=100)
+    parser.add_argument("--estrategia", choices=("heuristica", "pesquisa"), default="heuristica")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    c = comparar(args.games, args.seed, args.workers, args.chunk,
+                 max_moves=args.max_moves, estrategia=args.estrategia)
+    elapsed = time.perf_counter() - start
+    print(f"Jogos: {c.jogos}")
+    print(f"Oráculo: {c.ganhaveis} ganháveis, {c.perdidos} derrotas forçadas, {c.empates} sem vitória possível")
+    print(f"{args.estrategia}: {c.vitorias} vitórias "
+          f"({100.0 * c.vitorias / max(c.ganhaveis, 1):.1f}% dos ganháveis), {c.mal_jogados} ganháveis perdidos")
+    ganhos = c.ganhaveis - c.mal_jogados
+    if ganhos:
+        print(f"Jogadas nos jogos ganhos: ótimo {c.soma_otimo / ganhos:.2f}, "
+              f"{args.estrategia} {c.soma_heuristica / ganhos:.2f} "
+              f"(regret médio {(c.soma_heuristica - c.soma_otimo) / ganhos:.2f})")
+        print("Regret (jogadas a mais: jogos): " +
+              ", ".join(f"{k}: {v}" for k, v in sorted(c.regret.items())[:15]))
+    print(f"Tempo: {elapsed:.2f}s ({c.jogos / elapsed:.0f} jogos/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Mapa de paredes indexado por célula.
+
+Cada célula guarda uma máscara de 4 bits com as direções bloqueadas (bit d
+ligado = barreira na direção d, pela ordem UP, DOWN, LEFT, RIGHT do bitboard,
+a mesma das jogadas w, s, a, d). Bloquear uma parede atualiza as duas
+células de uma vez, e can_move / neighbors são consultas a tabelas, em vez
+de percorrer o conjunto de barreiras. Só usa listas e inteiros (corre no EV3).
+"""
+from bitboard import DELTAS, DOWN, LEFT, RIGHT, UP
+
+OPOSTA = (DOWN, UP, RIGHT, LEFT)
+LETRAS = ('U', 'D', 'L', 'R')
+
+
+class MapaParedes:
+    def __init__(self, rows=6, cols=6):
+        self.rows = rows
+        self.cols = cols
+        self.mascaras = [0] * (rows * cols)
+        # vizinho[c][d]: célula ao lado de c na direção d, ou None fora do tabuleiro
+        self.vizinho = []
+        for cell in range(rows * cols):
+            row, col = cell // cols, cell % cols
+            lados = []
+            for dr, dc in DELTAS:
+                r, c = row + dr, col + dc
+                lados.append(r * cols + c if 0 <= r < rows and 0 <= c < cols else None)
+            self.vizinho.append(lados)
+        # Vizinhos acessíveis de cada célula (recalculados só nas células bloqueadas)
+        self._acessiveis = [[c for c in lados if c is not None] for lados in self.vizinho]
+
+    def celula(self, row, col):
+        return row * self.cols + col
+
+    def direcao(self, from_pos, to_pos):
+        """Direção (UP, DOWN, LEFT, RIGHT) de from_pos para to_pos, ou None se não forem vizinhas"""
+        delta = (to_pos[0] - from_pos[0], to_pos[1] - from_pos[1])
+        if delta not in DELTAS:
+            return None
+        return DELTAS.index(delta)
+
+    # -------------------------------
+    # Atualização
+    # -------------------------------
+    def bloquear(self, row, col, direction):
+        """
+        Coloca uma parede do lado direction de (row, col) e do lado oposto da
+        célula vizinha. Returns: True se a parede era nova
+        """
+        cell = self.celula(row, col)
+        if self.mascaras[cell] & (1 << direction):
+            return False
+        self.mascaras[cell] |= 1 << direction
+        self._atualizar(cell)
+        other = self.vizinho[cell][direction]
+        if other is not None:
+            self.mascaras[other] |= 1 << OPOSTA[direction]
+            self._atualizar(other)
+        return True
+
+    def bloquear_mascara(self, row, col, mascara):
+        """Bloqueia todas as direções de mascara em (row, col). Returns: True se alguma era nova"""
+        nova = False
+        for d in range(4):
+            if mascara & (1 << d) and self.bloquear(row, col, d):
+                nova = True
+        return nova
+
+    def bloquear_entre(self, from_pos, to_pos):
+        """Parede entre duas células vizinhas (tuplas (row, col))"""
+        d = self.direcao(from_pos, to_pos)
+        if d is None:
+            return False
+        return self.bloquear(from_pos[0], from_pos[1], d)
+
+    def adicionar(self, barriers):
+        """Adiciona um conjunto de pares ((row1, col1), (row2, col2))"""
+        for from_pos, to_pos in barriers:
+            self.bloquear_entre(from_pos, to_pos)
+
+    def _atualizar(self, cell):
+        mascara = self.mascaras[cell]
+        self._acessiveis[cell] = [c for d, c in enumerate(self.vizinho[cell])
+                                  if c is not None and not mascara & (1 << d)]
+
+    # -------------------------------
+    # Consultas
+    # -------------------------------
+    def mascara(self, row, col):
+        return self.mascaras[row * self.cols + col]
+
+    def bloqueado(self, row, col, direction):
+        return bool(self.mascaras[row * self.cols + col] & (1 << direction))
+
+    def can_move(self, from_pos, to_pos):
+        """False se há uma parede entre from_pos e to_pos"""
+        d = self.direcao(from_pos, to_pos)
+        return d is None or not self.mascaras[from_pos[0] * self.cols + from_pos[1]] & (1 << d)
+
+    def neighbors(self, cell):
+        """Índices das células acessíveis a partir de cell"""
+        return self._acessiveis[cell]
+
+    def direcoes(self, row, col):
+        """Letras das direções bloqueadas em (row, col) ('U', 'D', 'L', 'R')"""
+        mascara = self.mascaras[row * self.cols + col]
+        return [LETRAS[d] for d in range(4) if mascara & (1 << d)]
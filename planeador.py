@@ -0,0 +1,304 @@
+"""
+Planeador com pesquisa em profundidade limitada sobre as jogadas do robot.
+
+Como o bolor é determinístico (bolor.TabelaBolor), uma sequência de jogadas
+do robot define o jogo todo: a pesquisa é só de maximização, sem adversário.
+Usa o que o robot sabe (barreiras descobertas, manteiga/torradeira conhecidas
+e candidatos da manteiga) e não simula leituras futuras.
+
+- ordenação das jogadas: a melhor jogada da tabela de transposição primeiro,
+  depois pela avaliação estática da célula de destino
+- poda: jogadas que perdem já são descartadas, e a pesquisa num nó pára
+  quando encontra a vitória mais rápida possível a partir dele
+- tabela de transposição por (robot, bolor, has_butter, hash das crenças),
+  esvaziada quando as crenças mudam (as entradas antigas já não servem)
+- aprofundamento iterativo até à profundidade máxima ou ao fim do orçamento
+  de tempo (fica a jogada da última iteração completa)
+- com um custo.Custo (estratégia 'tempo'), cada jogada desconta os segundos
+  de robot que custa a partir do rumo do robot, por isso entre caminhos
+  parecidos fica o que tem menos mudanças de rumo. As leituras não entram
+  no desconto: a pesquisa não simula o que elas descobrem, e descontá-las
+  afastava o robot das células que localizam a manteiga e a torradeira
+
+python planeador.py corre os benchmarks (nós/s e latência por profundidade).
+"""
+import time
+
+from atlas import get_atlas
+from bitboard import FULL, cells
+from bolor import get_tabela_bolor
+
+# (letra da jogada, delta) pela ordem do get_autonomous_move
+JOGADAS = (('w', -1, 0), ('s', 1, 0), ('a', 0, -1), ('d', 0, 1))
+
+VITORIA = 100000
+DERROTA = -100000
+PASSO = 100  # vencer mais cedo (ou perder mais tarde) vale PASSO por jogada
+FORCADO = VITORIA // 2  # |valor| acima disto é um resultado forçado
+PONTOS_CASA = 20  # pontos de uma casa de distância na avaliação estática
+
+
+def _recuar(valor):
+    """Valor de um filho visto do pai: resultados forçados ficam uma jogada mais longe"""
+    if valor > FORCADO:
+        return valor - PASSO
+    if valor < -FORCADO:
+        return valor + PASSO
+    return valor
+
+
+class _TempoEsgotado(Exception):
+    pass
+
+
+class Crencas:
+    """O que o robot sabe, em índices de célula (o estado que a pesquisa usa)"""
+
+    def __init__(self, manteiga=None, candidatos=None, torradeira=None, paredes=None, casa=0,
+                 explorar=0, rows=6, cols=6):
+        self.manteiga = manteiga        # célula conhecida da manteiga ou None
+        self.candidatos = candidatos    # células possíveis da manteiga (lista) ou None
+        self.torradeira = torradeira    # célula conhecida da torradeira ou None
+        self.paredes = paredes          # MapaParedes das barreiras descobertas ou None
+        self.casa = casa
+        self.explorar = explorar        # bitboard das células a explorar (à procura da torradeira)
+        paredes_hash = tuple(paredes.mascaras) if paredes is not None else None
+        self.chave = (manteiga, tuple(candidatos) if candidatos else None, torradeira, paredes_hash, explorar)
+        # Distância de cada célula ao candidato da manteiga / célula a explorar mais próxima
+        atlas = get_atlas(rows, cols)
+        self.dist_candidatos = _distancia_minima(atlas, candidatos)
+        self.dist_explorar = _distancia_minima(atlas, cells(explorar))
+
+
+def _distancia_minima(atlas, alvos):
+    if not alvos:
+        return None
+    if len(alvos) == 1:
+        return atlas.dist[alvos[0]]
+    return list(map(min, *[atlas.dist[c] for c in alvos]))
+
+
+def crencas_de(jogo):
+    """Crencas de um GameBoard ou Cerebro"""
+    cols = jogo.size
+
+    def cell(pos):
+        return pos['row'] * cols + pos['col'] if pos else None
+
+    localizador = jogo.localizador_manteiga
+    torradeira = jogo.localizador_torradeira
+    # Sem torradeira conhecida: explorar os candidatos dela, ou as células por visitar
+    explorar = 0
+    if not torradeira.localizada():
+        explorar = torradeira.candidatos() if torradeira.quentes else FULL & ~jogo.visitadas & ~1
+    return Crencas(manteiga=cell(jogo.known_manteiga),
+                   candidatos=localizador.candidatos if localizador.tem_leituras() else None,
+                   torradeira=cell(jogo.known_torradeira),
+                   paredes=jogo.paredes_descobertas,
+                   casa=cell(jogo.home_pos),
+                   explorar=explorar, rows=jogo.size, cols=cols)
+
+
+class Planeador:
+    def __init__(self, profundidade=4, orcamento=None, rows=6, cols=6, custo=None):
+        """
+        profundidade: profundidade máxima (em jogadas do robot)
+        orcamento: tempo máximo por decisão em segundos (None = sem limite)
+        custo: custo.Custo para descontar os segundos de cada jogada, ou None
+        """
+        self.profundidade = profundidade
+        self.orcamento = orcamento
+        self.rows = rows
+        self.cols = cols
+        self.custo = custo
+        # A jogada mais barata (sem rodar) desconta o mesmo que uma casa de distância
+        self.pontos = PONTOS_CASA / custo.segundos('s', 's') if custo is not None else 0.0
+        self.bolor = get_tabela_bolor(rows, cols)
+        self.atlas = get_atlas(rows, cols)
+        # chave -> (profundidade restante, valor, melhor célula), das crenças self._crencas
+        self.tt = {}
+        self._crencas = None
+        self.nos = 0
+        self.profundidade_atingida = 0
+        self._limite = None
+
+    # -------------------------------
+    # Avaliação
+    # -------------------------------
+    def avaliar(self, robot, bolor, tem, crencas):
+        """Avaliação estática de uma posição não terminal"""
+        dist = self.atlas.dist[robot]
+        if tem:
+            return 2000 - 20 * dist[crencas.casa]
+        score = -1000
+        if crencas.manteiga is not None:
+            # Corrida pela manteiga: só vale se o robot lá chega primeiro
+            if dist[crencas.manteiga] < self.atlas.dist[bolor][crencas.manteiga]:
+                score = 1000 - 20 * dist[crencas.manteiga]
+        elif crencas.dist_candidatos is not None:
+            score = 500 - 20 * crencas.dist_candidatos[robot]
+        if crencas.torradeira is not None:
+            # Atrair o bolor para a torradeira
+            score = max(score, 1000 - 60 * self.atlas.dist[bolor][crencas.torradeira])
+        elif crencas.dist_explorar is not None:
+            score = max(score, -20 * crencas.dist_explorar[robot])
+        if self.atlas.dist[bolor][robot] <= 1:
+            score -= 300
+        return score
+
+    def transicao(self, robot, bolor, tem, destino, crencas):
+        """
+        Aplica a jogada do robot para destino e o(s) passo(s) do bolor.
+        Returns: (bolor, tem, resultado) com resultado 1 = vitória, -1 = derrota, 0 = continua
+        """
+        if destino == bolor:
+            return bolor, tem, -1
+        if not tem and destino == crencas.manteiga:
+            tem = True
+        elif tem and destino == crencas.casa:
+            return bolor, tem, 1
+        passos = 2 if destino == crencas.torradeira else 1  # a torradeira faz saltar uma jogada
+        for _ in range(passos):
+            bolor = self.bolor.passo[destino][bolor]
+            if bolor == destino:
+                return bolor, tem, -1
+            if bolor == crencas.torradeira:
+                return bolor, tem, 1
+        return bolor, tem, 0
+
+    def vizinhos(self, robot, crencas):
+        if crencas.paredes is not None:
+            return crencas.paredes.neighbors(robot)
+        return self.bolor.vizinhos[robot]
+
+    def letra(self, robot, destino):
+        """Letra da jogada de robot para a célula vizinha destino"""
+        delta = destino - robot
+        if delta == -self.cols:
+            return 'w'
+        if delta == self.cols:
+            return 's'
+        return 'a' if delta == -1 else 'd'
+
+    def desconto(self, robot, destino, rumo):
+        """Pontos descontados pela jogada (segundos de robot) e rumo depois dela"""
+        if self.custo is None:
+            return 0, rumo
+        move = self.letra(robot, destino)
+        return self.pontos * self.custo.segundos(rumo, move), self.custo.rumo_depois(rumo, move)
+
+    # -------------------------------
+    # Pesquisa
+    # -------------------------------
+    def _procurar(self, robot, bolor, tem, restante, crencas, rumo=None):
+        """Valor da posição (relativo a ela, não à raiz) e melhor célula seguinte"""
+        self.nos += 1
+        if self._limite is not None and not self.nos & 255 and time.time() > self._limite:
+            raise _TempoEsgotado()
+        if restante == 0:
+            return self.avaliar(robot, bolor, tem, crencas), None
+
+        key = (robot, bolor, tem, crencas.chave, rumo)
+        entrada = self.tt.get(key)
+        if entrada is not None and entrada[0] >= restante:
+            return entrada[1], entrada[2]
+
+        filhos = []
+        for destino in self.vizinhos(robot, crencas):
+            nb, ntem, resultado = self.transicao(robot, bolor, tem, destino, crencas)
+            if resultado < 0:
+                continue  # perde já: nunca é melhor do que uma jogada que sobrevive
+            desconto, nrumo = self.desconto(robot, destino, rumo)
+            if resultado > 0:
+                valor = VITORIA - PASSO - desconto
+                self.tt[key] = (restante, valor, destino)
+                return valor, destino  # não há vitória mais rápida a partir daqui
+            ordem = self.avaliar(destino, nb, ntem, crencas)
+            if entrada is not None and destino == entrada[2]:
+                ordem = VITORIA
+            filhos.append((ordem, destino, nb, ntem, desconto, nrumo))
+
+        melhor, melhor_destino = DERROTA + PASSO, None
+        filhos.sort(key=lambda f: -f[0])
+        for _, destino, nb, ntem, desconto, nrumo in filhos:
+            valor = _recuar(self._procurar(destino, nb, ntem, restante - 1, crencas, nrumo)[0]) - desconto
+            if valor > melhor:
+                melhor, melhor_destino = valor, destino
+                if melhor >= VITORIA - 2 * PASSO and self.custo is None:
+                    break  # vitória na jogada seguinte: nada a fazer melhor
+        self.tt[key] = (restante, melhor, melhor_destino)
+        return melhor, melhor_destino
+
+    def escolher(self, robot, bolor, tem, crencas, rumo=None):
+        """
+        Melhor célula para a próxima jogada do robot (rumo: letra para onde o
+        robot está virado, só conta com custo).
+        Returns: (célula, valor), célula None se todas as jogadas perdem
+        """
+        self._limite = time.time() + self.orcamento if self.orcamento else None
+        if crencas.chave != self._crencas:
+            self.tt.clear()
+            self._crencas = crencas.chave
+        escolha = (None, DERROTA)
+        self.profundidade_atingida = 0
+        for profundidade in range(1, self.profundidade + 1):
+            try:
+                valor, destino = self._procurar(robot, bolor, tem, profundidade, crencas, rumo)
+            except _TempoEsgotado:
+                break
+            escolha = (destino, valor)
+            self.profundidade_atingida = profundidade
+            if valor > FORCADO or valor < -FORCADO:
+                break  # resultado forçado: mais profundidade não muda a decisão
+        return escolha
+
+    def jogada(self, jogo):
+        """Letra da jogada ('w', 's', 'a', 'd') para um GameBoard ou Cerebro, ou None"""
+        robot = jogo.robot_pos['row'] * self.cols + jogo.robot_pos['col']
+        bolor = jogo.bolor_pos['row'] * self.cols + jogo.bolor_pos['col']
+        rumo = jogo.rumo if self.custo is not None else None
+        destino, _ = self.escolher(robot, bolor, jogo.has_butter, crencas_de(jogo), rumo)
+        if destino is None:
+            return None
+        row, col = destino // self.cols, destino % self.cols
+        for move, dr, dc in JOGADAS:
+            if (jogo.robot_pos['row'] + dr, jogo.robot_pos['col'] + dc) == (row, col):
+                return move
+        return None
+
+
+def _bench():
+    import random
+    from simulate import GameBoard, game_seed
+
+    # Estados de jogos reais, tirados a meio de jogos com a heurística
+    estados = []
+    for i in range(60):
+        game = GameBoard(headless=True, tabuleiro_aleatorio=True, seed=game_seed(0, i))
+        for _ in range(random.Random(i).randrange(1, 12)):
+            if game.game_over:
+                break
+            if game.skip:
+                game.skip = False
+                game.move_bolor()
+                continue
+            move, strat = game.get_autonomous_move()
+            if game.move_robot(move, strat):
+                game.move_bolor()
+        if not game.game_over:
+            estados.append(game)
+
+    print(f"{len(estados)} estados")
+    for profundidade in (1, 2, 3, 4, 6, 8, 12):
+        planeador = Planeador(profundidade)
+        start = time.perf_counter()
+        for game in estados:
+            planeador.tt.clear()
+            planeador.jogada(game)
+        elapsed = time.perf_counter() - start
+        print(f"profundidade {profundidade}: {planeador.nos} nós, {planeador.nos / elapsed:.0f} nós/s, "
+              f"{1000 * elapsed / len(estados):.2f} ms por decisão")
+
+
+if __name__ == "__main__":
+    _bench()
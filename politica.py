@@ -0,0 +1,372 @@
+"""
+Política compilada: a jogada da heurística (_evaluate_move) numa tabela.
+
+No EV3 cada decisão da heurística faz quatro avaliações com prints, dicts e
+listas. A heurística só depende de um estado de decisão compacto:
+
+- célula do robot e do bolor, has_butter e manteiga_strat
+- candidatos da manteiga (bitboard; um só bit = manteiga localizada)
+- candidatos da torradeira (bitboard, 0 sem leituras quentes; um só bit = localizada)
+- barreiras descobertas da célula do robot (máscara de 4 bits)
+- penalização de revisitar cada vizinho (índice em last_positions)
+
+por isso o compilador joga muitos jogos no simulador, guarda a jogada e a
+mudança de estratégia de cada estado de decisão e grava a tabela ordenada
+em politica.bin (cabeçalho com o avaliador e a impressão da heurística
+dele, depois BYTES_CHAVE bytes de chave + 1 byte de valor por estado). No
+robot a decisão é uma pesquisa binária nesse ficheiro, carregado uma vez;
+estados que não estão na tabela usam a heurística ao vivo.
+
+O _evaluate_move do Cerebro não é igual ao do GameBoard, por isso a tabela
+diz com que avaliador foi compilada: 'simulate' (GameBoard) ou 'beast' (o
+Cerebro._evaluate_move aplicado aos jogos do simulador, precisa de conseguir
+importar o beast.py com o pybricks falso de ev3_virtual) e o Cerebro só
+carrega tabelas 'beast'. A impressão é um hash de tudo o que decide a
+jogada, lido dos ficheiros fonte: as funções do avaliador (escolha,
+_evaluate_move, bolor simulado), a chave(), os módulos localizador, bolor e
+bitboard e o PENALIZACAO_TORRADEIRA em uso. Se algum mudou desde a
+compilação a tabela está desatualizada e não é carregada (volta a
+heurística ao vivo) até se voltar a compilar. A tabela 'beast' vai com o projeto.
+
+As jogadas da tablebase do regresso (has_butter com vitória forçada) não são
+compiladas: já são uma consulta à tabela.
+
+Uso (a tabela que vai com o projeto é a do primeiro comando, voltar a
+correr depois de mudar a heurística do Cerebro ou os módulos dela):
+    python politica.py compilar --avaliador beast --games 20000 --seed 1 [--saida politica.bin]
+    python politica.py compilar --avaliador simulate   (-> politica_simulate.bin)
+    python politica.py verificar --games 2000 --seed 2
+"""
+try:
+    import os
+    _PASTA = os.path.dirname(os.path.abspath(__file__))
+except (ImportError, NameError, AttributeError):
+    _PASTA = ''  # MicroPython: relativo à pasta do projeto
+
+
+def _caminho(nome):
+    return os.path.join(_PASTA, nome) if _PASTA else nome
+
+
+CAMINHO = _caminho('politica.bin')
+# Tabela de cada avaliador: a do Cerebro é a que vai com o projeto
+CAMINHOS = {'beast': CAMINHO, 'simulate': _caminho('politica_simulate.bin')}
+FONTES = {'simulate': _caminho('simulate.py'), 'beast': _caminho('beast.py')}
+# Tudo o que decide a jogada: as funções do avaliador (escolha entre as jogadas,
+# pontuação e bolor simulado), a chave() deste ficheiro e os módulos de que a
+# pontuação depende (LocalizadorManteiga.distancia_minima, a penalização da
+# torradeira, TabelaBolor, bit)
+FUNCOES = {'simulate': ('get_autonomous_move', '_evaluate_move', 'simulate_move_bolor'),
+           'beast': ('avaliar_jogadas', '_evaluate_move', 'simulate_move_bolor')}
+MODULOS = (_caminho('localizador.py'), _caminho('bolor.py'), _caminho('bitboard.py'))
+
+JOGADAS = 'wsad'
+DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+BYTES_CHAVE = 15
+MAX_INDICE = 127  # índice em last_positions que cabe em 7 bits (acima disto: heurística ao vivo)
+MAGICO = b'PO2'  # 'POL' era o formato sem a impressão do avaliador
+AVALIADORES = {'simulate': b's', 'beast': b'b'}
+CABECALHO = 8     # MAGICO, avaliador, impressão (4 bytes)
+
+
+def _misturar(h, dados):
+    """FNV-1a de 32 bits: h com os bytes de dados"""
+    for c in dados:
+        h = ((h ^ c) * 0x01000193) & 0xffffffff
+    return h
+
+
+def _funcao(linhas, nome):
+    """Linhas não vazias (sem espaços no fim) da função nome: o def e o corpo"""
+    margem = None
+    for linha in linhas:
+        linha = linha.rstrip()
+        if not linha:
+            continue
+        recuo = len(linha) - len(linha.lstrip())
+        if margem is None:
+            if not linha.lstrip().startswith('def ' + nome + '('):
+                continue
+            margem = recuo
+        elif recuo <= margem:
+            break
+        yield linha
+
+
+def impressao(avaliador):
+    """
+    Impressão de tudo o que decide a jogada do avaliador: FNV-1a de 32 bits
+    das linhas não vazias das FUNCOES dele e da chave(), do texto dos MODULOS
+    e do PENALIZACAO_TORRADEIRA em uso. 0 se alguma fonte não se consegue ler
+    """
+    import localizador
+
+    try:
+        with open(FONTES[avaliador]) as f:
+            linhas = f.read().split('\n')
+        with open(_caminho('politica.py')) as f:
+            proprias = f.read().split('\n')
+        modulos = []
+        for caminho in MODULOS:
+            with open(caminho, 'rb') as f:
+                modulos.append(f.read())
+    except (OSError, KeyError):
+        return 0
+    h = 0x811c9dc5
+    for nome in FUNCOES[avaliador]:
+        for linha in _funcao(linhas, nome):
+            h = _misturar(h, linha.encode() + b'\n')
+    for linha in _funcao(proprias, 'chave'):
+        h = _misturar(h, linha.encode() + b'\n')
+    for dados in modulos:
+        h = _misturar(h, dados)
+    return _misturar(h, str(localizador.PENALIZACAO_TORRADEIRA).encode())
+
+
+def chave(jogo):
+    """
+    Estado de decisão de um GameBoard ou Cerebro como inteiro, ou None se não
+    cabe na tabela (ou se não há jogadas e a heurística escolhe ao acaso). Campos (do bit menos significativo): robot 6, bolor 6,
+    has_butter 1, manteiga_strat 1, paredes 4, revisitas 4 x 7,
+    manteiga 36, torradeira 36.
+    """
+    cols = jogo.size
+    row, col = jogo.robot_pos['row'], jogo.robot_pos['col']
+    robot = row * cols + col
+    bolor = jogo.bolor_pos['row'] * cols + jogo.bolor_pos['col']
+    manteiga = jogo.localizador_manteiga.mascara
+    torradeira = jogo.localizador_torradeira
+    quente = torradeira.candidatos() if (torradeira.quentes or torradeira.conhecida is not None) else 0
+    paredes = jogo.paredes_descobertas.mascaras[robot]
+
+    revisitas = 0
+    livres = 0
+    for d in range(4):
+        vizinho = (row + DELTAS[d][0], col + DELTAS[d][1])
+        if 0 <= vizinho[0] < jogo.size and 0 <= vizinho[1] < cols and not paredes & (1 << d):
+            livres += 1
+        indice = 0
+        for i in range(len(jogo.last_positions)):
+            if jogo.last_positions[i] == vizinho:
+                indice = i + 1
+                break
+        if indice > MAX_INDICE:
+            return None
+        revisitas |= indice << (7 * d)
+    if not livres:
+        return None
+
+    valor = robot | bolor << 6
+    valor |= int(jogo.has_butter) << 12 | int(jogo.manteiga_strat) << 13
+    valor |= paredes << 14
+    valor |= revisitas << 18
+    valor |= manteiga << 46
+    valor |= quente << 82
+    return valor
+
+
+def _valor(move, strat):
+    """Byte da tabela: 4 = entrada válida, direção nos bits 0-1, mudança de estratégia no bit 3"""
+    return 4 | JOGADAS.index(move) | (8 if strat else 0)
+
+
+class Politica:
+    def __init__(self, dados):
+        if dados[:3] != MAGICO or (len(dados) - CABECALHO) % (BYTES_CHAVE + 1):
+            raise ValueError("política com formato errado")
+        self.avaliador = None
+        for nome, codigo in AVALIADORES.items():
+            if dados[3:4] == codigo:
+                self.avaliador = nome
+        self.impressao = int.from_bytes(dados[4:CABECALHO], 'big')
+        self.dados = dados[CABECALHO:]
+        self.estados = len(self.dados) // (BYTES_CHAVE + 1)
+        self.consultas = 0
+        self.acertos = 0
+
+    @classmethod
+    def carregar(cls, caminho=CAMINHO, avaliador=None):
+        """
+        Lê a tabela do disco, ou None se o ficheiro não existir.
+        avaliador: se dado, a tabela tem de ter sido compilada com ele e com a
+        heurística atual dele (senão None: o robot usa a heurística ao vivo)
+        """
+        try:
+            with open(caminho, 'rb') as f:
+                politica = cls(f.read())
+        except OSError:
+            return None
+        if avaliador is not None:
+            if politica.avaliador != avaliador:
+                print("Política compilada para", politica.avaliador, "e não", avaliador + ": heurística ao vivo")
+                return None
+            if not politica.atual():
+                print("Política desatualizada (a heurística mudou): python politica.py compilar")
+                return None
+        return politica
+
+    def atual(self):
+        """Se a tabela foi compilada com a heurística atual do avaliador (sem fontes para ler: sim)"""
+        esperada = impressao(self.avaliador)
+        return not esperada or self.impressao == esperada
+
+    def procurar(self, valor):
+        """Byte guardado para a chave valor, ou 0 se não está na tabela"""
+        procurada = valor.to_bytes(BYTES_CHAVE, 'big')
+        dados = self.dados
+        largura = BYTES_CHAVE + 1
+        lo, hi = 0, self.estados
+        while lo < hi:
+            mid = (lo + hi) // 2
+            inicio = mid * largura
+            atual = dados[inicio:inicio + BYTES_CHAVE]
+            if atual < procurada:
+                lo = mid + 1
+            elif atual > procurada:
+                hi = mid
+            else:
+                return dados[inicio + BYTES_CHAVE]
+        return 0
+
+    def jogada(self, jogo):
+        """(jogada, mudar de estratégia) da heurística para o estado de jogo, ou None"""
+        self.consultas += 1
+        valor = chave(jogo)
+        if valor is None:
+            return None
+        byte = self.procurar(valor)
+        if not byte:
+            return None
+        self.acertos += 1
+        return JOGADAS[byte & 3], bool(byte & 8)
+
+
+# -------------------------------
+# Compilação
+# -------------------------------
+def _jogar(game, max_moves, tabela=None, conflitos=None, politica=None):
+    """
+    O ciclo do play_game_autonomous a registar o estado de cada decisão da
+    heurística em tabela, ou a comparar com a politica. Returns: decisões
+    diferentes da política (0 quando se compila)
+    """
+    diferentes = 0
+    moves = 0
+    while not game.game_over and moves < max_moves:
+        if game.skip:
+            game.skip = False
+            game.move_bolor()
+            continue
+        da_tablebase = game.has_butter and game.regresso.jogada_de(game) is not None
+        valor = None if da_tablebase else chave(game)
+        move, strat = game.get_autonomous_move()
+        if valor is not None:
+            byte = _valor(move, strat)
+            if tabela is not None:
+                anterior = tabela.setdefault(valor, byte)
+                if anterior != byte:
+                    conflitos.add(valor)
+            elif politica is not None:
+                guardado = politica.procurar(valor)
+                politica.consultas += 1
+                if guardado:
+                    politica.acertos += 1
+                    diferentes += guardado != byte
+        if game.move_robot(move, strat):
+            game.move_bolor()
+            moves += 1
+        else:
+            break
+    return diferentes
+
+
+def _novo_jogo(seed, index, avaliador):
+    """GameBoard do jogo index a decidir com a heurística do avaliador"""
+    from simulate import GameBoard, game_seed
+
+    game = GameBoard(headless=True, tabuleiro_aleatorio=True, seed=game_seed(seed, index))
+    if avaliador == 'beast':
+        import sys
+        import types
+        from virtual import PASTA
+        if PASTA not in sys.path:
+            sys.path.insert(0, PASTA)  # o pybricks falso
+        from beast import Cerebro
+        game._evaluate_move = types.MethodType(Cerebro._evaluate_move, game)
+    return game
+
+
+def compilar(games, seed=0, max_moves=100, avaliador='simulate'):
+    """Returns: ({chave: byte}, número de estados em conflito, que ficam de fora)"""
+    tabela = {}
+    conflitos = set()
+    for index in range(games):
+        _jogar(_novo_jogo(seed, index, avaliador), max_moves, tabela, conflitos)
+    for valor in conflitos:
+        del tabela[valor]
+    return tabela, len(conflitos)
+
+
+def guardar(tabela, avaliador, caminho=CAMINHO):
+    with open(caminho, 'wb') as f:
+        f.write(MAGICO + AVALIADORES[avaliador] + impressao(avaliador).to_bytes(4, 'big'))
+        for valor in sorted(tabela):
+            f.write(valor.to_bytes(BYTES_CHAVE, 'big'))
+            f.write(bytes((tabela[valor],)))
+
+
+def main(argv=None):
+    import argparse
+    import time
+    from contextlib import redirect_stdout
+
+    parser = argparse.ArgumentParser(description="Política da heurística compilada numa tabela")
+    sub = parser.add_subparsers(dest="modo", required=True)
+    comp = sub.add_parser("compilar", help="joga games jogos e grava a tabela das decisões")
+    comp.add_argument("--avaliador", choices=sorted(AVALIADORES), default="beast",
+                      help="heurística a compilar: a do Cerebro (beast) ou a do GameBoard (simulate)")
+    comp.add_argument("--games", type=int, default=20000)
+    comp.add_argument("--seed", type=int, default=1)
+    comp.add_argument("--saida", help="ficheiro da tabela (por omissão politica.bin para o beast, "
+                                      "politica_simulate.bin para o simulate)")
+    verif = sub.add_parser("verificar", help="cobertura e concordância da tabela em jogos novos")
+    verif.add_argument("--games", type=int, default=2000)
+    verif.add_argument("--seed", type=int, default=2)
+    verif.add_argument("--tabela", default=CAMINHO)
+    args = parser.parse_args(argv)
+
+    if args.modo == "compilar":
+        start = time.perf_counter()
+        # Sem os prints do Cerebro._evaluate_move
+        with open(os.devnull, 'w') as nulo, redirect_stdout(nulo):
+            tabela, conflitos = compilar(args.games, args.seed, avaliador=args.avaliador)
+        saida = args.saida or CAMINHOS[args.avaliador]
+        guardar(tabela, args.avaliador, saida)
+        tamanho = len(tabela) * (BYTES_CHAVE + 1)
+        print(f"{len(tabela)} estados ({conflitos} em conflito, fora da tabela), {tamanho // 1024} KiB "
+              f"-> {saida}; {time.perf_counter() - start:.1f}s")
+        return
+
+    politica = Politica.carregar(args.tabela)
+    if politica is None:
+        raise SystemExit("sem tabela: " + args.tabela)
+    if not politica.atual():
+        print(f"Aviso: tabela desatualizada, a heurística do {politica.avaliador} mudou desde a compilação")
+    diferentes = 0
+    with open(os.devnull, 'w') as nulo, redirect_stdout(nulo):
+        for index in range(args.games):
+            diferentes += _jogar(_novo_jogo(args.seed, index, politica.avaliador), 100, politica=politica)
+    print(f"{politica.estados} estados na tabela; {politica.consultas} decisões, "
+          f"{politica.acertos} na tabela ({100.0 * politica.acertos / max(politica.consultas, 1):.1f}%), "
+          f"{diferentes} diferentes da heurística")
+    start = time.perf_counter()
+    game = _novo_jogo(args.seed, 0, 'simulate')
+    for _ in range(10000):
+        politica.jogada(game)
+    print(f"Consulta: {100 * (time.perf_counter() - start):.1f} us por decisão")
+    if diferentes:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,11 @@ from pybricks.robotics import DriveBase
 from sys import exit
 import time
 import random
-from collections import deque
+from abertura import Abertura, observacao
+from atlas import disperse_table, populate_tabela
+from bitboard import DELTAS
+from localizador import LocalizadorTorradeira
+from tablebase import JOGADAS, get_regresso
 
 # -------------------------------
 # INICIALIZAÇÃO (variáveis EV3)
@@ -37,9 +41,11 @@ ambient = {
 }
 
 color_weights = {
+    Color.YELLOW: 8,
     Color.BROWN: 4,
     Color.GREEN: 2,
     Color.BLUE: 1,
+    Color.BLACK: 0
 }
 
 is_first_move = True
@@ -53,6 +59,9 @@ possible_zeros_manteiga = 36
 calor_torradeira = [[None] * 6 for _ in range(6)]
 possible_zeros_torradeira = 36
 
+# Erro de cada célula em relação a todas as leituras da manteiga (0 = candidata)
+erro_manteiga = [[0] * 6 for _ in range(6)]
+
 # Posição do bolor
 position_bolor = {'row': 5, 'col': 5}
 
@@ -72,50 +81,14 @@ home_pos = {'row': 0, 'col': 0} # Posição da “casa”/início
 manteiga_strat = True           # Estratégia de procurar manteiga
 known_manteiga = None           # Se descobrimos onde está a manteiga
 known_torradeira = None         # Se descobrimos onde está a torradeira
+REGRESSO = get_regresso()       # Tablebase do regresso a casa (carregada uma vez)
+LOCALIZADOR_TORRADEIRA = LocalizadorTorradeira()  # Candidatos da torradeira (para a tablebase)
+ABERTURA = Abertura.carregar()  # Livro de aberturas (None se não houver abertura.json)
+observacoes = []                # Observações de cada turno (chave do livro de aberturas)
 
 # -------------------------------
 #  Funções auxiliares
 # -------------------------------
-def has_numbers(table):
-    return any(cell is not None for row in table for cell in row)
-
-def disperse_table(table, value, row, col, radius=6):
-    for r in range(row - radius, row + radius + 1):
-        for c in range(col - radius, col + radius + 1):
-            if 0 <= r < len(table) and 0 <= c < len(table[0]):
-                distance = abs(r - row) + abs(c - col)
-                decremented_value = abs(value - distance)
-                table[r][c] = decremented_value
-
-def filter_table(table1, table2):
-    for row in range(len(table1)):
-        for col in range(len(table1[0])):
-            if table1[row][col] != table2[row][col]:
-                table1[row][col] = None
-
-def filter_table_min(table1, table2):
-    for row in range(len(table1)):
-        for col in range(len(table1[0])):
-            if table1[row][col] > table2[row][col]:
-                table1[row][col] = table2[row][col]
-
-def populate_tabela(table):
-    aux_tables = []
-    zeros = 0
-    for row in range(len(table)):
-        for col in range(len(table[0])):
-            if table[row][col] == 0:
-                zeros += 1
-                temp_table = [[None] * len(table[0]) for _ in range(len(table))]
-                disperse_table(temp_table, 0, row, col)
-                aux_tables.append(temp_table)
-    if aux_tables:
-        result_table = aux_tables[0]
-        for i in range(1, len(aux_tables)):
-            filter_table_min(result_table, aux_tables[i])
-        return result_table, zeros
-    return table, None
-
 def print_table(table, table_name):
     print("\n" + "=" * 50)
     print(table_name)
@@ -140,28 +113,66 @@ def print_all_tables(dist_manteiga, calor_torrad):
     print_table(calor_torrad, "Tabela de Calor da Torradeira")
 
 # -------------------------------
-# BFS para achar zero
+# Leituras (cartões de cor)
 # -------------------------------
-def find_nearest_zero(table, start_row, start_col):
-    rows, cols = len(table), len(table[0])
-    visited = [[False] * cols for _ in range(rows)]
-    queue = deque([(start_row, start_col, 0)])  # (row, col, dist)
-
-    while queue:
-        row, col, distance = queue.popleft()
-        if row < 0 or col < 0 or row >= rows or col >= cols or visited[row][col]:
-            continue
-        visited[row][col] = True
-        if table[row][col] == 0:
-            return (row, col, distance)
-        # Adiciona vizinhos
-        queue.extend([
-            (row - 1, col, distance + 1),
-            (row + 1, col, distance + 1),
-            (row, col - 1, distance + 1),
-            (row, col + 1, distance + 1)
-        ])
-    return None
+def get_distance(text):
+    has_found = False
+    distance = 0
+    colors_shown = set()
+
+    ev3.speaker.beep()
+    ev3.screen.print(text)
+
+    wait(1000)
+    ev3.speaker.beep()
+
+    for i in range(5):
+        current_color = color_sensor.color()
+
+        if current_color not in colors_shown and current_color in color_weights:
+            colors_shown.add(current_color)
+            weight = color_weights[current_color]
+            has_found = True
+
+            if weight == 0:
+                distance = 0
+                ev3.screen.print(str(current_color) + "\n Current Distance: \n" + str(distance))
+                wait(2500)
+                break
+
+            distance += weight
+            ev3.screen.print(str(current_color) + "\n Current Distance:  \n" + str(distance))
+
+        wait(1000)
+
+    ev3.screen.clear()
+    return distance if has_found else None
+
+def get_all_objects():
+    """
+    Lê a distância da manteiga na célula atual e atualiza distancia_manteiga
+    (distância de cada célula à candidata mais próxima).
+    Returns: a leitura, ou None se não houve
+    """
+    global distancia_manteiga, possible_zeros_manteiga, known_manteiga
+    if has_manteiga or known_manteiga is not None:
+        return None
+    distance = get_distance("Distancia Manteiga")
+    if distance is None:
+        return None
+    leitura = [[None] * 6 for _ in range(6)]
+    disperse_table(leitura, distance, robot_row, robot_col)
+    for row in range(6):
+        for col in range(6):
+            erro_manteiga[row][col] = max(erro_manteiga[row][col], leitura[row][col])
+    distancia_manteiga, zeros = populate_tabela([list(linha) for linha in erro_manteiga])
+    possible_zeros_manteiga = zeros if zeros is not None else 0
+    if possible_zeros_manteiga == 1:
+        for row in range(6):
+            for col in range(6):
+                if distancia_manteiga[row][col] == 0:
+                    known_manteiga = {'row': row, 'col': col}
+    return distance
 
 # -------------------------------
 #  MOVIMENTOS
@@ -269,6 +280,9 @@ def andar_casa():
         currentColor = color_sensor.color()
         if currentColor == ambient["barreira"]:
             robot.stop()
+            # A pancada é uma observação: tira o jogo do livro de aberturas (não
+            # guardamos barreiras, as observações seguintes dizem sempre 0)
+            observacoes.append('x')
             backward(35)
             turn_right()
             wait(500)
@@ -434,6 +448,19 @@ def evaluate_move(new_row, new_col):
 # get_autonomous_move
 # -------------------------------
 def get_autonomous_move():
+    # Regresso a casa: jogada ótima da tablebase quando há vitória forçada
+    if has_manteiga:
+        move = REGRESSO.jogada(robot_row, robot_col, position_bolor['row'], position_bolor['col'],
+                               torradeira=LOCALIZADOR_TORRADEIRA.candidatos())
+        if move is not None:
+            return DELTAS[JOGADAS.index(move)]
+
+    # Livro de aberturas: primeiros turnos pela sequência de observações
+    if ABERTURA is not None:
+        move = ABERTURA.jogada(observacoes, robot_row, robot_col)
+        if move is not None:
+            return DELTAS[JOGADAS.index(move)]
+
     directions = [
         (0, -1),  # Esquerda
         (0, 1),   # Direita
@@ -511,17 +538,21 @@ def atualizar_direcao_para_angulo(target_angle):
 # -------------------------------
 def realizar_jogada():
     # Atualiza a info do ambiente
-    get_all_objects()
+    leitura = get_all_objects()
     # Verifica se o robô pegou manteiga, ou se bolor pegou robô, etc.
     verify_objects()
 
     distance_torradeira = get_distance("Calor Torradeira")
+    if distance_torradeira is not None:
+        LOCALIZADOR_TORRADEIRA.observar(robot_row, robot_col, distance_torradeira)
     if distance_torradeira == 1:
         ev3.screen.print("Calor da torradeira detectado!")
         determinar_direcao_torradeira()
     else:
         ev3.screen.print("Nenhum calor detectado.")
         ev3.screen.print(distance_torradeira)
+    # Sem barreiras guardadas: depois de uma pancada o livro já não é consultado
+    observacoes.append(observacao(robot_row * 6 + robot_col, leitura, distance_torradeira, 0))
 
     # Usa a IA de movimento
     move = get_autonomous_move()
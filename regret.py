@@ -0,0 +1,189 @@
+"""
+Regret jogada a jogada: a estratégia do GameBoard contra o oráculo exato.
+
+Cada jogo é jogado normalmente e, antes de cada jogada do robot (através do
+GameBoard.observador), o oraculo.Oraculo do cenário dá o valor de todas as
+jogadas possíveis. O regret de uma jogada é quanto pior ela é do que a melhor:
+
+- jogadas a mais até ganhar, se as duas ganham
+- PERDE_VITORIA se a melhor ganha e a escolhida já não ganha
+- PERDE_EMPATE se a escolhida leva a uma derrota forçada e havia como sobreviver
+
+O oráculo sabe onde estão a manteiga e a torradeira, por isso nas fases em
+que elas são desconhecidas o regret inclui o custo da falta de informação.
+
+Cada estado é descrito por um padrão (fase, manteiga/torradeira conhecidas,
+posição do bolor em relação ao robot) e os padrões são ordenados pelo regret
+total, para mostrar onde a estratégia perde mais.
+
+Uso:
+    python regret.py --games 10000 --seed 1 --workers 8 [--traco regret.jsonl]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from oraculo import DERROTA, VITORIA, Oraculo
+from simulate import GameBoard, game_seed
+from torneio import blocos
+
+PERDE_VITORIA = 50
+PERDE_EMPATE = 25
+
+
+def custo(valor):
+    """Valor do oráculo como custo (menor é melhor)"""
+    resultado, jogadas = valor
+    if resultado == VITORIA:
+        return jogadas
+    return 200 if resultado == DERROTA else 100
+
+
+def regret(valores, move):
+    """Regret da jogada move dado o valor de todas as jogadas"""
+    melhor = min(valores.values(), key=custo)
+    escolhida = valores[move]
+    if melhor[0] == VITORIA and escolhida[0] != VITORIA:
+        return PERDE_VITORIA
+    if melhor[0] != DERROTA and escolhida[0] == DERROTA:
+        return PERDE_EMPATE
+    if melhor[0] == VITORIA:
+        return escolhida[1] - melhor[1]
+    return 0
+
+
+def padrao(game):
+    """Descrição do estado em que a jogada foi escolhida"""
+    if game.has_butter:
+        fase = 'regresso'
+    elif game.manteiga_strat:
+        fase = 'manteiga'
+    else:
+        fase = 'torradeira'
+    rr, rc = game.robot_pos['row'], game.robot_pos['col']
+    br, bc = game.bolor_pos['row'], game.bolor_pos['col']
+    distancia = abs(rr - br) + abs(rc - bc)
+    if rr == br:
+        bolor = 'mesma linha'
+    elif rc == bc:
+        bolor = 'mesma coluna'
+    else:
+        bolor = 'diagonal'
+    bolor += ', perto' if distancia <= 2 else ', médio' if distancia <= 4 else ', longe'
+    return (f"fase {fase}; manteiga {'conhecida' if game.known_manteiga else 'desconhecida'}; "
+            f"torradeira {'conhecida' if game.known_torradeira else 'desconhecida'}; bolor {bolor}")
+
+
+class Padroes:
+    """Regret agregado por padrão (contadores inteiros, somáveis entre blocos)"""
+
+    def __init__(self):
+        self.jogos = 0
+        self.jogadas = 0
+        self.stats = {}  # padrão -> [jogadas, jogadas com regret, regret total, vitórias perdidas]
+
+    def add(self, nome, valor):
+        stats = self.stats.setdefault(nome, [0, 0, 0, 0])
+        stats[0] += 1
+        self.jogadas += 1
+        if valor:
+            stats[1] += 1
+            stats[2] += valor
+            if valor == PERDE_VITORIA:
+                stats[3] += 1
+
+    def merge(self, other):
+        self.jogos += other.jogos
+        self.jogadas += other.jogadas
+        for nome, stats in other.stats.items():
+            mine = self.stats.setdefault(nome, [0, 0, 0, 0])
+            for i in range(4):
+                mine[i] += stats[i]
+
+    def ranking(self):
+        return sorted(self.stats.items(), key=lambda item: (-item[1][2], item[0]))
+
+
+def analisar_bloco(first, count, seed, tabuleiro_aleatorio=True, max_moves=100,
+                   estrategia='heuristica', traco=False):
+    """Joga e analisa os jogos [first, first + count). Returns: (Padroes, registos do traço)"""
+    padroes = Padroes()
+    registos = []
+    for index in range(first, first + count):
+        game = GameBoard(headless=True, tabuleiro_aleatorio=tabuleiro_aleatorio,
+                         seed=game_seed(seed, index), estrategia=estrategia)
+        oraculo = Oraculo.de_jogo(game)
+        turno = [0]
+
+        def observar(game, move, oraculo=oraculo, turno=turno, index=index):
+            turno[0] += 1
+            cell = game.robot_pos['row'] * game.size + game.robot_pos['col']
+            bolor = game.bolor_pos['row'] * game.size + game.bolor_pos['col']
+            valores = oraculo.valores(cell, bolor, game.has_butter, game.paredes_descobertas.mascaras[cell])
+            if move not in valores:
+                return  # jogada sem saída (o jogo termina como 'bloqueado')
+            nome = padrao(game)
+            valor = regret(valores, move)
+            padroes.add(nome, valor)
+            if traco and valor:
+                registos.append({'jogo': index, 'turno': turno[0], 'padrao': nome, 'jogada': move,
+                                 'valores': {k: list(v) for k, v in valores.items()}, 'regret': valor})
+
+        game.observador = observar
+        game.play_game_autonomous(max_moves)
+        padroes.jogos += 1
+    return padroes, registos
+
+
+def analisar(games, seed=0, workers=None, chunk=250, **kwargs):
+    padroes = Padroes()
+    registos = []
+    tarefas = blocos(games, chunk)
+    if workers == 1:
+        resultados = [analisar_bloco(first, count, seed, **kwargs) for first, count in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(analisar_bloco, first, count, seed, **kwargs)
+                       for first, count in tarefas]
+            resultados = [future.result() for future in futures]
+    for bloco, traco in resultados:
+        padroes.merge(bloco)
+        registos.extend(traco)
+    return padroes, registos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regret jogada a jogada contra o oráculo")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=250)
+    parser.add_argument("--max-moves", type=int, default=100)
+    parser.add_argument("--estrategia", choices=("heuristica", "pesquisa", "mcts"), default="heuristica")
+    parser.add_argument("--top", type=int, default=15, help="número de padrões a mostrar")
+    parser.add_argument("--traco", help="ficheiro JSONL com as jogadas com regret")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    padroes, registos = analisar(args.games, args.seed, args.workers, args.chunk,
+                                 max_moves=args.max_moves, estrategia=args.estrategia,
+                                 traco=args.traco is not None)
+    elapsed = time.perf_counter() - start
+
+    total = sum(stats[2] for stats in padroes.stats.values())
+    print(f"Jogos: {padroes.jogos}, jogadas: {padroes.jogadas}, regret total: {total}")
+    print(f"{'regret':>8} {'%':>6} {'jogadas':>8} {'c/ regret':>9} {'vit. perdidas':>13}  padrão")
+    for nome, (jogadas, com_regret, soma, perdidas) in padroes.ranking()[:args.top]:
+        print(f"{soma:>8} {100.0 * soma / max(total, 1):>5.1f}% {jogadas:>8} {com_regret:>9} {perdidas:>13}  {nome}")
+    if args.traco:
+        with open(args.traco, 'w') as f:
+            for registo in registos:
+                f.write(json.dumps(registo, ensure_ascii=False) + "\n")
+        print(f"Traço: {len(registos)} jogadas com regret em {args.traco}")
+    print(f"Tempo: {elapsed:.2f}s ({padroes.jogos / elapsed:.0f} jogos/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,105 +1,17 @@
 import random
 import time
 import os
-from collections import deque
-
-def has_numbers(table):
-    return any(cell is not None for row in table for cell in row)
-
-def disperse_table(table, value, row, col, radius=6):
-    for r in range(row - radius, row + radius + 1):
-        for c in range(col - radius, col + radius + 1):
-            # Verificar limites da tabela
-            if 0 <= r < len(table) and 0 <= c < len(table[0]):
-                # Calcular a distância de Manhattan
-                distance = abs(r - row) + abs(c - col)
-                # Valor decrementado com base na distância
-                decremented_value = abs(value - distance)
-
-                table[r][c] = decremented_value
-
-def filter_table(table1, table2):
-    """
-    Guarda os valores iguais nas duas tabelas e None nos outros      
-    """
-    for row in range(len(table1)):
-        for col in range(len(table1[0])):
-            if table1[row][col] != table2[row][col] and table1[row][col] != float('inf'):
-                table1[row][col] = None
-
-def filter_table_min(table1, table2):
-    """
-    Mantém os menores valores entre duas tabelas  
-    """
-    for row in range(len(table1)):
-        for col in range(len(table1[0])):
-            if table1[row][col] > table2[row][col]:
-                table1[row][col] = table2[row][col]     
-def count_zeros(table):
-    count = 0
-    for row in range(len(table)):
-        for col in range(len(table[0])):
-            if table[row][col] == 0:
-                count += 1
-    return count
-
-def populate_tabela(table):
-    aux_tables = []
-    zeros = 0
-    for row in range(len(table)):
-        for col in range(len(table[0])):
-            if table[row][col] == 0:
-                zeros += 1
-                temp_table = [[None] * len(table[0]) for _ in range(len(table))]
-                disperse_table(temp_table, 0, row, col)
-                aux_tables.append(temp_table)
-
-    if aux_tables:
-        result_table = aux_tables[0]
-        for i in range(1, len(aux_tables)):
-            filter_table_min(result_table, aux_tables[i])
-        return result_table, zeros
-    return table, None
-
-def get_zero(table):
-    for row in range(len(table)):
-        for col in range(len(table[0])):
-            if table[row][col] == 0:
-                return row, col
-
-def find_nearest_zero(table, start_row, start_col):
-    """
-    Finds the nearest zero in a 6x6 table from the given row and column.
-    Uses Breadth-First Search (BFS) to determine the shortest distance.
-    """
-    rows, cols = len(table), len(table[0])
-    visited = [[False] * cols for _ in range(rows)]
-    queue = deque([(start_row, start_col, 0)])  # (row, col, distance)
-
-    while queue:
-        row, col, distance = queue.popleft()
-
-        # Check boundaries and if already visited
-        if row < 0 or col < 0 or row >= rows or col >= cols or visited[row][col]:
-            continue
-
-        # Mark as visited
-        visited[row][col] = True
-
-        # Check if the current cell is a 0
-        if table[row][col] == 0:
-            return (row, col, distance)
-
-        # Add neighbors to the queue
-        queue.extend([
-            (row - 1, col, distance + 1),  # Up
-            (row + 1, col, distance + 1),  # Down
-            (row, col - 1, distance + 1),  # Left
-            (row, col + 1, distance + 1)   # Right
-        ])
-
-    # If no zero is found
-    return None
+from bitboard import bit, to_table
+from abertura import Abertura, observacao
+from bolor import get_tabela_bolor
+from custo import Custo
+from isca import Isca
+from localizador import LocalizadorManteiga, LocalizadorTorradeira
+from mcts import Mcts
+from oraculo import Oraculo
+from paredes import MapaParedes
+from planeador import Planeador
+from tablebase import get_regresso
 
 def print_table(table, table_name):
     """
@@ -128,70 +40,49 @@ def print_table(table, table_name):
         print()  # Nova linha no final de cada row
     print()  # Linha extra no final da tabela
 
-# def populate_torradeira(table, row, col, inf=False):
-#     if inf:
-#         table[row][col] = float('inf')
-#         if 0 <= row - 1 < len(table) and table[row - 1][col] == 0:
-#             table[row - 1][col] = float('inf')
-#         if 0 <= row + 1 < len(table) and table[row + 1][col] == 0:
-#             table[row + 1][col] = float('inf')
-#         if 0 <= col - 1 < len(table[0]) and table[row][col - 1] == 0:
-#             table[row][col - 1] = float('inf')
-#         if 0 <= col + 1 < len(table[0]) and table[row][col + 1] == 0:
-#             table[row][col + 1] = float('inf')
-#     else:
-#         table[row][col] = 1
-#         if 0 <= row - 1 < len(table) and table[row - 1][col] is None:
-#             table[row - 1][col] = 0
-#         if 0 <= row + 1 < len(table) and table[row + 1][col] is None:
-#             table[row + 1][col] = 0
-#         if 0 <= col - 1 < len(table[0]) and table[row][col - 1] is None:
-#             table[row][col - 1] = 0
-#         if 0 <= col + 1 < len(table[0]) and table[row][col + 1] is None:
-#             table[row][col + 1] = 0
-
-def populate_torradeira(table, row, col, inf=False):
-    """
-    Enhanced population of heat matrix that better tracks possible toaster locations
-    Args:
-        table: The heat matrix
-        row, col: Current robot position
-        inf: Whether to mark impossible locations
-    """
-    if inf:
-        # Mark current position and adjacents as impossible toaster locations
-        table[row][col] = float('inf')
-        
-        # Only mark adjacent positions as impossible if they haven't been confirmed as hot
-        adjacent_positions = [
-            (row - 1, col), (row + 1, col),
-            (row, col - 1), (row, col + 1)
-        ]
-        
-        for adj_row, adj_col in adjacent_positions:
-            if 0 <= adj_row < len(table) and 0 <= adj_col < len(table[0]):
-                if table[adj_row][adj_col] == 0:  # Only if it's marked as possible
-                    table[adj_row][adj_col] = float('inf')
-    else:
-        # We found a hot spot
-        table[row][col] = 1
-        
-        # Mark adjacent positions as potential toaster locations
-        adjacent_positions = [
-            (row - 1, col), (row + 1, col),
-            (row, col - 1), (row, col + 1)
-        ]
-        
-        for adj_row, adj_col in adjacent_positions:
-            if 0 <= adj_row < len(table) and 0 <= adj_col < len(table[0]):
-                if table[adj_row][adj_col] is None:
-                    table[adj_row][adj_col] = 0  # Potential toaster location
-
-
-
 class GameBoard:
-    def __init__(self):
+    def __init__(self, headless=False, tabuleiro_aleatorio=False, seed=None,
+                 estrategia='heuristica', profundidade=4, orcamento=None, iteracoes=400,
+                 abertura=None, isca=None, cenario=None, custo=None):
         self.size = 6
+        # Gerador próprio do jogo: jogos com a mesma seed são reprodutíveis e
+        # independentes do estado global do módulo random
+        self.rng = random.Random(seed)
+        # Modo headless: sem sleeps, sem display e sem prints (para correr jogos em lote)
+        self.headless = headless
+        self.tabuleiro_aleatorio = tabuleiro_aleatorio
+        # Cenário dado em vez de sorteado: ((row, col) da manteiga, (row, col) da
+        # torradeira, barreiras como pares ((row1, col1), (row2, col2)))
+        self.cenario = cenario
+        # Estratégia das jogadas: 'heuristica' (_evaluate_move, um nível),
+        # 'pesquisa' (planeador.Planeador com lookahead), 'mcts' (mcts.Mcts com
+        # cenários amostrados), 'tempo' (o planeador a descontar os segundos de
+        # robot de cada jogada, custo.Custo, e sem paragens para leituras que não
+        # mudam a crença) ou 'oraculo' (jogo ótimo com informação completa,
+        # oraculo.Oraculo; só para comparação)
+        self.estrategia = estrategia
+        # Modelo de custo em segundos de robot (estimativa de 'segundos' no resultado), ou None
+        self.custo = Custo.carregar() if custo is None and estrategia == 'tempo' else custo
+        self.saltar_leituras = estrategia == 'tempo'
+        self.rumo = 's'  # para onde o robot está virado (o beast.py começa virado para baixo)
+        self.segundos = 0.0
+        self.leituras = 0  # leituras (get_distance) do último update_matrices
+        if estrategia == 'pesquisa':
+            self.planeador = Planeador(profundidade, orcamento, self.size, self.size)
+        elif estrategia == 'tempo':
+            self.planeador = Planeador(profundidade, orcamento, self.size, self.size, self.custo)
+        else:
+            self.planeador = None
+        # O Mcts tem gerador próprio para não mexer no self.rng (que gera o cenário)
+        self.mcts = Mcts(iteracoes, orcamento, seed, self.size, self.size) if estrategia == 'mcts' else None
+        # Livro de aberturas (abertura.Abertura) consultado antes do avaliador, ou None
+        self.abertura = abertura
+        self.observacoes = []  # uma observação por turno (chave do livro de aberturas)
+        # Isca (isca.Isca) que leva o bolor à torradeira quando esta está localizada, ou None
+        self.isca = isca
+        self._oraculo = None
+        # Chamado como observador(game, move) antes de cada jogada do robot (ferramentas de análise)
+        self.observador = None
         self.board = [[' ' for _ in range(self.size)] for _ in range(self.size)]
         self.robot_pos = {'row': 0, 'col': 0}
         self.bolor_pos = {'row': 5, 'col': 5}
@@ -199,6 +90,7 @@ class GameBoard:
         self.torradeira_pos = None
         self.game_over = False
         self.won = False
+        self.causa = None  # 'casa', 'bolor' ou 'torradeira' quando o jogo acaba
         self.skip = False
         self.has_butter = False
         self.need_return_home = False
@@ -206,83 +98,108 @@ class GameBoard:
         
         # Matrizes de distância e calor
         self.distancia_manteiga = [[None] * self.size for _ in range(self.size)]
+        self.localizador_manteiga = LocalizadorManteiga(self.size, self.size)
         self.known_manteiga = None #{'row': None, 'col': None}
+        self.leituras_manteiga = None  # leituras da distância até localizar (ou apanhar) a manteiga
         self.calor_torradeira = [[None] * self.size for _ in range(self.size)]
+        self.localizador_torradeira = LocalizadorTorradeira(self.size, self.size)
+        self.tabela_bolor = get_tabela_bolor(self.size, self.size)
+        self.regresso = get_regresso()
         self.known_torradeira = None #{'row': None, 'col': None}
         
         self.last_positions = []
+        self.visitadas = 0  # bitboard das posições em last_positions
 
         self.manteiga_strat = True
         # Estrutura para armazenar barreiras
         # Agora armazenamos as barreiras como pares de posições que não podem ser atravessadas
         self.barriers = set()  # Conjunto de tuplas ((row1, col1), (row2, col2))
-        
+        self.paredes = MapaParedes(self.size, self.size)  # as mesmas barreiras, por célula
+
         # Barreiras descobertas
-        self.discovered_barriers = set()
+        self.paredes_descobertas = MapaParedes(self.size, self.size)
 
 
         # Inicializar o jogo
         self.setup_game()
 
-    def setup_game(self):
-        # Posicionar manteiga aleatoriamente (não na posição inicial do robot ou bolor)
-        while True:
-            row = random.randint(0, self.size-1)
-            col = random.randint(0, self.size-1)
-            if (row, col) != (0, 0) and (row, col) != (5, 5):
-                self.manteiga_pos = {'row': row, 'col': col}
-                break
-        # Posicionar torradeira aleatoriamente
-        while True:
-            row = random.randint(0, self.size-1)
-            col = random.randint(0, self.size-1)
-            if (row, col) != (0, 0) and (row, col) != (5, 5) and \
-               (row, col) != (self.manteiga_pos['row'], self.manteiga_pos['col']):
-                self.torradeira_pos = {'row': row, 'col': col}
-                break
-            
-        self.manteiga_pos = {'row': 1, 'col': 5}        
-        self.torradeira_pos = {'row': 1, 'col': 1}
+    def log(self, message):
+        if not self.headless:
+            print(message)
 
+    def pausa(self, seconds):
+        if not self.headless:
+            time.sleep(seconds)
 
-        # Inicializar as barreiras
-        self.setup_barriers()
+    def setup_game(self):
+        if self.cenario is not None:
+            manteiga, torradeira, barreiras = self.cenario
+            self.manteiga_pos = {'row': manteiga[0], 'col': manteiga[1]}
+            self.torradeira_pos = {'row': torradeira[0], 'col': torradeira[1]}
+            for from_pos, to_pos in barreiras:
+                self.barriers.add((from_pos, to_pos))
+                self.barriers.add((to_pos, from_pos))
+        else:
+            # Posicionar manteiga aleatoriamente (não na posição inicial do robot ou bolor)
+            while True:
+                row = self.rng.randint(0, self.size-1)
+                col = self.rng.randint(0, self.size-1)
+                if (row, col) != (0, 0) and (row, col) != (5, 5):
+                    self.manteiga_pos = {'row': row, 'col': col}
+                    break
+            # Posicionar torradeira aleatoriamente
+            while True:
+                row = self.rng.randint(0, self.size-1)
+                col = self.rng.randint(0, self.size-1)
+                if (row, col) != (0, 0) and (row, col) != (5, 5) and \
+                   (row, col) != (self.manteiga_pos['row'], self.manteiga_pos['col']):
+                    self.torradeira_pos = {'row': row, 'col': col}
+                    break
+
+            if not self.tabuleiro_aleatorio:
+                self.manteiga_pos = {'row': 1, 'col': 5}
+                self.torradeira_pos = {'row': 1, 'col': 1}
+
+            # Inicializar as barreiras
+            self.setup_barriers()
+
+        self.paredes.adicionar(self.barriers)
 
         # Atualizar matrizes de distância e calor
         self.update_matrices()
 
     def setup_barriers(self):
         # Adicionar barreiras aleatórias em algumas posições
-        num_barriers = random.randint(5, 10)  # Número aleatório de posições com barreiras
+        num_barriers = self.rng.randint(5, 10)  # Número aleatório de posições com barreiras
         
-        # for _ in range(num_barriers):
-        #     row = random.randint(0, self.size-1)
-        #     col = random.randint(0, self.size-1)
-        #     pos = (row, col)
-            
-        #     # Evitar posições importantes
-        #     if (row == self.robot_pos['row'] and col == self.robot_pos['col']) or \
-        #        (row == self.bolor_pos['row'] and col == self.bolor_pos['col']) or \
-        #        (row == self.manteiga_pos['row'] and col == self.manteiga_pos['col']) or \
-        #        (row == self.torradeira_pos['row'] and col == self.torradeira_pos['col']):
-        #         continue
-                
-        #     # Escolher aleatoriamente uma direção para a barreira
-        #     directions = []
-        #     if row > 0:  # Pode ter barreira para cima
-        #         directions.append(((row, col), (row-1, col)))
-        #     if row < self.size-1:  # Pode ter barreira para baixo
-        #         directions.append(((row, col), (row+1, col)))
-        #     if col > 0:  # Pode ter barreira para esquerda
-        #         directions.append(((row, col), (row, col-1)))
-        #     if col < self.size-1:  # Pode ter barreira para direita
-        #         directions.append(((row, col), (row, col+1)))
-            
-        #     if directions:
-        #         barrier = random.choice(directions)
-        #         # Adicionar a barreira nos dois sentidos
-        #         self.barriers.add(barrier)
-        #         self.barriers.add((barrier[1], barrier[0]))  # Adiciona a barreira no sentido oposto
+        if self.tabuleiro_aleatorio:
+            for _ in range(num_barriers):
+                row = self.rng.randint(0, self.size-1)
+                col = self.rng.randint(0, self.size-1)
+
+                # Evitar posições importantes
+                if (row == self.robot_pos['row'] and col == self.robot_pos['col']) or \
+                   (row == self.bolor_pos['row'] and col == self.bolor_pos['col']) or \
+                   (row == self.manteiga_pos['row'] and col == self.manteiga_pos['col']) or \
+                   (row == self.torradeira_pos['row'] and col == self.torradeira_pos['col']):
+                    continue
+
+                # Escolher aleatoriamente uma direção para a barreira
+                directions = []
+                if row > 0:  # Pode ter barreira para cima
+                    directions.append(((row, col), (row-1, col)))
+                if row < self.size-1:  # Pode ter barreira para baixo
+                    directions.append(((row, col), (row+1, col)))
+                if col > 0:  # Pode ter barreira para esquerda
+                    directions.append(((row, col), (row, col-1)))
+                if col < self.size-1:  # Pode ter barreira para direita
+                    directions.append(((row, col), (row, col+1)))
+
+                barrier = self.rng.choice(directions)
+                # Adicionar a barreira nos dois sentidos
+                self.barriers.add(barrier)
+                self.barriers.add((barrier[1], barrier[0]))  # Adiciona a barreira no sentido oposto
+            return
 
         self.barriers.add(((2,0), (3,0)))
         self.barriers.add(((3,0), (2,0)))
@@ -293,148 +210,79 @@ class GameBoard:
 
     def discover_barriers(self, row, col):
         """Descobre as barreiras conectadas à posição atual"""
-        current_pos = (row, col)
-        discovered = False
-        
-        # Verificar todas as barreiras possíveis conectadas a esta posição
-        for barrier in self.barriers:
-            if barrier[0] == current_pos and barrier not in self.discovered_barriers:
-                self.discovered_barriers.add(barrier)
-                self.discovered_barriers.add((barrier[1], barrier[0]))  # Adiciona também no sentido oposto
-                discovered = True
-        
-        return discovered
+        novas = self.paredes.mascara(row, col) & ~self.paredes_descobertas.mascara(row, col)
+        return self.paredes_descobertas.bloquear_mascara(row, col, novas)
     
     def find_toaster_position(self):
         """
-        Advanced method to find toaster position based on heat patterns
+        Toaster position from the heat observations (LocalizadorTorradeira)
         Returns: Dictionary with row and col if found, None otherwise
         """
-        # If we already found the toaster
-        if hasattr(self, 'known_torradeira') and self.known_torradeira:
+        if self.known_torradeira:
             return self.known_torradeira
+        self.known_torradeira = self.localizador_torradeira.posicao()
+        return self.known_torradeira
 
-        # Count cells marked as possible toaster locations (0s)
-        zero_count = sum(1 for row in self.calor_torradeira 
-                        for cell in row if cell == 0)
-
-        # If only one possible location remains
-        if zero_count == 1:
-            for row in range(len(self.calor_torradeira)):
-                for col in range(len(self.calor_torradeira[0])):
-                    if self.calor_torradeira[row][col] == 0:
-                        self.known_torradeira = {'row': row, 'col': col}
-                        return self.known_torradeira
-
-        # If we found multiple hot spots, try to triangulate
-        hot_spots = []
-        for row in range(len(self.calor_torradeira)):
-            for col in range(len(self.calor_torradeira[0])):
-                if self.calor_torradeira[row][col] == 1:
-                    hot_spots.append((row, col))
-
-        if len(hot_spots) >= 2:
-            # Find intersection of possible toaster locations from multiple hot spots
-            possible_locations = set()
-            for hot_row, hot_col in hot_spots:
-                current_possible = set()
-                # Add adjacent positions
-                adjacent_positions = [
-                    (hot_row - 1, hot_col), (hot_row + 1, hot_col),
-                    (hot_row, hot_col - 1), (hot_row, hot_col + 1)
-                ]
-                for adj_row, adj_col in adjacent_positions:
-                    if (0 <= adj_row < len(self.calor_torradeira) and 
-                        0 <= adj_col < len(self.calor_torradeira[0]) and
-                        self.calor_torradeira[adj_row][adj_col] == 0):
-                        current_possible.add((adj_row, adj_col))
-                
-                if not possible_locations:
-                    possible_locations = current_possible
-                else:
-                    possible_locations &= current_possible
-
-            # If we found exactly one intersection point
-            if len(possible_locations) == 1:
-                row, col = possible_locations.pop()
-                self.known_torradeira = {'row': row, 'col': col}
-                return self.known_torradeira
-
-        return None
     def update_toaster_knowledge(self):
         """
         Main method to update toaster knowledge after each move
+        Returns: the heat reading, or None if the toaster was already known
         """
         if self.known_torradeira is not None:
-            return
+            return None
+        if self.saltar_leituras and not self.localizador_torradeira.informativa(self.robot_pos['row'],
+                                                                                self.robot_pos['col']):
+            return None
         dist_torradeira = (abs(self.robot_pos['row'] - self.torradeira_pos['row']) + \
                         abs(self.robot_pos['col'] - self.torradeira_pos['col']))
         
-        # Update heat matrix based on current position
-        if dist_torradeira == 1:
-            populate_torradeira(self.calor_torradeira, self.robot_pos['row'], self.robot_pos['col'])
-        elif dist_torradeira == 0:
-            self.known_torradeira = {'row': self.robot_pos['row'], 'col': self.robot_pos['col']}
-        else:
-            populate_torradeira(self.calor_torradeira, self.robot_pos['row'], self.robot_pos['col'], True)
+        # Update the toaster belief with the reading at the current position
+        self.localizador_torradeira.observar(self.robot_pos['row'], self.robot_pos['col'], dist_torradeira)
+        self.calor_torradeira = self.localizador_torradeira.tabela()
         
         # Try to find toaster position
         toaster_pos = self.find_toaster_position()
         
         if toaster_pos:
-            print(f"\n--------------------------------\nToaster found at position: ({toaster_pos['row']}, {toaster_pos['col']})")
+            self.log(f"\n--------------------------------\nToaster found at position: ({toaster_pos['row']}, {toaster_pos['col']})")
+        return dist_torradeira
             
     def update_matrices(self):
-        aux = [[None] * 6 for _ in range(6)]
-
-        # Atualizar matriz de distância da manteiga apenas se ainda não foi pega
+        leitura = None
+        # Atualizar a localização da manteiga apenas se ainda não foi pega
         if self.manteiga_pos is not None and not self.has_butter:
             dist_manteiga = abs(self.robot_pos['row'] - self.manteiga_pos['row']) + \
                         abs(self.robot_pos['col'] - self.manteiga_pos['col'])
-            if dist_manteiga:
-                if has_numbers(self.distancia_manteiga):
-                    disperse_table(aux, dist_manteiga, self.robot_pos['row'], self.robot_pos['col'])
-                    filter_table(self.distancia_manteiga, aux)
-                    self.distancia_manteiga, possible_zeros_manteiga = populate_tabela(self.distancia_manteiga)
-                    if possible_zeros_manteiga == 1:
-                        krow, kcol = get_zero(self.distancia_manteiga)
-                        self.known_manteiga = {'row': krow, 'col': kcol}
-                else:
-                    disperse_table(self.distancia_manteiga, dist_manteiga, self.robot_pos['row'], self.robot_pos['col'])
+            # Como no robot: sem paragem para ler quando a leitura não elimina candidatos
+            if dist_manteiga and self.localizador_manteiga.informativa(self.robot_pos['row'], self.robot_pos['col']):
+                leitura = dist_manteiga
+                self.localizador_manteiga.observar(self.robot_pos['row'], self.robot_pos['col'], dist_manteiga)
+                self.distancia_manteiga = self.localizador_manteiga.tabela()
+                if self.known_manteiga is None:
+                    self.known_manteiga = self.localizador_manteiga.posicao()
+                    if self.known_manteiga is not None:
+                        self.leituras_manteiga = len(self.localizador_manteiga.historico)
         
         # Atualizar matriz de calor da torradeira
-        self.update_toaster_knowledge()
+        calor = self.update_toaster_knowledge()
+        cell = self.robot_pos['row'] * self.size + self.robot_pos['col']
+        self.observacoes.append(observacao(cell, leitura, calor, self.paredes_descobertas.mascaras[cell]))
+        self.leituras = (leitura is not None) + (calor is not None)
 
 
     def print_matrices(self):
         print_table(self.distancia_manteiga, "Distância da Manteiga")
         print_table(self.calor_torradeira, "Calor da Torradeira")
+        print_table(to_table(self.visitadas, 1), "Posições Visitadas")
 
     def get_barriers_for_position(self, row, col):
         """Retorna lista de direções bloqueadas para uma posição"""
-        barriers_list = []
-        pos = (row, col)
-        
-        for barrier in self.discovered_barriers:
-            if barrier[0] == pos:
-                # Determinar a direção da barreira
-                other_row, other_col = barrier[1]
-                if other_row < row:
-                    barriers_list.append('U')
-                elif other_row > row:
-                    barriers_list.append('D')
-                elif other_col < col:
-                    barriers_list.append('L')
-                elif other_col > col:
-                    barriers_list.append('R')
-        
-        return barriers_list
+        return self.paredes_descobertas.direcoes(row, col)
         
     def can_move(self, from_pos, to_pos):
         """Verifica se o movimento entre duas posições é permitido"""
         # Verifica se existe uma barreira descoberta entre as posições
-        barrier = (from_pos, to_pos)
-        return barrier not in self.discovered_barriers
+        return self.paredes_descobertas.can_move(from_pos, to_pos)
 
     def move_robot(self, direction):
         if self.game_over:
@@ -458,7 +306,7 @@ class GameBoard:
             
             # Verificar barreiras
             if not self.can_move(current_pos, new_pos):
-                print("\nBarreira! Não é possível mover nessa direção.")
+                self.log("\nBarreira! Não é possível mover nessa direção.")
                 return False
 
             # Verificar se está na torradeira
@@ -471,7 +319,7 @@ class GameBoard:
 
             # Descobrir barreiras na nova posição
             if self.discover_barriers(new_row, new_col):
-                print("\nBarreiras descobertas nesta posição!")
+                self.log("\nBarreiras descobertas nesta posição!")
 
             # Verificar vitória/derrota
             self.check_game_state()
@@ -487,6 +335,46 @@ class GameBoard:
         - Mold (bolor) position
         Returns: 'w', 'a', 's', or 'd'
         """
+        if self.estrategia == 'oraculo':
+            if self._oraculo is None:
+                self._oraculo = Oraculo.de_jogo(self)
+            cell = self.robot_pos['row'] * self.size + self.robot_pos['col']
+            move = self._oraculo.jogada(cell, self.bolor_pos['row'] * self.size + self.bolor_pos['col'],
+                                        self.has_butter, self.paredes_descobertas.mascaras[cell])
+            if move is not None:
+                return move, False
+
+        # Regresso a casa: jogada ótima da tablebase quando há vitória forçada
+        if self.has_butter:
+            move = self.regresso.jogada_de(self)
+            if move is not None:
+                return move, False
+
+        # Isca: sequência mais curta que leva o bolor à torradeira
+        if self.isca is not None:
+            move = self.isca.jogada(self)
+            if move is not None:
+                return move, False
+
+        # Livro de aberturas: primeiros turnos pela sequência de observações
+        if self.abertura is not None:
+            row, col = self.robot_pos['row'], self.robot_pos['col']
+            move = self.abertura.jogada(self.observacoes, row, col,
+                                        self.paredes_descobertas.mascaras[row * self.size + col])
+            if move is not None:
+                return move, False
+
+        if self.planeador is not None:
+            move = self.planeador.jogada(self)
+            if move is not None:
+                return move, False
+            # Todas as jogadas perdem: a heurística escolhe na mesma
+
+        if self.mcts is not None:
+            move = self.mcts.jogada(self)
+            if move is not None:
+                return move, False
+
         possible_moves = []
         current_row, current_col = self.robot_pos['row'], self.robot_pos['col']
         directions = [('w', -1, 0), ('s', 1, 0), ('a', 0, -1), ('d', 0, 1)]
@@ -507,10 +395,10 @@ class GameBoard:
             # Calculate score for this move
             score, change_strat = self._evaluate_move(new_row, new_col)
             possible_moves.append((move, score, change_strat))
-        time.sleep(2)
+        self.pausa(2)
         # If no valid moves, return random move
         if not possible_moves:
-            return random.choice(['w', 'a', 's', 'd'])
+            return self.rng.choice(['w', 'a', 's', 'd']), False
         
         # Return move with highest score
         val = max(possible_moves, key=lambda x: x[1])
@@ -537,7 +425,7 @@ class GameBoard:
             # Verificar barreiras
             if not self.can_move((self.robot_pos['row'], self.robot_pos['col']), 
                                (new_row, new_col)):
-                print("\nBarreira! Não é possível mover nessa direção.")
+                self.log("\nBarreira! Não é possível mover nessa direção.")
                 return False
 
             # Verificar se está na torradeira
@@ -548,17 +436,21 @@ class GameBoard:
             self.robot_pos['col'] = new_col
 
             self.last_positions.append((new_row, new_col))
+            self.visitadas |= bit(new_row, new_col)
 
             if strat:
                 self.manteiga_strat = False
-                print("Mudar estratégia-------------")
-                time.sleep(1)
+                self.log("Mudar estratégia-------------")
+                self.pausa(1)
 
             # Descobrir barreiras na nova posição
             if self.discover_barriers(new_row, new_col):
-                print("\nBarreiras descobertas nesta posição!")
+                self.log("\nBarreiras descobertas nesta posição!")
 
             self.update_matrices()
+            if self.custo is not None:
+                self.segundos += self.custo.segundos(self.rumo, direction, self.leituras)
+                self.rumo = self.custo.rumo_depois(self.rumo, direction)
 
             # Verificar vitória/derrota
             self.check_game_state()
@@ -572,17 +464,8 @@ class GameBoard:
         if new_row is None or new_col is None:
             new_row, new_col = self.bolor_pos['row'], self.bolor_pos['col']
 
-        if robot_row < new_row:  # Vai andar para cima
-            new_row -= 1
-        elif robot_row > new_row:  # Vai andar para baixo
-            new_row += 1
-        elif robot_row == new_row:  # Vai andar para a esquerda/direita
-            if robot_col < new_col:
-                new_col -= 1
-            elif robot_col > new_col:
-                new_col += 1
-            
-        return new_row, new_col
+        # Linha primeiro, depois coluna, uma casa na direção do robot (tabela pré-calculada)
+        return self.tabela_bolor.mover(robot_row, robot_col, new_row, new_col)
 
 
     def move_bolor(self):
@@ -598,10 +481,10 @@ class GameBoard:
 
     def _evaluate_move(self, new_row, new_col):
         score = 0
-        print(f"New position: ({new_row}, {new_col})")
+        self.log(f"New position: ({new_row}, {new_col})")
         
         if (0 > new_row > self.size and 0 > new_col > self.size):
-            print("Fora dos limites")
+            self.log("Fora dos limites")
             return -float('inf'), False
         
         change_start = False
@@ -629,17 +512,19 @@ class GameBoard:
             #     if (abs(new_row - barrier_start[0]) + abs(new_col - barrier_start[1])) <= 1:
             #         score -= 50  # Penalize being next to a barrier
             
-            print(f"Score: {score}")
+            self.log(f"Score: {score}")
             return score, False
 
         # If using butter strategy and haven't got butter yet
         elif self.manteiga_strat and not self.has_butter and self.manteiga_pos is not None:
+            # Evitar as células onde a torradeira pode estar (pisá-la gasta um turno)
+            score -= self.localizador_torradeira.penalizacao(new_row, new_col)
             if self.known_manteiga:
                 butter_distance = abs(new_row - self.known_manteiga['row']) + abs(new_col - self.known_manteiga['col'])
                 bolor_to_butter = abs(bolor_row - self.known_manteiga['row']) + abs(bolor_col - self.known_manteiga['col'])
                 
-                print(f"Distance to butter: {butter_distance}")
-                print(f"Distance bolor to butter: {bolor_to_butter}")
+                self.log(f"Distance to butter: {butter_distance}")
+                self.log(f"Distance bolor to butter: {bolor_to_butter}")
                 
                 if butter_distance < bolor_to_butter:
                     score += (10 - butter_distance) * 10
@@ -647,20 +532,18 @@ class GameBoard:
                     change_start = True
                     score -= 35
             else:
-                # Look for nearest zero
-                nrow, ncol, distance = find_nearest_zero(self.distancia_manteiga, self.robot_pos['row'], self.robot_pos['col'])
-                if nrow is not None:
-                    crow, ccol, cdistance = find_nearest_zero(self.distancia_manteiga, new_row, new_col)
-                    if crow is not None:
-                        if cdistance < distance:
-                            score += 100
+                # Look for the nearest butter candidate
+                distance = self.localizador_manteiga.distancia_minima(self.robot_pos['row'], self.robot_pos['col'])
+                if distance is not None:
+                    if self.localizador_manteiga.distancia_minima(new_row, new_col) < distance:
+                        score += 100
 
         # Using toaster strategy
         else:
             if self.known_torradeira:
                 distance_bolor_robot = (abs(bolor_row - new_row) + abs(bolor_col - new_col))
                 distance_bolor_torradeira = abs(self.bolor_pos['row'] - self.known_torradeira['row']) + abs(self.bolor_pos['col'] - self.known_torradeira['col'])
-                print(f"Distance bolor to robot: {distance_bolor_robot}")
+                self.log(f"Distance bolor to robot: {distance_bolor_robot}")
                 if (new_row == self.known_torradeira['row'] and new_col == self.known_torradeira['col']):
                     if (distance_bolor_robot >=2 and distance_bolor_robot < distance_bolor_torradeira):
                         score += 500
@@ -685,54 +568,79 @@ class GameBoard:
         if self.known_manteiga is not None and bolor_row == self.known_manteiga['row'] and bolor_col == self.known_manteiga['col']:
             score -= 2000
 
-        # Penalize previously visited positions
-        for i in range(len(self.last_positions)):
-            if (new_row, new_col) == self.last_positions[i]:
-                score -= (5*i+5)
-                print(f"Movimento antigo {i}: {5*i}")
-                break
+        # Penalize previously visited positions (the bitboard skips the scan for new cells)
+        if self.visitadas & bit(new_row, new_col):
+            for i in range(len(self.last_positions)):
+                if (new_row, new_col) == self.last_positions[i]:
+                    score -= (5*i+5)
+                    self.log(f"Movimento antigo {i}: {5*i}")
+                    break
 
-        print(f"Score: {score}")
+        self.log(f"Score: {score}")
         return score, change_start
         
 
-    def play_game_autonomous(self):
+    def play_game_autonomous(self, max_moves=100):
         """
         Runs the game autonomously using the heuristic movement
+        Returns: dictionary with the result of the game (see result())
         """
         moves_count = 0
-        max_moves = 100  # Prevent infinite loops
         
         try:
             while not self.game_over and moves_count < max_moves:
-                self.display()
-                time.sleep(1)  # Add delay to make movement visible
+                if not self.headless:
+                    self.display()
+                self.pausa(1)  # Add delay to make movement visible
                 
                 # Get and execute best move
                 if self.skip:
                     self.skip = False
-                    print("\nBolor está na mesma posição que o robot. Pular jogada.")
+                    self.log("\nBolor está na mesma posição que o robot. Pular jogada.")
                     self.move_bolor()
                     continue
 
                 move, strat = self.get_autonomous_move()
+                if self.observador is not None:
+                    self.observador(self, move)
                 if self.move_robot(move, strat):
                     self.move_bolor()
                     moves_count += 1
+                elif self.headless:
+                    # Sem jogadas válidas: em modo headless não ficamos presos no ciclo
+                    self.causa = 'bloqueado'
+                    break
             
-            self.display()
+            if not self.headless:
+                self.display()
             if self.won:
-                print("\nRobot wins!")
+                self.log("\nRobot wins!")
             else:
-                print("\nGame Over! Mold wins!")
-            print(f"Total moves: {moves_count}")
+                self.log("\nGame Over! Mold wins!")
+            self.log(f"Total moves: {moves_count}")
             
         except KeyboardInterrupt:
-            print("\nJogo interrompido pelo usuário!")
+            self.log("\nJogo interrompido pelo usuário!")
             self.display()  # Show final state
-            print(f"Total moves before interruption: {moves_count}")
+            self.log(f"Total moves before interruption: {moves_count}")
         except Exception as e:
-            print(f"\nErro inesperado: {str(e)}")
+            if self.headless:
+                raise
+            self.log(f"\nErro inesperado: {str(e)}")
+
+        return self.result(moves_count)
+
+    def result(self, moves_count):
+        """Resultado estruturado de um jogo"""
+        return {
+            'won': self.won,
+            'moves': moves_count,
+            'causa': self.causa if self.causa is not None else 'limite',
+            'known_manteiga': dict(self.known_manteiga) if self.known_manteiga else None,
+            'known_torradeira': dict(self.known_torradeira) if self.known_torradeira else None,
+            'leituras_manteiga': self.leituras_manteiga,
+            'segundos': round(self.segundos, 2) if self.custo is not None else None,
+        }
         
     def check_game_state(self):
         # Check if robot reached butter
@@ -743,7 +651,9 @@ class GameBoard:
             self.has_butter = True
             self.need_return_home = True
             self.manteiga_pos = None
-            print("\nManteiga encontrada! A voltar para casa inicial...")
+            if self.leituras_manteiga is None:
+                self.leituras_manteiga = len(self.localizador_manteiga.historico)
+            self.log("\nManteiga encontrada! A voltar para casa inicial...")
             return
         
         # Check if robot returned home with butter
@@ -752,6 +662,7 @@ class GameBoard:
             self.robot_pos['col'] == self.home_pos['col']):
             self.game_over = True
             self.won = True
+            self.causa = 'casa'
             return
 
         # Check if mold caught the robot
@@ -759,6 +670,7 @@ class GameBoard:
             self.bolor_pos['col'] == self.robot_pos['col']):
             self.game_over = True
             self.won = False
+            self.causa = 'bolor'
             return
 
         # Check if mold reached toaster
@@ -766,6 +678,7 @@ class GameBoard:
             self.bolor_pos['col'] == self.torradeira_pos['col']):
             self.game_over = True
             self.won = True
+            self.causa = 'torradeira'
             return
 
     def display(self):
@@ -773,6 +686,7 @@ class GameBoard:
         print("\n  0 1 2 3 4 5")
         for i in range(self.size):
             row_str = f"{i} "
+            barriers_info = []
             for j in range(self.size):
                 pos_char = '.'
                 if i == self.robot_pos['row'] and j == self.robot_pos['col']:
@@ -787,16 +701,11 @@ class GameBoard:
                 barriers = self.get_barriers_for_position(i, j)
                 if barriers:
                     pos_char = '#'
+                    # Mostrar barreiras descobertas para esta linha
+                    barriers_info.append(f"({i},{j}): {','.join(sorted(barriers))}")
                 
                 row_str += pos_char + ' '
             
-            # Mostrar barreiras descobertas para esta linha
-            barriers_info = []
-            for j in range(self.size):
-                barriers = self.get_barriers_for_position(i, j)
-                if barriers:
-                    barriers_info.append(f"({i},{j}): {','.join(sorted(barriers))}")
-            
             print(row_str + "  " + "  ".join(barriers_info))
 
 
@@ -846,11 +755,91 @@ def play_game():
     else:
         print("\nGame Over! O bolor venceu!")
 
-if __name__ == "__main__":
+def game_seed(seed, index):
+    """
+    Seed do jogo número index de um lote com a seed base seed.
+    Cada jogo tem o seu próprio stream, por isso o resultado de um jogo não
+    depende da ordem nem do processo em que é corrido.
+    """
+    if seed is None:
+        return None
+    return (seed << 32) ^ index
+
+def run_batch(games, seed=None, tabuleiro_aleatorio=True, max_moves=100, first=0,
+              estrategia='heuristica', profundidade=4, iteracoes=400,
+              abertura=None, isca=None, custo=None):
+    """
+    Corre varios jogos autonomos em modo headless e devolve a lista de resultados
+    (custo: custo.Custo para estimar os segundos de robot de cada jogo)
+    """
+    results = []
+    for index in range(first, first + games):
+        game = GameBoard(headless=True, tabuleiro_aleatorio=tabuleiro_aleatorio,
+                         seed=game_seed(seed, index), estrategia=estrategia,
+                         profundidade=profundidade, iteracoes=iteracoes,
+                         abertura=abertura, isca=isca, custo=custo)
+        results.append(game.play_game_autonomous(max_moves))
+    return results
+
+def print_batch_summary(results, elapsed):
+    wins = sum(1 for r in results if r['won'])
+    moves = sum(r['moves'] for r in results)
+    causas = {}
+    for r in results:
+        causas[r['causa']] = causas.get(r['causa'], 0) + 1
+    n = len(results)
+    print(f"Jogos: {n}")
+    print(f"Vitórias: {wins} ({100.0 * wins / n:.1f}%)")
+    print(f"Média de movimentos: {moves / n:.2f}")
+    print("Causas: " + ", ".join(f"{k}={v}" for k, v in sorted(causas.items())))
+    print(f"Manteiga localizada: {sum(1 for r in results if r['known_manteiga'])}")
+    leituras = [r['leituras_manteiga'] for r in results if r['leituras_manteiga'] is not None]
+    if leituras:
+        print(f"Leituras da manteiga até a localizar: {sum(leituras) / len(leituras):.2f}")
+    print(f"Torradeira localizada: {sum(1 for r in results if r['known_torradeira'])}")
+    segundos = [r['segundos'] for r in results if r['segundos'] is not None]
+    if segundos:
+        print(f"Tempo de robot estimado: {sum(segundos) / len(segundos) / 60:.1f} min por jogo")
+    print(f"Tempo: {elapsed:.2f}s ({n / elapsed:.0f} jogos/s)")
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Simulador do jogo do Robot e Bolor")
+    sub = parser.add_subparsers(dest="mode")
+    batch = sub.add_parser("batch", help="corre jogos autonomos em modo headless")
+    batch.add_argument("--games", type=int, default=1000)
+    batch.add_argument("--seed", type=int, default=None)
+    batch.add_argument("--max-moves", type=int, default=100)
+    batch.add_argument("--fixo", action="store_true",
+                       help="usa o tabuleiro fixo em vez de tabuleiros aleatorios")
+    batch.add_argument("--estrategia", choices=("heuristica", "pesquisa", "mcts", "oraculo", "tempo"),
+                       default="heuristica")
+    batch.add_argument("--profundidade", type=int, default=4,
+                       help="profundidade do planeador (estrategias pesquisa e tempo)")
+    batch.add_argument("--iteracoes", type=int, default=400,
+                       help="iterações por decisão (estrategia mcts)")
+    batch.add_argument("--abertura", action="store_true",
+                       help="usa o livro de aberturas (abertura.json) nos primeiros turnos")
+    batch.add_argument("--isca", action="store_true",
+                       help="leva o bolor à torradeira quando esta está localizada")
+    args = parser.parse_args(argv)
+
+    if args.mode == "batch":
+        start = time.perf_counter()
+        results = run_batch(args.games, args.seed, not args.fixo, args.max_moves,
+                            estrategia=args.estrategia, profundidade=args.profundidade,
+                            iteracoes=args.iteracoes,
+                            abertura=Abertura.carregar() if args.abertura else None,
+                            isca=Isca() if args.isca else None)
+        print_batch_summary(results, time.perf_counter() - start)
+        return
+
     game = GameBoard()
     # mode = input("Choose mode (1 for manual, 2 for autonomous): ")
     # if mode == "1":
     #     play_game()
     # else:
     game.play_game_autonomous()
-        
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""
+Tablebase do regresso a casa (análise retrógrada).
+
+Depois de apanhar a manteiga o estado do jogo é só (célula do robot, célula
+do bolor) mais as barreiras conhecidas e as células onde a torradeira pode
+estar, e o bolor é determinístico. A tabela guarda para cada estado o número
+exato de jogadas até chegar a casa (0 se não há vitória forçada) e a jogada
+ótima, um byte por estado:
+
+    byte = distância * 4 + direção    (direção 0..3 = w, s, a, d; 0 = sem vitória)
+
+Pisar a torradeira dá um passo a mais ao bolor. Com a torradeira localizada
+a tabela conta com esse passo; enquanto há vários candidatos, uma jogada
+para um deles só é vitória se ganhar com e sem o passo a mais. O bolor na
+torradeira também acaba o jogo com vitória, mas a tabela não conta com isso:
+a vitória em casa continua forçada, só pode chegar mais cedo.
+
+A tabela do tabuleiro sem barreiras nem torradeira vai em disco
+(regresso.tb, 1296 bytes) e é carregada uma vez; a de cada torradeira
+localizada (sem barreiras) é resolvida uma vez. Quando a linha desta tabela
+de referência a partir do estado não passa por barreiras conhecidas nem por
+candidatos da torradeira, a jogada dela é ótima também no jogo com eles (o
+mesmo número de jogadas). Senão a tabela é resolvida na hora (poucos
+milissegundos) e guardada em cache para essas barreiras e candidatos.
+
+Uso:
+    python tablebase.py gerar [--saida regresso.tb]
+    python tablebase.py verificar [--barreiras 20 --seed 1]
+"""
+from bitboard import DELTAS
+from bolor import get_tabela_bolor
+from paredes import MapaParedes
+
+try:
+    import os
+    CAMINHO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'regresso.tb')
+except (ImportError, NameError, AttributeError):
+    CAMINHO = 'regresso.tb'  # MicroPython: relativo à pasta do projeto
+
+JOGADAS = 'wsad'
+SEM_VITORIA = 0
+
+
+def resolver(rows=6, cols=6, paredes=None, casa=0, torradeira=0):
+    """
+    Análise retrógrada de todos os estados (robot, bolor), índice robot * células + bolor.
+    paredes: MapaParedes com as barreiras conhecidas, ou None
+    torradeira: bitboard das células onde a torradeira pode estar (0 = nenhuma).
+    Entrar na torradeira dá dois passos ao bolor: com uma só célula possível
+    a jogada conta com os dois passos; com várias, a jogada para uma delas
+    só ganha se ganhar com um passo e com dois
+    Returns: bytearray com um byte por estado (ver o topo do módulo)
+    """
+    cells = rows * cols
+    passo = get_tabela_bolor(rows, cols).passo
+    tabela = bytearray(cells * cells)
+    anteriores = [[] for _ in range(cells * cells)]
+    pendentes = bytearray(cells * cells * 4)  # sucessores ainda sem vitória de cada (estado, direção)
+    conhecida = torradeira and not torradeira & (torradeira - 1)
+    frente = []
+
+    for robot in range(cells):
+        row, col = robot // cols, robot % cols
+        for d in range(4):
+            dr, dc = DELTAS[d]
+            if not (0 <= row + dr < rows and 0 <= col + dc < cols):
+                continue
+            if paredes is not None and paredes.bloqueado(row, col, d):
+                continue
+            destino = (row + dr) * cols + col + dc
+            if not torradeira >> destino & 1:
+                passos = (1,)
+            else:
+                passos = (2,) if conhecida else (1, 2)
+            for bolor in range(cells):
+                if bolor == robot:
+                    continue
+                estado = robot * cells + bolor
+                if destino == bolor:
+                    continue  # entra no bolor
+                if destino == casa:
+                    if tabela[estado] == SEM_VITORIA:
+                        tabela[estado] = 4 + d
+                        frente.append(estado)
+                    continue
+                seguintes = []
+                for n in passos:
+                    novo = bolor
+                    for _ in range(n):
+                        novo = passo[destino][novo]
+                        if novo == destino:
+                            break
+                    if novo == destino:
+                        seguintes = None  # o bolor apanha-o
+                        break
+                    if destino * cells + novo not in seguintes:
+                        seguintes.append(destino * cells + novo)
+                if seguintes is None:
+                    continue
+                pendentes[estado * 4 + d] = len(seguintes)
+                for seguinte in seguintes:
+                    anteriores[seguinte].append(estado * 4 + d)
+
+    # Pesquisa em largura para trás a partir das vitórias numa jogada: uma
+    # jogada ganha quando todos os seus sucessores já ganham (o último é o mais
+    # longe). Entre as jogadas ótimas fica a primeira pela ordem w, s, a, d
+    distancia = 1
+    while frente:
+        distancia += 1
+        seguinte = []
+        for estado in frente:
+            for anterior in anteriores[estado]:
+                pendentes[anterior] -= 1
+                if pendentes[anterior]:
+                    continue
+                origem, d = anterior >> 2, anterior & 3
+                if tabela[origem] == SEM_VITORIA:
+                    if distancia > 63:
+                        raise ValueError("distância não cabe num byte")
+                    tabela[origem] = distancia * 4 + d
+                    seguinte.append(origem)
+                elif tabela[origem] >> 2 == distancia and d < tabela[origem] & 3:
+                    tabela[origem] = distancia * 4 + d
+        frente = seguinte
+    return tabela
+
+
+CACHE = 64  # tabelas resolvidas guardadas (por barreiras e candidatos da torradeira)
+
+
+class TabelaRegresso:
+    def __init__(self, tabela, rows=6, cols=6):
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.base = tabela
+        self._por_paredes = {}
+        self._referencias = {}
+        self._linhas = {}
+
+    @classmethod
+    def carregar(cls, caminho=CAMINHO, rows=6, cols=6):
+        """Lê a tabela do disco, ou resolve-a se o ficheiro não existir"""
+        try:
+            with open(caminho, 'rb') as f:
+                tabela = f.read()
+        except OSError:
+            tabela = resolver(rows, cols)
+        if len(tabela) != rows * cols * rows * cols:
+            raise ValueError("tablebase com tamanho errado: " + caminho)
+        return cls(tabela, rows, cols)
+
+    def tabela(self, paredes=None, torradeira=0):
+        """
+        Tabela resolvida para as barreiras conhecidas e os candidatos da
+        torradeira (bitboard), a base se não houver nenhuns
+        """
+        if paredes is None:
+            return self.tabela_mascaras([0] * self.cells, torradeira)
+        return self.tabela_mascaras(paredes.mascaras, torradeira)
+
+    def tabela_mascaras(self, mascaras, torradeira=0):
+        """O mesmo que tabela() a partir das máscaras por célula do MapaParedes"""
+        if not torradeira and not any(mascaras):
+            return self.base
+        key = (tuple(mascaras), torradeira)
+        tabela = self._por_paredes.get(key)
+        if tabela is None:
+            paredes = MapaParedes(self.rows, self.cols)
+            for cell, mascara in enumerate(mascaras):
+                paredes.bloquear_mascara(cell // self.cols, cell % self.cols, mascara)
+            if len(self._por_paredes) >= CACHE:
+                self._por_paredes.clear()
+            tabela = self._por_paredes[key] = resolver(self.rows, self.cols, paredes, torradeira=torradeira)
+        return tabela
+
+    def referencia(self, torradeira=0):
+        """
+        Tabela sem barreiras de referência para os candidatos da torradeira:
+        a base, ou a da torradeira localizada (uma tabela por célula, em cache)
+        """
+        if not torradeira or torradeira & (torradeira - 1):
+            return self.base
+        tabela = self._referencias.get(torradeira)
+        if tabela is None:
+            tabela = self._referencias[torradeira] = resolver(self.rows, self.cols, torradeira=torradeira)
+        return tabela
+
+    def linhas(self, torradeira=0):
+        """
+        Linha da tabela de referência a partir de cada estado com vitória:
+        (bitboard das células onde o robot entra, jogadas da linha em 4 bits
+        por célula, bit 4 * célula + direção). Calculadas uma vez
+        """
+        linhas = self._linhas.get(torradeira)
+        if linhas is None:
+            tabela = self.referencia(torradeira)
+            cells, cols = self.cells, self.cols
+            passo = get_tabela_bolor(self.rows, cols).passo
+            celulas = [0] * (cells * cells)
+            jogadas = [0] * (cells * cells)
+            # Por ordem de distância: a linha de um estado é a jogada mais a linha do seguinte
+            for estado in sorted(range(cells * cells), key=lambda e: tabela[e]):
+                valor = tabela[estado]
+                if not valor:
+                    continue
+                robot, bolor, d = estado // cells, estado % cells, valor & 3
+                destino = robot + DELTAS[d][0] * cols + DELTAS[d][1]
+                celulas[estado] = 1 << destino
+                jogadas[estado] = 1 << (4 * robot + d)
+                if valor >> 2 > 1:
+                    bolor = passo[destino][bolor]
+                    if torradeira >> destino & 1:
+                        bolor = passo[destino][bolor]
+                    seguinte = destino * cells + bolor
+                    celulas[estado] |= celulas[seguinte]
+                    jogadas[estado] |= jogadas[seguinte]
+            linhas = self._linhas[torradeira] = (celulas, jogadas)
+        return linhas
+
+    def valor(self, robot, bolor, mascaras=None, torradeira=0):
+        """
+        Byte do estado (células robot e bolor) com as barreiras (máscaras por
+        célula) e os candidatos da torradeira: o da tabela de referência se a
+        linha dela não toca em nenhuns, senão o da tabela resolvida
+        """
+        if torradeira & (torradeira - 1):
+            referencia, evitar = 0, torradeira
+        else:
+            referencia, evitar = torradeira, 0
+        estado = robot * self.cells + bolor
+        valor = self.referencia(referencia)[estado]
+        if not valor:
+            return 0  # barreiras e candidatos só tiram vitórias
+        celulas, jogadas = self.linhas(referencia)
+        if not celulas[estado] & evitar:
+            if not mascaras:
+                return valor
+            jogadas = jogadas[estado]
+            for cell in range(self.cells):
+                if mascaras[cell] and jogadas >> (4 * cell) & mascaras[cell]:
+                    break
+            else:
+                return valor
+        return self.tabela_mascaras(mascaras or [0] * self.cells, torradeira)[estado]
+
+    def _byte(self, robot_row, robot_col, bolor_row, bolor_col, paredes=None, torradeira=0):
+        return self.valor(robot_row * self.cols + robot_col, bolor_row * self.cols + bolor_col,
+                          paredes.mascaras if paredes is not None else None, torradeira)
+
+    def distancia(self, robot_row, robot_col, bolor_row, bolor_col, paredes=None, torradeira=0):
+        """Jogadas até casa com vitória forçada, ou None se não há (torradeira: bitboard dos candidatos)"""
+        valor = self._byte(robot_row, robot_col, bolor_row, bolor_col, paredes, torradeira)
+        return valor >> 2 if valor else None
+
+    def jogada(self, robot_row, robot_col, bolor_row, bolor_col, paredes=None, torradeira=0):
+        """Jogada ótima ('w', 's', 'a', 'd'), ou None se não há vitória forçada"""
+        valor = self._byte(robot_row, robot_col, bolor_row, bolor_col, paredes, torradeira)
+        return JOGADAS[valor & 3] if valor else None
+
+    def jogada_de(self, jogo):
+        """jogada() para um GameBoard ou Cerebro: barreiras descobertas e candidatos da torradeira"""
+        return self.jogada(jogo.robot_pos['row'], jogo.robot_pos['col'],
+                           jogo.bolor_pos['row'], jogo.bolor_pos['col'],
+                           jogo.paredes_descobertas, jogo.localizador_torradeira.candidatos())
+
+
+_regresso = None
+
+
+def get_regresso():
+    """TabelaRegresso do tabuleiro 6x6, carregada uma vez por processo"""
+    global _regresso
+    if _regresso is None:
+        _regresso = TabelaRegresso.carregar()
+    return _regresso
+
+
+# -------------------------------
+# Geração e verificação
+# -------------------------------
+def guardar(tabela, caminho=CAMINHO):
+    with open(caminho, 'wb') as f:
+        f.write(bytes(tabela))
+
+
+def _jogar(robot, bolor, d, rows, cols, paredes, casa, torradeira):
+    """
+    Jogada d pelas regras do jogo (independente do resolver).
+    Returns: None se não pode ou é apanhado, [] se chega a casa, senão os
+    estados (robot, bolor) possíveis a seguir (com e sem o passo a mais)
+    """
+    row, col = robot // cols, robot % cols
+    dr, dc = DELTAS[d]
+    if not (0 <= row + dr < rows and 0 <= col + dc < cols):
+        return None
+    if paredes is not None and paredes.bloqueado(row, col, d):
+        return None
+    n = (row + dr) * cols + col + dc
+    if n == bolor:
+        return None
+    if n == casa:
+        return []
+    passo = get_tabela_bolor(rows, cols).passo
+    if not torradeira >> n & 1:
+        passos = [1]
+    elif torradeira & (torradeira - 1):
+        passos = [1, 2]
+    else:
+        passos = [2]
+    seguintes = []
+    for k in passos:
+        b = bolor
+        for _ in range(k):
+            b = passo[n][b]
+            if b == n:
+                return None
+        seguintes.append((n, b))
+    return seguintes
+
+
+def _distancias(rows, cols, paredes, casa, torradeira):
+    """Iteração de valores para a frente: {(robot, bolor): jogadas até casa} dos estados com vitória"""
+    cells = rows * cols
+    estados = [(r, b) for r in range(cells) for b in range(cells) if r != b]
+    distancias = {}
+    distancia = 0
+    mudou = True
+    while mudou:
+        distancia += 1
+        mudou = False
+        for r, b in estados:
+            if (r, b) in distancias:
+                continue
+            for d in range(4):
+                seguintes = _jogar(r, b, d, rows, cols, paredes, casa, torradeira)
+                if seguintes is not None and all(distancias.get(e, distancia) < distancia for e in seguintes):
+                    distancias[(r, b)] = distancia
+                    mudou = True
+                    break
+    return distancias
+
+
+def verificar(tabela, rows=6, cols=6, paredes=None, casa=0, torradeira=0, valor=None):
+    """
+    Confere a tabela contra iteração de valores para a frente: a distância
+    guardada é a mínima, e a jogada da tabela leva sempre (com e sem o passo
+    a mais da torradeira) a estados mais perto de casa sem ser apanhado.
+    valor: função (robot, bolor) -> byte a conferir em vez da tabela
+    Returns: número de estados errados
+    """
+    cells = rows * cols
+    esperadas = _distancias(rows, cols, paredes, casa, torradeira)
+    if valor is None:
+        valor = lambda robot, bolor: tabela[robot * cells + bolor]
+    erros = 0
+    for robot in range(cells):
+        for bolor in range(cells):
+            if robot == bolor:
+                continue
+            byte = valor(robot, bolor)
+            esperado = esperadas.get((robot, bolor))
+            if (byte >> 2 if byte else None) != esperado:
+                erros += 1
+                continue
+            if not byte:
+                continue
+            seguintes = _jogar(robot, bolor, byte & 3, rows, cols, paredes, casa, torradeira)
+            if seguintes is None or any(esperadas.get(e, esperado) >= esperado for e in seguintes):
+                erros += 1
+    return erros
+
+
+def main(argv=None):
+    import argparse
+    import random
+    import time
+
+    parser = argparse.ArgumentParser(description="Tablebase do regresso a casa")
+    sub = parser.add_subparsers(dest="modo", required=True)
+    gerar = sub.add_parser("gerar", help="resolve a tabela sem barreiras e grava-a")
+    gerar.add_argument("--saida", default=CAMINHO)
+    verif = sub.add_parser("verificar", help="confere a tabela gravada e tabelas com barreiras e torradeiras aleatórias")
+    verif.add_argument("--barreiras", type=int, default=20, help="número de tabuleiros com barreiras")
+    verif.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.modo == "gerar":
+        start = time.perf_counter()
+        tabela = resolver()
+        elapsed = time.perf_counter() - start
+        guardar(tabela, args.saida)
+        ganhos = sum(1 for v in tabela if v)
+        print(f"{len(tabela)} estados, {ganhos} com vitória forçada, "
+              f"distância máxima {max(tabela) >> 2}; resolvida em {1000 * elapsed:.1f} ms -> {args.saida}")
+        return
+
+    regresso = TabelaRegresso.carregar()
+    erros = verificar(regresso.base)
+    print(f"Tabela em disco: {erros} estados errados")
+    rng = random.Random(args.seed)
+    for i in range(args.barreiras):
+        paredes = MapaParedes()
+        for _ in range(rng.randint(1, 10)):
+            paredes.bloquear(rng.randrange(6), rng.randrange(6), rng.randrange(4))
+        # Sem torradeira, localizada ou com vários candidatos
+        torradeira = 0
+        for _ in range(i % 3 and (1 if i % 3 == 1 else rng.randint(2, 12))):
+            torradeira |= 1 << rng.randrange(1, 36)
+        erros += verificar(regresso.tabela(paredes, torradeira), paredes=paredes, torradeira=torradeira)
+        # A consulta (linha da base quando não toca em barreiras nem candidatos)
+        erros += verificar(None, paredes=paredes, torradeira=torradeira,
+                           valor=lambda robot, bolor: regresso.valor(robot, bolor, paredes.mascaras, torradeira))
+    print(f"Com {args.barreiras} conjuntos de barreiras e torradeiras: {erros} estados errados no total")
+    if erros:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
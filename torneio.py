@@ -0,0 +1,183 @@
+"""
+Torneio de jogos autonomos do GameBoard em todos os cores.
+
+Os jogos sao divididos em blocos de seeds consecutivas e cada bloco corre num
+processo do ProcessPoolExecutor. Cada jogo tem o seu proprio gerador
+(simulate.game_seed), e as estatisticas de cada bloco sao somas de inteiros,
+por isso o agregado final e identico bit a bit qualquer que seja o numero de
+workers ou o tamanho dos blocos.
+
+Uso:
+    python torneio.py --games 10000 --seed 1 --workers 8 --config aleatorio --config fixo
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from isca import Isca
+from simulate import run_batch
+
+# Configuracoes disponiveis: argumentos passados a run_batch
+CONFIGURACOES = {
+    'aleatorio': {'tabuleiro_aleatorio': True, 'max_moves': 100},
+    'fixo': {'tabuleiro_aleatorio': False, 'max_moves': 100},
+    'pesquisa': {'tabuleiro_aleatorio': True, 'max_moves': 100, 'estrategia': 'pesquisa'},
+    'mcts': {'tabuleiro_aleatorio': True, 'max_moves': 100, 'estrategia': 'mcts'},
+    'tempo': {'tabuleiro_aleatorio': True, 'max_moves': 100, 'estrategia': 'tempo'},
+    'isca': {'tabuleiro_aleatorio': True, 'max_moves': 100, 'isca': Isca()},
+}
+
+
+class Estatisticas:
+    """Contadores inteiros de um conjunto de jogos (somaveis entre blocos)"""
+
+    def __init__(self):
+        self.jogos = 0
+        self.vitorias = 0
+        self.soma_moves = 0
+        self.soma_moves_vitorias = 0
+        self.min_moves = None
+        self.max_moves = None
+        self.manteiga_localizada = 0
+        self.torradeira_localizada = 0
+        self.soma_leituras = 0  # leituras da manteiga até a localizar (jogos em que foi localizada/apanhada)
+        self.jogos_leituras = 0
+        self.causas = {}
+
+    def add(self, result):
+        moves = result['moves']
+        self.jogos += 1
+        self.soma_moves += moves
+        if result['won']:
+            self.vitorias += 1
+            self.soma_moves_vitorias += moves
+        if self.min_moves is None or moves < self.min_moves:
+            self.min_moves = moves
+        if self.max_moves is None or moves > self.max_moves:
+            self.max_moves = moves
+        if result['known_manteiga']:
+            self.manteiga_localizada += 1
+        if result['known_torradeira']:
+            self.torradeira_localizada += 1
+        if result['leituras_manteiga'] is not None:
+            self.soma_leituras += result['leituras_manteiga']
+            self.jogos_leituras += 1
+        self.causas[result['causa']] = self.causas.get(result['causa'], 0) + 1
+
+    def merge(self, other):
+        self.jogos += other.jogos
+        self.vitorias += other.vitorias
+        self.soma_moves += other.soma_moves
+        self.soma_moves_vitorias += other.soma_moves_vitorias
+        for name in ('min_moves', 'max_moves'):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            if mine is None:
+                setattr(self, name, theirs)
+            elif theirs is not None:
+                setattr(self, name, min(mine, theirs) if name == 'min_moves' else max(mine, theirs))
+        self.manteiga_localizada += other.manteiga_localizada
+        self.torradeira_localizada += other.torradeira_localizada
+        self.soma_leituras += other.soma_leituras
+        self.jogos_leituras += other.jogos_leituras
+        for causa, count in other.causas.items():
+            self.causas[causa] = self.causas.get(causa, 0) + count
+
+    def win_rate(self):
+        return self.vitorias / self.jogos if self.jogos else 0.0
+
+    def media_moves(self):
+        return self.soma_moves / self.jogos if self.jogos else 0.0
+
+    def media_moves_vitorias(self):
+        return self.soma_moves_vitorias / self.vitorias if self.vitorias else 0.0
+
+    def media_leituras(self):
+        return self.soma_leituras / self.jogos_leituras if self.jogos_leituras else 0.0
+
+    def as_dict(self):
+        return {
+            'jogos': self.jogos,
+            'vitorias': self.vitorias,
+            'win_rate': self.win_rate(),
+            'media_moves': self.media_moves(),
+            'media_moves_vitorias': self.media_moves_vitorias(),
+            'min_moves': self.min_moves,
+            'max_moves': self.max_moves,
+            'manteiga_localizada': self.manteiga_localizada,
+            'torradeira_localizada': self.torradeira_localizada,
+            'media_leituras_manteiga': self.media_leituras(),
+            'causas': dict(sorted(self.causas.items())),
+        }
+
+
+def blocos(games, chunk):
+    """Divide [0, games) em intervalos (inicio, tamanho) de no maximo chunk jogos"""
+    return [(first, min(chunk, games - first)) for first in range(0, games, chunk)]
+
+
+def correr_bloco(config, first, count, seed):
+    """Corre os jogos [first, first + count) de uma configuracao (num worker)"""
+    stats = Estatisticas()
+    for result in run_batch(count, seed, first=first, **CONFIGURACOES[config]):
+        stats.add(result)
+    return config, stats
+
+
+def torneio(configs, games, seed=0, workers=None, chunk=250):
+    """
+    Corre games jogos por configuracao e devolve {config: Estatisticas}.
+    Todas as configuracoes usam as mesmas seeds, por isso sao comparaveis jogo a jogo.
+    """
+    resultado = {config: Estatisticas() for config in configs}
+    tarefas = [(config, first, count) for config in configs for first, count in blocos(games, chunk)]
+
+    if workers == 1:
+        for config, first, count in tarefas:
+            resultado[config].merge(correr_bloco(config, first, count, seed)[1])
+        return resultado
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(correr_bloco, config, first, count, seed)
+                   for config, first, count in tarefas]
+        for future in futures:
+            config, stats = future.result()
+            resultado[config].merge(stats)
+    return resultado
+
+
+def print_torneio(resultado, elapsed):
+    for config, stats in resultado.items():
+        d = stats.as_dict()
+        print("\n" + "=" * 50)
+        print(config)
+        print("=" * 50)
+        print(f"Jogos: {d['jogos']}")
+        print(f"Vitórias: {d['vitorias']} ({100.0 * d['win_rate']:.2f}%)")
+        print(f"Média de movimentos: {d['media_moves']:.3f} (vitórias: {d['media_moves_vitorias']:.3f})")
+        print(f"Movimentos min/max: {d['min_moves']}/{d['max_moves']}")
+        print(f"Manteiga localizada: {d['manteiga_localizada']}")
+        print(f"Torradeira localizada: {d['torradeira_localizada']}")
+        print(f"Leituras da manteiga até a localizar: {d['media_leituras_manteiga']:.2f}")
+        print("Causas: " + ", ".join(f"{k}={v}" for k, v in d['causas'].items()))
+    total = sum(stats.jogos for stats in resultado.values())
+    print(f"\nTempo: {elapsed:.2f}s ({total / elapsed:.0f} jogos/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Torneio de jogos autonomos em paralelo")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=250)
+    parser.add_argument("--config", action="append", choices=sorted(CONFIGURACOES),
+                        help="configuracao a testar (pode repetir-se)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    resultado = torneio(args.config or ['aleatorio'], args.games, args.seed, args.workers, args.chunk)
+    print_torneio(resultado, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
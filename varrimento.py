@@ -0,0 +1,259 @@
+"""
+Varrimento exaustivo dos cenários: todas as posições da manteiga e da
+torradeira, cada uma com todas as barreiras de uma família.
+
+Os cenários são numerados (índice = colocação * barreiras por colocação +
+barreira), por isso cada um é reprodutível pelo índice. Famílias de barreiras:
+
+- nenhuma: tabuleiro sem barreiras (1 por colocação)
+- fixa: as barreiras do tabuleiro fixo do setup_barriers (1 por colocação)
+- uma: cada barreira interior sozinha (60 por colocação)
+- aleatoria: --layouts conjuntos sorteados como no setup_barriers (reprodutíveis pela seed)
+
+Os cenários são divididos em blocos que correm num ProcessPoolExecutor, como
+no torneio. Cada bloco acabado é acrescentado ao ficheiro de checkpoint
+(<saida>.parcial, uma linha JSON por bloco), e correr outra vez com os
+mesmos argumentos só corre os blocos que faltam. No fim o ficheiro de
+resultados tem, por estratégia, os jogos, as vitórias, o pior número de
+jogadas (em vitórias e no total) e todos os cenários perdidos.
+
+Uso:
+    python varrimento.py --familia uma --estrategia heuristica --estrategia isca --workers 8
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+SIZE = 6
+CASA = (0, 0)
+BOLOR = (SIZE - 1, SIZE - 1)
+FAMILIAS = ('nenhuma', 'fixa', 'uma', 'aleatoria')
+ESTRATEGIAS = ('heuristica', 'pesquisa', 'mcts', 'oraculo', 'isca', 'abertura', 'tempo')
+
+
+def colocacoes():
+    """Pares ((row, col) da manteiga, (row, col) da torradeira), pela ordem do varrimento"""
+    livres = [(row, col) for row in range(SIZE) for col in range(SIZE) if (row, col) not in (CASA, BOLOR)]
+    return [(manteiga, torradeira) for manteiga in livres for torradeira in livres if torradeira != manteiga]
+
+
+_colocacoes = colocacoes()
+
+
+def _interiores():
+    """Todas as barreiras entre duas células vizinhas (para baixo e para a direita)"""
+    result = []
+    for row in range(SIZE):
+        for col in range(SIZE):
+            if row < SIZE - 1:
+                result.append(((row, col), (row + 1, col)))
+            if col < SIZE - 1:
+                result.append(((row, col), (row, col + 1)))
+    return result
+
+
+def por_colocacao(familia, layouts):
+    if familia in ('nenhuma', 'fixa'):
+        return 1
+    if familia == 'uma':
+        return len(_interiores())
+    return layouts
+
+
+def barreiras(familia, indice, seed):
+    """Barreiras do cenário indice da família (lista de pares)"""
+    if familia == 'nenhuma':
+        return []
+    if familia == 'fixa':
+        return [((2, 0), (3, 0)), ((2, 1), (2, 2))]
+    if familia == 'uma':
+        interiores = _interiores()
+        return [interiores[indice % len(interiores)]]
+    # As barreiras de um tabuleiro aleatório do GameBoard (um sentido de cada par)
+    from simulate import GameBoard, game_seed
+
+    game = GameBoard(headless=True, tabuleiro_aleatorio=True, seed=game_seed(seed, indice))
+    return sorted((a, b) for a, b in game.barriers if a < b)
+
+
+def cenario(familia, indice, layouts, seed):
+    manteiga, torradeira = _colocacoes[indice // por_colocacao(familia, layouts)]
+    return manteiga, torradeira, barreiras(familia, indice, seed)
+
+
+def total(familia, layouts):
+    return len(_colocacoes) * por_colocacao(familia, layouts)
+
+
+# -------------------------------
+# Estratégias (criadas uma vez por processo)
+# -------------------------------
+_opcoes = {}
+
+
+def opcoes(estrategia):
+    """Argumentos do GameBoard para a estratégia"""
+    if estrategia not in _opcoes:
+        if estrategia == 'isca':
+            from isca import Isca
+            valor = {'isca': Isca()}
+        elif estrategia == 'abertura':
+            from abertura import Abertura
+            valor = {'abertura': Abertura.carregar()}
+        elif estrategia == 'heuristica':
+            valor = {}
+        else:
+            valor = {'estrategia': estrategia}
+        _opcoes[estrategia] = valor
+    return _opcoes[estrategia]
+
+
+def correr_bloco(estrategia, bloco, first, count, familia, layouts, seed, max_moves):
+    """Corre os cenários [first, first + count) e devolve o resumo do bloco (para o checkpoint)"""
+    from simulate import GameBoard, game_seed
+
+    resumo = {'estrategia': estrategia, 'bloco': bloco, 'jogos': 0, 'vitorias': 0,
+              'max_moves_vitorias': 0, 'max_moves': 0, 'perdidos': []}
+    for indice in range(first, first + count):
+        game = GameBoard(headless=True, seed=game_seed(seed, indice),
+                         cenario=cenario(familia, indice, layouts, seed), **opcoes(estrategia))
+        result = game.play_game_autonomous(max_moves)
+        resumo['jogos'] += 1
+        resumo['max_moves'] = max(resumo['max_moves'], result['moves'])
+        if result['won']:
+            resumo['vitorias'] += 1
+            resumo['max_moves_vitorias'] = max(resumo['max_moves_vitorias'], result['moves'])
+        else:
+            resumo['perdidos'].append([indice, result['causa'], result['moves']])
+    return resumo
+
+
+# -------------------------------
+# Checkpoint e resultados
+# -------------------------------
+def ler_checkpoint(caminho, parametros):
+    """
+    {(estrategia, bloco): resumo} dos blocos já acabados. A primeira linha
+    guarda os parâmetros do varrimento; um checkpoint de outros parâmetros dá ValueError
+    """
+    feitos = {}
+    try:
+        with open(caminho) as f:
+            for linha in f:
+                linha = linha.strip()
+                if not linha:
+                    continue
+                try:
+                    resumo = json.loads(linha)
+                except ValueError:
+                    continue  # linha cortada por uma interrupção
+                if 'parametros' in resumo:
+                    if resumo['parametros'] != parametros:
+                        raise ValueError("checkpoint de outro varrimento: " + caminho)
+                    continue
+                feitos[(resumo['estrategia'], resumo['bloco'])] = resumo
+    except OSError:
+        pass
+    return feitos
+
+
+def agregar(resumos, familia, layouts, seed):
+    """Resultados por estratégia, com os cenários perdidos por extenso"""
+    resultado = {}
+    for resumo in sorted(resumos, key=lambda r: (r['estrategia'], r['bloco'])):
+        d = resultado.setdefault(resumo['estrategia'], {
+            'jogos': 0, 'vitorias': 0, 'max_moves_vitorias': 0, 'max_moves': 0, 'perdidos': []})
+        d['jogos'] += resumo['jogos']
+        d['vitorias'] += resumo['vitorias']
+        d['max_moves_vitorias'] = max(d['max_moves_vitorias'], resumo['max_moves_vitorias'])
+        d['max_moves'] = max(d['max_moves'], resumo['max_moves'])
+        for indice, causa, moves in resumo['perdidos']:
+            manteiga, torradeira, barr = cenario(familia, indice, layouts, seed)
+            d['perdidos'].append({'indice': indice, 'manteiga': manteiga, 'torradeira': torradeira,
+                                  'barreiras': barr, 'causa': causa, 'moves': moves})
+    return resultado
+
+
+def varrer(estrategias, familia, layouts=20, seed=0, workers=None, chunk=500, max_moves=100,
+           checkpoint=None):
+    """
+    Corre os blocos que faltam no checkpoint e devolve os resumos de todos.
+    Returns: lista de resumos (um por estratégia e bloco)
+    """
+    n = total(familia, layouts)
+    blocos = [(first, min(chunk, n - first)) for first in range(0, n, chunk)]
+    parametros = {'familia': familia, 'layouts': layouts, 'seed': seed, 'chunk': chunk, 'max_moves': max_moves}
+    feitos = ler_checkpoint(checkpoint, parametros) if checkpoint else {}
+    tarefas = [(estrategia, bloco, first, count)
+               for estrategia in estrategias for bloco, (first, count) in enumerate(blocos)
+               if (estrategia, bloco) not in feitos]
+    resumos = [feitos[(estrategia, bloco)] for estrategia in estrategias
+               for bloco in range(len(blocos)) if (estrategia, bloco) in feitos]
+
+    saida = None
+    if checkpoint:
+        novo = not os.path.exists(checkpoint) or not os.path.getsize(checkpoint)
+        saida = open(checkpoint, 'a')
+        if novo:
+            saida.write(json.dumps({'parametros': parametros}) + "\n")
+        else:
+            saida.write("\n")  # acaba uma linha que uma interrupção possa ter deixado a meio
+    try:
+        def guardar(resumo):
+            resumos.append(resumo)
+            if saida is not None:
+                saida.write(json.dumps(resumo) + "\n")
+                saida.flush()
+
+        if workers == 1:
+            for estrategia, bloco, first, count in tarefas:
+                guardar(correr_bloco(estrategia, bloco, first, count, familia, layouts, seed, max_moves))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(correr_bloco, estrategia, bloco, first, count,
+                                           familia, layouts, seed, max_moves)
+                           for estrategia, bloco, first, count in tarefas]
+                for future in as_completed(futures):
+                    guardar(future.result())
+    finally:
+        if saida is not None:
+            saida.close()
+    return resumos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Varrimento exaustivo dos cenários")
+    parser.add_argument("--familia", choices=FAMILIAS, default="uma")
+    parser.add_argument("--layouts", type=int, default=20,
+                        help="conjuntos de barreiras por colocação (família aleatoria)")
+    parser.add_argument("--estrategia", action="append", choices=ESTRATEGIAS,
+                        help="estratégia a correr (pode repetir-se)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=500)
+    parser.add_argument("--max-moves", type=int, default=100)
+    parser.add_argument("--saida", default="varrimento.json")
+    args = parser.parse_args(argv)
+
+    estrategias = args.estrategia or ['heuristica']
+    checkpoint = args.saida + ".parcial"
+    start = time.perf_counter()
+    resumos = varrer(estrategias, args.familia, args.layouts, args.seed, args.workers, args.chunk,
+                     args.max_moves, checkpoint)
+    resultado = agregar(resumos, args.familia, args.layouts, args.seed)
+    with open(args.saida, 'w') as f:
+        json.dump({'familia': args.familia, 'layouts': args.layouts, 'seed': args.seed,
+                   'cenarios': total(args.familia, args.layouts), 'estrategias': resultado}, f)
+
+    for estrategia in estrategias:
+        d = resultado[estrategia]
+        print(f"{estrategia}: {d['vitorias']}/{d['jogos']} vitórias "
+              f"({100.0 * d['vitorias'] / max(d['jogos'], 1):.2f}%), {len(d['perdidos'])} cenários perdidos, "
+              f"pior vitória em {d['max_moves_vitorias']} jogadas, máximo {d['max_moves']}")
+    print(f"Tempo: {time.perf_counter() - start:.1f}s -> {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,560 @@
+"""
+Simulador em lote (NumPy): B tabuleiros avançam em lockstep, um turno por passo.
+
+Cada tabuleiro é guardado em arrays (posições como índices de célula 0..35,
+candidatos da manteiga e da torradeira e barreiras por direção) e
+todas as regras do simulate.GameBoard -- movimento do bolor, leituras de
+distância, filtragem das tabelas e a pontuação do _evaluate_move -- são
+aplicadas a todos os tabuleiros de uma vez.
+
+O modo --check corre os mesmos jogos com o GameBoard escalar e compara os
+resultados jogo a jogo e mostra o speedup medido; o ganho face ao ciclo
+escalar cresce com o tamanho do lote (cerca de 30x com 10000 tabuleiros,
+~1.2M turnos/s). Era ~100x quando o ciclo escalar era mais lento; o regresso
+com a torradeira modelada resolve tabelas por tabuleiro (solve_return), que
+pesam perto de 40% do tempo. Requer NumPy >= 2.0 (np.bitwise_count).
+
+Uso:
+    python vetorizado.py --boards 10000 --seed 1
+    python vetorizado.py --boards 2000 --seed 1 --check
+"""
+import argparse
+import time
+
+import numpy as np
+
+from bolor import get_tabela_bolor
+from localizador import PENALIZACAO_TORRADEIRA
+from simulate import GameBoard, game_seed
+from tablebase import get_regresso
+
+SIZE = 6
+CELLS = SIZE * SIZE
+HOME = 0
+
+# Direções w, s, a, d (pela ordem usada no get_autonomous_move)
+DELTAS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+OPPOSITE = [1, 0, 3, 2]
+
+ROW = np.arange(CELLS) // SIZE
+COL = np.arange(CELLS) % SIZE
+DIST = np.abs(ROW[:, None] - ROW[None, :]) + np.abs(COL[:, None] - COL[None, :])
+
+# TARGET[c, d]: célula vizinha de c na direção d, ou -1 se sair do tabuleiro
+TARGET = np.full((CELLS, 4), -1, dtype=np.int64)
+for _cell in range(CELLS):
+    for _d, (_dr, _dc) in enumerate(DELTAS):
+        _r, _c = ROW[_cell] + _dr, COL[_cell] + _dc
+        if 0 <= _r < SIZE and 0 <= _c < SIZE:
+            TARGET[_cell, _d] = _r * SIZE + _c
+DIRECTION_BITS = np.array([1, 2, 4, 8], dtype=np.uint8)
+
+# STEP[robot, bolor]: nova posição do bolor (bolor.TabelaBolor.passo)
+STEP = np.array(get_tabela_bolor(SIZE, SIZE).passo, dtype=np.int64)
+
+# Tablebase do regresso: as tabelas de referência (TabelaRegresso.referencia;
+# índice da torradeira localizada, ou UNKNOWN para a base) e a linha delas a
+# partir de cada estado (células onde o robot entra e jogadas por célula, para
+# ver se toca nas barreiras e candidatos)
+REGRESSO = get_regresso()
+_referencias = [1 << c for c in range(CELLS)] + [0]
+REGRESSO_REF = np.array([list(REGRESSO.referencia(t)) for t in _referencias], dtype=np.int64)
+_linhas = [REGRESSO.linhas(t) for t in _referencias]
+LINE_CELLS = np.array([celulas for celulas, _ in _linhas], dtype=np.uint64)
+_nibbles = np.frombuffer(b''.join(j.to_bytes(CELLS // 2, 'little') for _, jogadas in _linhas for j in jogadas),
+                         dtype=np.uint8).reshape(len(_referencias), CELLS * CELLS, CELLS // 2)
+LINE_MOVES = np.stack([_nibbles & 15, _nibbles >> 4], axis=3).reshape(len(_referencias), CELLS * CELLS, CELLS)
+
+# Transições de cada (estado robot * 36 + bolor, direção) para o tablebase.resolver em lote:
+# estado depois de um e de dois passos do bolor e se o bolor o apanha
+_STATE_ROBOT = np.arange(CELLS * CELLS) // CELLS
+_STATE_BOLOR = np.arange(CELLS * CELLS) % CELLS
+_DEST = TARGET[_STATE_ROBOT]
+_DEST0 = np.maximum(_DEST, 0)
+_BOLOR1 = STEP[_DEST0, _STATE_BOLOR[:, None]]
+_BOLOR2 = STEP[_DEST0, _BOLOR1]
+NEXT1 = _DEST0 * CELLS + _BOLOR1
+NEXT2 = _DEST0 * CELLS + _BOLOR2
+SAME_NEXT = NEXT1 == NEXT2
+CAUGHT1 = _BOLOR1 == _DEST0
+CAUGHT2 = CAUGHT1 | (_BOLOR2 == _DEST0)
+MOVE_OK = ((_DEST >= 0) & (_DEST != _STATE_BOLOR[:, None]) &
+           (_STATE_ROBOT != _STATE_BOLOR)[:, None])
+MOVE_HOME = MOVE_OK & (_DEST == HOME)
+# As mesmas em [robot, bolor, direção], e as células do robot com jogada para casa
+_TARGET0 = np.maximum(TARGET, 0)
+_MOVE_OK = MOVE_OK.reshape(CELLS, CELLS, 4)
+_MOVE_HOME = MOVE_HOME.reshape(CELLS, CELLS, 4)
+_CAUGHT1 = CAUGHT1.reshape(CELLS, CELLS, 4)
+_CAUGHT2 = CAUGHT2.reshape(CELLS, CELLS, 4)
+_SAME_NEXT = SAME_NEXT.reshape(CELLS, CELLS, 4)
+HOME_ROBOTS = np.nonzero(MOVE_HOME.reshape(CELLS, -1).any(axis=1))[0]
+# Jogadas que levam a cada estado (por estado seguinte): índice estado * 4 + direção
+# em PRED_MOVE, com PRED_TWO True se é o estado depois de dois passos
+_pred_moves = np.nonzero((MOVE_OK & ~MOVE_HOME).ravel())[0]
+_pred_next = np.concatenate([NEXT1.ravel()[_pred_moves], NEXT2.ravel()[_pred_moves]])
+_pred_order = np.argsort(_pred_next, kind='stable')
+PRED_MOVE = np.concatenate([_pred_moves, _pred_moves])[_pred_order]
+PRED_TWO = np.repeat([False, True], len(_pred_moves))[_pred_order]
+PRED_START = np.searchsorted(_pred_next[_pred_order], np.arange(CELLS * CELLS + 1))
+
+# Pontuações do _evaluate_move que só dependem de (nova célula do robot, bolor,
+# célula conhecida da manteiga ou da torradeira); UNKNOWN indexa "desconhecida"
+UNKNOWN = CELLS
+
+
+def _score_tables():
+    n = np.arange(CELLS)[:, None, None]
+    b = np.arange(CELLS)[None, :, None]
+    k = np.arange(CELLS + 1)[None, None, :]
+    kc = np.minimum(k, CELLS - 1)
+    known = k < UNKNOWN
+    b1 = STEP[n, b]
+    collide = n == b1
+
+    # Voltar para casa
+    home = ((10 - DIST[n, HOME]) * 10 + 1000 * (n == HOME) - 2000 * collide
+            - 15 * ((ROW[n] == ROW[b]) | (COL[n] == COL[b])))[:, :, 0]
+
+    # Estratégia da manteiga (manteiga conhecida em k)
+    butter_distance = DIST[n, kc]
+    ahead = butter_distance < DIST[b1, kc]
+    butter = np.where(known, np.where(ahead, (10 - butter_distance) * 10, -35), 0)
+    change = known & ~ahead
+
+    # Estratégia da torradeira (torradeira conhecida em k)
+    bolor_robot = DIST[b1, n]
+    bolor_toaster = DIST[b, kc]
+    new_bolor_toaster = DIST[b1, kc]
+    at_toaster = np.where((bolor_robot >= 2) & (bolor_robot < bolor_toaster), 500, -500)
+    lure = (np.where(new_bolor_toaster < bolor_toaster, 50 * (bolor_toaster - new_bolor_toaster), -15)
+            + 1500 * (b1 == kc))
+    toaster = np.where(known, np.where(n == kc, at_toaster, lure), 0)
+
+    # Penalidades comuns (bolor na célula do robot ou na manteiga conhecida)
+    common = -5000 * collide - 2000 * (known & (b1 == kc))
+    return (home.astype(np.int32), butter.astype(np.int32), change,
+            toaster.astype(np.int32), common.astype(np.int32))
+
+
+HOME_SCORE, BUTTER_SCORE, CHANGE_STRAT, TOASTER_SCORE, COMMON_SCORE = _score_tables()
+
+# Máscaras de bits por célula: BIT[c], RING[c, d] (células à distância d de c),
+# BALL[c, d] (células a distância <= d) e ADJACENT_MASK[c] (vizinhos de c)
+BIT = np.left_shift(np.uint64(1), np.arange(CELLS, dtype=np.uint64))
+MAX_DIST = 2 * (SIZE - 1)
+RING = np.array([[np.bitwise_or.reduce(BIT[DIST[c] == d]) for d in range(MAX_DIST + 1)]
+                 for c in range(CELLS)], dtype=np.uint64)
+BALL = np.bitwise_or.accumulate(RING, axis=1)
+ADJACENT_MASK = RING[:, 1].copy()
+
+
+def lowest_cell(masks):
+    """Índice do bit mais baixo de cada máscara (não nula)"""
+    return np.bitwise_count((masks & (~masks + np.uint64(1))) - np.uint64(1)).astype(np.int64)
+
+
+def nearest_distance(masks, cells):
+    """Distância de cada célula ao candidato mais próximo (LocalizadorManteiga.distancia_minima)"""
+    nearest = np.full(cells.shape, CELLS, dtype=np.int64)
+    for d in range(MAX_DIST, -1, -1):
+        nearest[(BALL[cells, d] & masks) != 0] = d
+    return nearest
+
+CAUSAS = [None, 'casa', 'bolor', 'torradeira', 'bloqueado']
+CASA, BOLOR, TORRADEIRA, BLOQUEADO = 1, 2, 3, 4
+
+# Pontuação de jogadas ilegais (nunca escolhidas)
+ILLEGAL = -(10 ** 9)
+
+
+def solve_return(discovered, toaster):
+    """
+    tablebase.resolver para K tabuleiros de uma vez: a mesma pesquisa em
+    largura para trás, com as jogadas que faltam ganhar contadas por
+    (tabuleiro, estado, direção).
+    discovered [K, 36] barreiras descobertas, toaster [K] candidatos da torradeira.
+    Returns: [K, 1296] com os mesmos bytes que o resolver
+    """
+    k = len(toaster)
+    states = CELLS * CELLS
+    # Em [K, robot, bolor, direção]: barreiras e candidatos só dependem da célula
+    # do robot (e da direção), por isso fazem broadcast sobre o bolor
+    free = ((discovered[:, :, None] & DIRECTION_BITS) == 0)[:, :, None, :]
+    candidate = ((toaster[:, None] >> np.arange(CELLS, dtype=np.uint64)) & np.uint64(1)).astype(bool)
+    single = np.bitwise_count(toaster) == 1
+    two = candidate[:, _TARGET0][:, :, None, :]                 # o bolor pode dar dois passos
+    one = ~(two & single[:, None, None, None])                  # o bolor pode dar só um
+    legal = _MOVE_OK & free & (_MOVE_HOME | ((~one | ~_CAUGHT1) & (~two | ~_CAUGHT2)))
+    home = legal[:, HOME_ROBOTS] & _MOVE_HOME[HOME_ROBOTS]
+    legal &= ~_MOVE_HOME
+    need1 = legal & one
+    need2 = legal & two
+    pending = (need1.astype(np.int8) + (need2 & ~(need1 & _SAME_NEXT))).ravel()
+    need1, need2 = need1.ravel(), need2.ravel()
+    same = SAME_NEXT.ravel()
+    done = np.zeros(k * states, dtype=bool)
+    table = np.zeros(k * states, dtype=np.uint8)
+    position = np.zeros(k * states, dtype=np.int64)
+
+    # Vitórias numa jogada: a primeira direção que chega a casa
+    board, robot, bolor = np.nonzero(home.any(axis=3))
+    new = board * states + HOME_ROBOTS[robot] * CELLS + bolor
+    table[new] = 4 + np.argmax(home[board, robot, bolor], axis=1)
+    done[new] = True
+    for distance in range(2, 64):
+        if not len(new):
+            break
+        # Jogadas que levam aos estados novos (tabuleiro k, jogada estado * 4 + direção)
+        board, state = new // states, new % states
+        counts = PRED_START[state + 1] - PRED_START[state]
+        edge = np.repeat(PRED_START[state] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        move = np.repeat(board * (states * 4), counts) + PRED_MOVE[edge]
+        two_steps = PRED_TWO[edge]
+        # Cada jogada tem um só estado depois de um passo e um só depois de dois, por
+        # isso cada grupo desconta sem repetidos. O de dois passos só conta se vai dar
+        # a outro estado
+        step1 = move[~two_steps]
+        step1 = step1[need1[step1]]
+        step2 = move[two_steps]
+        step2 = step2[need2[step2] & ~(need1[step2] & same[step2 % (states * 4)])]
+        pending[step1] -= 1
+        pending[step2] -= 1
+        won = np.concatenate([step1, step2])
+        won = won[pending[won] == 0]
+        won = won[~done[won // 4]]
+        # Primeira direção (a mais baixa) de cada estado ainda sem vitória: escrever
+        # da última para a primeira. Sem ordenar: de cada estado repetido fica a
+        # posição que ficou escrita
+        origin = won // 4
+        for d in range(3, -1, -1):
+            table[origin[(won & 3) == d]] = distance * 4 + d
+        position[origin] = np.arange(len(origin))
+        new = origin[position[origin] == np.arange(len(origin))]
+        done[new] = True
+    return table.reshape(k, states)
+
+
+def cell_of(pos):
+    return pos['row'] * SIZE + pos['col']
+
+
+def pos_of(cell):
+    return {'row': int(cell) // SIZE, 'col': int(cell) % SIZE}
+
+
+class VectorBoards:
+    """B jogos autónomos do GameBoard avançados em simultâneo"""
+
+    def __init__(self, manteiga, torradeira, walls):
+        """
+        manteiga, torradeira: arrays [B] com as células verdadeiras
+        walls: array [B, 36] com as barreiras verdadeiras de cada célula (bit d = direção d)
+        """
+        b = len(manteiga)
+        self.count = b
+        self.manteiga = np.asarray(manteiga, dtype=np.int64)
+        self.torradeira = np.asarray(torradeira, dtype=np.int64)
+        self.walls = np.asarray(walls, dtype=np.uint8)
+        self.discovered = np.zeros((b, CELLS), dtype=np.uint8)
+
+        self.robot = np.full(b, HOME, dtype=np.int64)
+        self.bolor = np.full(b, CELLS - 1, dtype=np.int64)
+        self.has_butter = np.zeros(b, dtype=bool)
+        self.manteiga_strat = np.ones(b, dtype=bool)
+        self.skip = np.zeros(b, dtype=bool)
+        self.game_over = np.zeros(b, dtype=bool)
+        self.won = np.zeros(b, dtype=bool)
+        self.causa = np.zeros(b, dtype=np.int8)
+        self.moves = np.zeros(b, dtype=np.int64)
+
+        # Crenças: candidatos da manteiga (zeros da distancia_manteiga) e da torradeira
+        # (máscaras de 36 bits, bit c = célula c)
+        self.candidates = np.zeros(b, dtype=np.uint64)
+        self.has_numbers = np.zeros(b, dtype=bool)
+        self.known_manteiga = np.full(b, -1, dtype=np.int64)
+        self.leituras = np.zeros(b, dtype=np.int64)       # leituras da manteiga que eliminaram candidatos
+        self.leituras_manteiga = np.full(b, -1, dtype=np.int64)  # leituras até localizar ou apanhar
+        self.hot = np.zeros(b, dtype=np.uint64)           # leituras quentes (torradeira num vizinho)
+        self.excluded = np.zeros(b, dtype=np.uint64)      # células onde a torradeira não pode estar
+        self.intersection = np.full(b, (1 << CELLS) - 1, dtype=np.uint64)  # vizinhanças comuns às leituras quentes
+        self.known_torradeira = np.full(b, -1, dtype=np.int64)
+
+        # Penalização por revisitar cada célula: 5*i+5, com i a primeira
+        # ocorrência da célula em last_positions (0 se nunca foi visitada)
+        self.revisit_penalty = np.zeros((b, CELLS), dtype=np.int32)
+
+        # Última tabela do regresso resolvida por tabuleiro e as barreiras e candidatos dela
+        self.return_table = np.zeros((b, CELLS * CELLS), dtype=np.uint8)
+        self.return_walls = np.zeros((b, CELLS), dtype=np.uint8)
+        self.return_toaster = np.zeros(b, dtype=np.uint64)
+        self.return_solved = np.zeros(b, dtype=bool)
+
+        self.turns = 0
+        # Leituras iniciais em (0,0), como no setup_game
+        self.update_matrices(np.arange(b))
+
+    @classmethod
+    def from_games(cls, games):
+        """Constrói o lote a partir dos cenários de GameBoards já inicializados"""
+        # Máscaras de 4 bits do MapaParedes (mesma ordem de direções)
+        walls = np.array([game.paredes.mascaras for game in games], dtype=np.uint8).reshape(len(games), CELLS)
+        return cls([cell_of(g.manteiga_pos) for g in games],
+                   [cell_of(g.torradeira_pos) for g in games],
+                   walls)
+
+    # -------------------------------
+    # Crenças
+    # -------------------------------
+    def update_matrices(self, sel):
+        robot = self.robot[sel]
+
+        # Manteiga: só com leituras não nulas e enquanto não foi apanhada
+        reading = DIST[robot, self.manteiga[sel]]
+        upd = ~self.has_butter[sel] & (reading > 0)
+        s, robot_s, reading_s = sel[upd], robot[upd], reading[upd]
+        ring = RING[robot_s, reading_s]
+        first = ~self.has_numbers[s]
+        filtered = self.candidates[s] & ring
+        counts = np.bitwise_count(filtered)
+        # Leituras inconsistentes com todos os candidatos são ignoradas
+        keep = ~first & (counts > 0)
+        candidates = np.where(first, ring, np.where(keep, filtered, self.candidates[s]))
+        # O GameBoard só lê quando a leitura é informativa, ou seja quando elimina candidatos
+        self.leituras[s] += first | (candidates != self.candidates[s])
+        self.candidates[s] = candidates
+        self.has_numbers[s] = True
+        # LocalizadorManteiga: localizada assim que resta um só candidato
+        located = (np.bitwise_count(candidates) == 1) & (self.known_manteiga[s] < 0)
+        self.known_manteiga[s[located]] = lowest_cell(candidates[located])
+        self.leituras_manteiga[s[located]] = self.leituras[s[located]]
+
+        self.update_toaster_knowledge(sel)
+
+    def update_toaster_knowledge(self, sel):
+        """LocalizadorTorradeira.observar em todos os tabuleiros de sel"""
+        sel = sel[self.known_torradeira[sel] < 0]
+        robot = self.robot[sel]
+        dist = DIST[robot, self.torradeira[sel]]
+
+        on_top = dist == 0
+        self.known_torradeira[sel[on_top]] = robot[on_top]
+
+        hot = dist == 1
+        s = sel[hot]
+        self.hot[s] |= BIT[robot[hot]]
+        self.intersection[s] &= ADJACENT_MASK[robot[hot]]
+        self.excluded[s] |= BIT[robot[hot]]
+
+        cold = dist > 1
+        self.excluded[sel[cold]] |= BIT[robot[cold]] | ADJACENT_MASK[robot[cold]]
+
+        sel = sel[~on_top]
+        candidates = self.intersection[sel] & ~self.excluded[sel]
+        single = np.bitwise_count(candidates) == 1
+        self.known_torradeira[sel[single]] = lowest_cell(candidates[single])
+
+    def toaster_cells(self, sel):
+        """Células onde a torradeira pode estar (LocalizadorTorradeira.candidatos)"""
+        kt = self.known_torradeira[sel]
+        return np.where(kt >= 0, BIT[np.where(kt >= 0, kt, 0)], self.intersection[sel] & ~self.excluded[sel])
+
+    def toaster_candidates(self, sel):
+        """Candidatos da torradeira (0 antes da primeira leitura quente, como no possivel)"""
+        kt = self.known_torradeira[sel]
+        candidates = np.where(self.hot[sel] != 0, self.intersection[sel] & ~self.excluded[sel], np.uint64(0))
+        return np.where(kt >= 0, BIT[np.where(kt >= 0, kt, 0)], candidates)
+
+    def discover_barriers(self, sel):
+        robot = self.robot[sel]
+        walls = self.walls[sel, robot]
+        self.discovered[sel, robot] |= walls
+        for d in range(4):
+            has = (walls >> d) & 1 == 1
+            self.discovered[sel[has], TARGET[robot[has], d]] |= 1 << OPPOSITE[d]
+
+    # -------------------------------
+    # Regras do jogo
+    # -------------------------------
+    def check_game_state(self, sel):
+        robot, bolor = self.robot[sel], self.bolor[sel]
+        pick = ~self.has_butter[sel] & (robot == self.manteiga[sel])
+        self.has_butter[sel[pick]] = True
+        unread = sel[pick][self.leituras_manteiga[sel[pick]] < 0]
+        self.leituras_manteiga[unread] = self.leituras[unread]
+
+        rest = ~pick
+        home = rest & self.has_butter[sel] & (robot == HOME)
+        caught = rest & ~home & (bolor == robot)
+        toaster = rest & ~home & ~caught & (bolor == self.torradeira[sel])
+        for mask, won, causa in ((home, True, CASA), (caught, False, BOLOR), (toaster, True, TORRADEIRA)):
+            s = sel[mask]
+            self.game_over[s] = True
+            self.won[s] = won
+            self.causa[s] = causa
+
+    def move_bolor(self, sel):
+        sel = sel[~self.game_over[sel]]
+        self.bolor[sel] = STEP[self.robot[sel], self.bolor[sel]]
+        self.check_game_state(sel)
+
+    def evaluate_moves(self, sel):
+        """Pontuação das 4 jogadas (_evaluate_move); devolve (score, change_strat, targets, legal)"""
+        robot, bolor = self.robot[sel], self.bolor[sel]
+        targets = TARGET[robot]
+        legal = (targets >= 0) & ((self.discovered[sel, robot][:, None] & DIRECTION_BITS) == 0)
+        n = np.where(legal, targets, 0)
+        nb = n * CELLS + bolor[:, None]
+        has_butter = self.has_butter[sel][:, None]
+        butter = (self.manteiga_strat[sel] & ~self.has_butter[sel])[:, None]
+        km = self.known_manteiga[sel][:, None]
+        known = km >= 0
+        nbm = nb * (CELLS + 1) + np.where(known, km, UNKNOWN)
+        kt = self.known_torradeira[sel][:, None]
+        nbt = nb * (CELLS + 1) + np.where(kt >= 0, kt, UNKNOWN)
+
+        # A distância ao candidato mais próximo só é precisa enquanto a manteiga não é conhecida
+        search = np.nonzero(butter[:, 0] & ~known[:, 0])[0]
+        cells = np.concatenate([robot[search, None], n[search]], axis=1)
+        nearest = nearest_distance(self.candidates[sel[search], None], cells)
+        zero_score = np.zeros(n.shape, dtype=np.int32)
+        zero_score[search] = 100 * (nearest[:, 1:] < nearest[:, :1])
+
+        # LocalizadorTorradeira.penalizacao: evitar as possíveis torradeiras
+        toaster = self.toaster_candidates(sel)
+        count = np.maximum(np.bitwise_count(toaster), 1).astype(np.int32)
+        possible = (toaster[:, None] & BIT[n]) != 0
+        avoid = np.where(possible, PENALIZACAO_TORRADEIRA // count[:, None], 0)
+
+        branch = np.where(butter, np.where(known, BUTTER_SCORE.take(nbm), zero_score) - avoid,
+                          TOASTER_SCORE.take(nbt))
+        revisit = np.take_along_axis(self.revisit_penalty[sel], n, axis=1)
+        score = np.where(has_butter, HOME_SCORE.take(nb), branch + COMMON_SCORE.take(nbm) - revisit)
+        change = butter & CHANGE_STRAT.take(nbm)
+        score = np.where(legal, score, ILLEGAL)
+        return score, change, targets, legal
+
+    def step(self):
+        """Um turno (uma iteração do play_game_autonomous) em todos os tabuleiros ativos"""
+        active = np.nonzero(~self.game_over & (self.moves < self.max_moves))[0]
+        self.turns += len(active)
+
+        skipping = active[self.skip[active]]
+        self.skip[skipping] = False
+        self.move_bolor(skipping)
+
+        sel = active[~np.isin(active, skipping)]
+        score, change, targets, legal = self.evaluate_moves(sel)
+        choice = np.argmax(score, axis=1)
+        rows = np.arange(len(sel))
+
+        # Regresso a casa: a jogada da tablebase substitui a pontuação
+        # (TabelaRegresso.valor). A linha da tabela de referência serve quando não toca
+        # nas barreiras descobertas nem nos candidatos da torradeira; os outros usam a
+        # tabela resolvida para eles (em lote, e só quando as crenças mudam)
+        back = np.nonzero(self.has_butter[sel])[0]
+        b = sel[back]
+        estado = self.robot[b] * CELLS + self.bolor[b]
+        toaster = self.toaster_cells(b)
+        single = np.bitwise_count(toaster) == 1
+        ref = np.where(single, lowest_cell(np.where(single, toaster, np.uint64(1))), UNKNOWN)
+        valor = REGRESSO_REF[ref, estado]
+        clear = (((LINE_CELLS[ref, estado] & np.where(single, np.uint64(0), toaster)) == 0) &
+                 ~(LINE_MOVES[ref, estado] & self.discovered[b]).any(axis=1))
+        # Barreiras e candidatos só tiram vitórias à tabela de referência
+        solve = np.nonzero((valor != 0) & ~clear)[0]
+        if len(solve):
+            bs = b[solve]
+            stale = (~self.return_solved[bs] | (self.return_toaster[bs] != toaster[solve]) |
+                     (self.return_walls[bs] != self.discovered[bs]).any(axis=1))
+            fresh = bs[stale]
+            if len(fresh):
+                self.return_table[fresh] = solve_return(self.discovered[fresh], toaster[solve][stale])
+                self.return_walls[fresh] = self.discovered[fresh]
+                self.return_toaster[fresh] = toaster[solve][stale]
+                self.return_solved[fresh] = True
+            valor[solve] = self.return_table[bs, estado[solve]]
+        wins = valor != 0
+        choice[back[wins]] = valor[wins] & 3
+
+        # Sem jogadas válidas: o modo headless termina o jogo
+        blocked = ~legal.any(axis=1)
+        self.game_over[sel[blocked]] = True
+        self.causa[sel[blocked]] = BLOQUEADO
+        sel, choice, rows = sel[~blocked], choice[~blocked], rows[~blocked]
+
+        new = targets[rows, choice]
+        self.skip[sel] |= new == self.torradeira[sel]
+        self.robot[sel] = new
+        unseen = self.revisit_penalty[sel, new] == 0
+        self.revisit_penalty[sel[unseen], new[unseen]] = 5 * self.moves[sel[unseen]] + 5
+        self.manteiga_strat[sel[change[rows, choice]]] = False
+
+        self.discover_barriers(sel)
+        self.update_matrices(sel)
+        self.check_game_state(sel)
+        self.move_bolor(sel)
+        self.moves[sel] += 1
+        return len(active)
+
+    def run(self, max_moves=100):
+        self.max_moves = max_moves
+        while self.step():
+            pass
+        return self
+
+    def results(self):
+        """Resultados no mesmo formato do GameBoard.result()"""
+        return [{
+            'won': bool(self.won[i]),
+            'moves': int(self.moves[i]),
+            'causa': CAUSAS[self.causa[i]] or 'limite',
+            'known_manteiga': pos_of(self.known_manteiga[i]) if self.known_manteiga[i] >= 0 else None,
+            'known_torradeira': pos_of(self.known_torradeira[i]) if self.known_torradeira[i] >= 0 else None,
+            'leituras_manteiga': int(self.leituras_manteiga[i]) if self.leituras_manteiga[i] >= 0 else None,
+            'segundos': None,  # sem modelo de custo
+        } for i in range(self.count)]
+
+
+def make_games(boards, seed, tabuleiro_aleatorio=True):
+    return [GameBoard(headless=True, tabuleiro_aleatorio=tabuleiro_aleatorio, seed=game_seed(seed, i))
+            for i in range(boards)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador NumPy em lockstep")
+    parser.add_argument("--boards", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-moves", type=int, default=100)
+    parser.add_argument("--fixo", action="store_true")
+    parser.add_argument("--check", action="store_true",
+                        help="compara com o GameBoard escalar nas mesmas seeds")
+    args = parser.parse_args(argv)
+
+    games = make_games(args.boards, args.seed, not args.fixo)
+    batch = VectorBoards.from_games(games)
+    start = time.perf_counter()
+    batch.run(args.max_moves)
+    elapsed = time.perf_counter() - start
+    results = batch.results()
+    wins = sum(r['won'] for r in results)
+    print(f"Tabuleiros: {args.boards}  vitórias: {wins} ({100.0 * wins / args.boards:.1f}%)")
+    print(f"Vetorizado: {batch.turns} turnos em {elapsed:.3f}s ({batch.turns / elapsed:.0f} turnos/s)")
+
+    if args.check:
+        start = time.perf_counter()
+        scalar = [game.play_game_autonomous(args.max_moves) for game in games]
+        scalar_elapsed = time.perf_counter() - start
+        # Turnos escalares: jogadas do robot mais jogadas saltadas na torradeira
+        print(f"Escalar: {scalar_elapsed:.3f}s ({batch.turns / scalar_elapsed:.0f} turnos/s, "
+              f"speedup {scalar_elapsed / elapsed:.0f}x)")
+        mismatches = [i for i in range(args.boards) if scalar[i] != results[i]]
+        for i in mismatches[:10]:
+            print(f"Diferença no jogo {i}: escalar={scalar[i]} vetorizado={results[i]}")
+        print(f"Jogos diferentes: {len(mismatches)}")
+        if mismatches:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Corre o projeto.py ou o beast.py fora do EV3, com o pybricks falso de
+ev3_virtual e o relógio virtual: um jogo inteiro leva milissegundos e no
+fim sabe-se quantos segundos de robot custou cada fase.
+
+O mundo é o cenário de um GameBoard, ao nível da casa
+(mundo_virtual.MundoTabuleiro) ou com a pose contínua do robot sobre as
+fitas (cinematica.MundoCinematico, --mundo cinematico). As
+funções de movimento e leitura do programa são embrulhadas para contar o
+tempo por fase (FASES); o tempo fora delas (pausas entre jogadas, ecrãs)
+conta como 'espera'. O time.sleep do programa também passa a ser virtual.
+
+Uso:
+    python virtual.py --programa beast --games 20 --seed 1
+    python virtual.py --programa projeto --fixo --verbose
+    python virtual.py --programa beast --mundo cinematico --ruido 2 --games 200
+"""
+import argparse
+import importlib
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+PASTA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ev3_virtual')
+
+# Função do programa -> fase onde conta o tempo
+FASES = {
+    'get_distance': 'leitura',
+    'andar_casa': 'conducao',
+    'andar_casas': 'conducao',
+    'wait_to_drive': 'conducao',
+    'forward': 'conducao',
+    'backward': 'conducao',
+    'turn_left': 'rotacao',
+    'turn_right': 'rotacao',
+    'determinar_direcao_torradeira': 'torradeira',
+    'check_pause_and_wait': 'pausa',
+}
+
+# Rumo inicial (mundo_virtual.QUARTOS) e sentido das rotações de cada programa:
+# o projeto.py começa virado para a direita (change_col = 1) e o beast.py para
+# baixo (a jogada 's' não roda), com o turn_right a levar de 's' para 'd'
+ORIENTACAO = {'projeto': (0, 1), 'beast': (1, -1)}
+
+
+def _instalar_caminho():
+    if PASTA not in sys.path:
+        sys.path.insert(0, PASTA)
+
+
+class _TempoVirtual:
+    """O módulo time visto pelo programa: sleep avança o relógio virtual"""
+
+    def __init__(self, relogio):
+        self.relogio = relogio
+
+    def sleep(self, segundos):
+        self.relogio.avancar(segundos * 1000.0)
+
+    def time(self):
+        return self.relogio.segundos()
+
+
+def _com_fase(funcao, fase, relogio):
+    def embrulhada(*args, **kwargs):
+        relogio.entrar(fase)
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            relogio.sair()
+    return embrulhada
+
+
+def correr(programa='beast', seed=None, tabuleiro_aleatorio=True, max_jogadas=100, limite=4 * 3600,
+           verbose=False, mundo='tabuleiro', ruido=0.0, opcoes=None):
+    """
+    Um jogo do programa no cenário do GameBoard com a seed dada.
+    limite: segundos de robot antes de desistir
+    mundo: 'tabuleiro' (MundoTabuleiro) ou 'cinematico' (MundoCinematico)
+    ruido: desvio padrão (graus) do erro de cada turn no mundo cinemático
+    opcoes: globais do programa a mudar antes do jogo (por exemplo {'ESTRATEGIA': 'tempo'})
+    Returns: dicionário com a causa, as jogadas, os segundos de robot por fase,
+    os segundos por casa e por recuperação de barreira e o tempo real gasto
+    """
+    _instalar_caminho()
+    import mundo_virtual
+    from simulate import GameBoard
+
+    game = GameBoard(headless=True, tabuleiro_aleatorio=tabuleiro_aleatorio, seed=seed)
+    rumo, sentido = ORIENTACAO[programa]
+    if mundo == 'cinematico':
+        from cinematica import MundoCinematico
+        mundo = MundoCinematico(game, rumo, sentido, max_jogadas, ruido=ruido, seed=seed)
+    else:
+        mundo = mundo_virtual.MundoTabuleiro(game, rumo, sentido, max_jogadas)
+    relogio = mundo_virtual.Relogio(limite * 1000.0)
+    mundo_virtual.instalar(mundo, relogio)
+
+    start = time.perf_counter()
+    saida = io.StringIO()
+    with redirect_stdout(sys.stdout if verbose else saida):
+        # Módulo novo em cada jogo: o projeto.py guarda o estado do jogo em globais
+        sys.modules.pop(programa, None)
+        modulo = importlib.import_module(programa)
+        modulo.time = _TempoVirtual(relogio)
+        if hasattr(modulo, 'REGISTO'):
+            modulo.REGISTO = None  # o registo de fases é para o brick (as opcoes podem ligá-lo)
+        for nome, valor in (opcoes or {}).items():
+            setattr(modulo, nome, valor)
+        for nome, fase in FASES.items():
+            if hasattr(modulo, nome):
+                setattr(modulo, nome, _com_fase(getattr(modulo, nome), fase, relogio))
+        try:
+            if programa == 'projeto':
+                modulo.main()
+            else:
+                modulo.Cerebro().play_game_autonomous()
+        except mundo_virtual.FimDoJogo as fim:
+            if mundo.causa is None:
+                mundo.causa = fim.causa  # o relógio passou o limite
+        except SystemExit:
+            pass  # o projeto.py acaba com exit()
+    por_casa, recuperacao = mundo.tempos()
+    return {
+        'causa': mundo.causa if mundo.causa is not None else 'parou',
+        'won': mundo.venceu(),
+        'jogadas': mundo.jogadas,
+        'segundos': relogio.segundos(),
+        'fases': relogio.relatorio(),
+        'entradas': dict(relogio.entradas),
+        'por_casa': por_casa,
+        'barreiras': mundo.barreiras,
+        'recuperacao': recuperacao,
+        'atravessadas': getattr(mundo, 'atravessadas', 0),
+        'graus': mundo.rodados,
+        'real': time.perf_counter() - start,
+    }
+
+
+def main(argv=None):
+    from simulate import game_seed
+
+    parser = argparse.ArgumentParser(description="Jogos do programa do EV3 com o pybricks falso")
+    parser.add_argument("--programa", choices=sorted(ORIENTACAO), default="beast")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixo", action="store_true", help="tabuleiro fixo em vez de aleatório")
+    parser.add_argument("--max-jogadas", type=int, default=100)
+    parser.add_argument("--verbose", action="store_true", help="mostra o que o programa imprime")
+    parser.add_argument("--mundo", choices=("tabuleiro", "cinematico"), default="tabuleiro")
+    parser.add_argument("--ruido", type=float, default=0.0, help="erro (graus) de cada turn no mundo cinemático")
+    parser.add_argument("--estrategia", help="ESTRATEGIA do beast.py (heuristica, pesquisa, mcts ou tempo)")
+    args = parser.parse_args(argv)
+
+    fases = {}
+    causas = {}
+    segundos = real = recuperacao = 0.0
+    jogadas = barreiras = atravessadas = 0
+    graus = 0.0
+    for index in range(args.games):
+        r = correr(args.programa, game_seed(args.seed, index), not args.fixo, args.max_jogadas,
+                   verbose=args.verbose, mundo=args.mundo, ruido=args.ruido,
+                   opcoes={'ESTRATEGIA': args.estrategia} if args.estrategia else None)
+        print(f"jogo {index}: {r['causa']} em {r['jogadas']} jogadas, {r['segundos'] / 60:.1f} min de robot, "
+              f"{1000 * r['real']:.0f} ms reais")
+        for fase, s in r['fases'].items():
+            fases[fase] = fases.get(fase, 0.0) + s
+        causas[r['causa']] = causas.get(r['causa'], 0) + 1
+        segundos += r['segundos']
+        real += r['real']
+        jogadas += r['jogadas']
+        barreiras += r['barreiras']
+        recuperacao += (r['recuperacao'] or 0.0) * r['barreiras']
+        atravessadas += r['atravessadas']
+        graus += r['graus']
+
+    print("Causas: " + ", ".join(f"{k}={v}" for k, v in sorted(causas.items())))
+    print(f"Robot: {segundos / args.games / 60:.1f} min por jogo, {segundos / max(jogadas, 1):.1f} s por jogada; "
+          f"real: {1000 * real / args.games:.0f} ms por jogo")
+    print(f"Movimento: {segundos / max(jogadas, 1):.1f} s por casa nova, {barreiras} barreiras vistas "
+          f"({recuperacao / max(barreiras, 1):.1f} s de recuperação cada), {atravessadas} atravessadas, "
+          f"{graus / args.games:.0f} graus rodados por jogo")
+    for fase, s in sorted(fases.items(), key=lambda item: -item[1]):
+        print(f"  {fase}: {s / args.games:.1f} s por jogo ({100.0 * s / segundos:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()